@@ -1,50 +1,248 @@
-import time
-import tracemalloc
+"""
+Benchmark harness: IFC against zlib, bz2 and lzma on deterministic corpora.
+
+Every (corpus, codec) pair is compressed and decompressed in a fresh child
+process, so peak RSS (getrusage, not tracemalloc) is per operation and the
+timings carry no tracing overhead. IFC compression is also broken down into
+parse / tokenize / train / encode / write with the compressor's profiler.
+
+    python benchmark.py                          # 1 MB corpora
+    python benchmark.py --sizes 1 100 1000       # 1 MB, 100 MB and 1 GB
+    python benchmark.py --output results.json
+    python benchmark.py --save-baseline baseline.json
+    python benchmark.py --baseline baseline.json  # exit status 1 on regressions
+
+Corpora are written by generate_large_examples.py with a fixed seed and
+reused on later runs.
+"""
+import argparse
+import bz2
+import contextlib
+import filecmp
+import json
+import lzma
 import os
+import platform
+import subprocess
 import sys
-from intelligent_file_compressor.core.compressor import Compressor
-from intelligent_file_compressor.core.decompressor import Decompressor
-import filecmp
+import tempfile
+import time
+import zlib
+
+try:
+    import resource
+except ImportError: # Windows
+    resource = None
+
+import generate_large_examples as corpora
+
+CODECS = ["ifc", "zlib", "bz2", "lzma"]
+KINDS = ["json", "csv", "log", "txt"]
+PHASES = ["parse", "tokenize", "train", "encode", "write", "other"]
+CHUNK = 1 << 20
+SEED = 1234
+
+# Relative slack before a metric counts as a regression. Throughput and
+# memory are noisy, sizes are deterministic.
+SIZE_TOLERANCE = 0.01
+
+def corpus_path(corpus_dir, kind, size_mb):
+    return os.path.join(corpus_dir, f"{kind}_{size_mb}mb.{kind}")
+
+def build_corpus(corpus_dir, kind, size_mb):
+    """Generate the corpus file unless it already exists (same seed, same bytes)."""
+    path = corpus_path(corpus_dir, kind, size_mb)
+    if os.path.exists(path):
+        return path
+    name = os.path.basename(path)
+    with contextlib.redirect_stdout(sys.stderr):
+        if kind == "json":
+            corpora.generate_json(name, size_mb=size_mb, output_dir=corpus_dir, seed=SEED)
+        elif kind == "csv":
+            corpora.generate_csv(name, output_dir=corpus_dir, seed=SEED, size_mb=size_mb)
+        elif kind == "log":
+            corpora.generate_log(name, output_dir=corpus_dir, seed=SEED, size_mb=size_mb)
+        else:
+            corpora.generate_text(name, size_mb=size_mb, output_dir=corpus_dir, seed=SEED)
+    return path
+
+def peak_rss_mb():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KB, macOS bytes
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+# --- Child process side: one operation, result as JSON on stdout ---
+
+def measure_ifc(op, src, dst):
+    from intelligent_file_compressor.core.compressor import Compressor
+    from intelligent_file_compressor.core.decompressor import Decompressor
+    from intelligent_file_compressor.utils.profiling import Profiler
 
-def benchmark(input_file, output_file):
-    print(f"Benchmarking compression of {input_file}...")
-    
-    if not os.path.exists(input_file):
-        print(f"Error: {input_file} not found.")
-        return
-
-    tracemalloc.start()
-    start_time = time.time()
-    
-    compressor = Compressor()
-    compressor.compress(input_file, output_file)
-    
-    end_time = time.time()
-    current, peak = tracemalloc.get_traced_memory()
-    tracemalloc.stop()
-    
-    input_size = os.path.getsize(input_file)
-    output_size = os.path.getsize(output_file)
-    
-    print(f"\n--- Results ---")
-    print(f"Time: {end_time - start_time:.4f} seconds")
-    print(f"Peak Memory: {peak / 1024 / 1024:.2f} MB")
-    print(f"Input Size: {input_size / 1024:.2f} KB")
-    print(f"Output Size: {output_size / 1024:.2f} KB")
-    print(f"Ratio: {output_size / input_size * 100:.2f}%")
-
-    # Verification
-    print("\nVerifying...")
-    decompressed_file = input_file + ".restored"
-    decompressor = Decompressor()
-    decompressor.decompress(output_file, decompressed_file)
-    
-    if filecmp.cmp(input_file, decompressed_file, shallow=False):
-        print("SUCCESS: Decompressed file matches original.")
+    result = {}
+    if op == "compress":
+        profiler = Profiler()
+        start = time.perf_counter()
+        Compressor(verbose=False, profiler=profiler).compress(src, dst)
+        result["seconds"] = time.perf_counter() - start
+        phases = {p: round(profiler.phases.get(p, 0.0), 4) for p in PHASES[:-1]}
+        phases["other"] = round(max(result["seconds"] - sum(profiler.phases.values()), 0.0), 4)
+        result["phases"] = phases
+        result["header_bytes"] = profiler.files[0][1]["header_bytes"]
     else:
-        print("FAILURE: Decompressed file does NOT match original.")
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(open(os.devnull, 'w')):
+            Decompressor().decompress(src, dst)
+        result["seconds"] = time.perf_counter() - start
+    return result
+
+def measure_stdlib(codec, op, src, dst):
+    module = {"zlib": zlib, "bz2": bz2, "lzma": lzma}[codec]
+    if op == "compress":
+        coder = module.compressobj() if codec == "zlib" else module.BZ2Compressor() if codec == "bz2" else module.LZMACompressor()
+        finish = coder.flush
+    else:
+        coder = module.decompressobj() if codec == "zlib" else module.BZ2Decompressor() if codec == "bz2" else module.LZMADecompressor()
+        finish = getattr(coder, "flush", lambda: b"")
+    step = coder.compress if op == "compress" else coder.decompress
+
+    start = time.perf_counter()
+    with open(src, 'rb') as fin, open(dst, 'wb') as fout:
+        for chunk in iter(lambda: fin.read(CHUNK), b""):
+            fout.write(step(chunk))
+        fout.write(finish())
+    return {"seconds": time.perf_counter() - start}
+
+def measure(codec, op, src, dst):
+    result = measure_ifc(op, src, dst) if codec == "ifc" else measure_stdlib(codec, op, src, dst)
+    result["peak_rss_mb"] = peak_rss_mb()
+    return result
+
+# --- Parent side ---
+
+def run_child(codec, op, src, dst):
+    out = subprocess.run([sys.executable, os.path.abspath(__file__), "--measure", codec, op, src, dst],
+                         check=True, capture_output=True, text=True).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+def bench_one(path, codec, repeat, workdir):
+    """Best-of-repeat metrics for one corpus file and codec."""
+    packed = os.path.join(workdir, os.path.basename(path) + "." + codec)
+    restored = packed + ".out"
+    comp = [run_child(codec, "compress", path, packed) for _ in range(repeat)]
+    decomp = [run_child(codec, "decompress", packed, restored) for _ in range(repeat)]
+    best = min(comp, key=lambda r: r["seconds"])
+
+    size_in = os.path.getsize(path)
+    size_out = os.path.getsize(packed)
+    mb = size_in / (1024 * 1024)
+    rss = lambda runs: None if runs[0]["peak_rss_mb"] is None else min(r["peak_rss_mb"] for r in runs)
+    result = {
+        "corpus": os.path.basename(path),
+        "codec": codec,
+        "bytes_in": size_in,
+        "bytes_out": size_out,
+        "ratio": round(size_out / size_in, 5),
+        "compress_mbps": round(mb / best["seconds"], 3),
+        "decompress_mbps": round(mb / min(r["seconds"] for r in decomp), 3),
+        "compress_rss_mb": rss(comp),
+        "decompress_rss_mb": rss(decomp),
+        "exact": filecmp.cmp(path, restored, shallow=False),
+    }
+    if codec == "ifc":
+        result["header_bytes"] = best["header_bytes"]
+        result["phases"] = best["phases"]
+    for p in (packed, restored):
+        os.remove(p)
+    return result
+
+def print_table(results):
+    print(f"{'corpus':<18} {'codec':<5} {'ratio':>7} {'comp MB/s':>10} {'dec MB/s':>9} "
+          f"{'RSS c/d MB':>13} {'header':>8}  exact")
+    for r in results:
+        rss = "-" if r["compress_rss_mb"] is None else f"{r['compress_rss_mb']:.0f}/{r['decompress_rss_mb']:.0f}"
+        header = r.get("header_bytes", "-")
+        print(f"{r['corpus']:<18} {r['codec']:<5} {r['ratio'] * 100:>6.2f}% {r['compress_mbps']:>10.2f} "
+              f"{r['decompress_mbps']:>9.2f} {rss:>13} {header:>8}  {r['exact']}")
+
+    phased = [r for r in results if "phases" in r]
+    if phased:
+        print(f"\n{'IFC compress phases (s)':<24}" + "".join(f"{p:>10}" for p in PHASES))
+        for r in phased:
+            print(f"{r['corpus']:<24}" + "".join(f"{r['phases'][p]:>10.3f}" for p in PHASES))
+
+def compare(results, baseline, tolerance):
+    """Human-readable regressions of results against a baseline run."""
+    old = {(r["corpus"], r["codec"]): r for r in baseline["results"]}
+    # metric -> (higher is better, relative tolerance)
+    metrics = {
+        "compress_mbps": (True, tolerance),
+        "decompress_mbps": (True, tolerance),
+        "compress_rss_mb": (False, tolerance),
+        "decompress_rss_mb": (False, tolerance),
+        "ratio": (False, SIZE_TOLERANCE),
+        "header_bytes": (False, SIZE_TOLERANCE),
+    }
+    regressions = []
+    for r in results:
+        base = old.get((r["corpus"], r["codec"]))
+        if base is None:
+            continue
+        if base.get("exact") and not r["exact"]:
+            regressions.append(f"{r['corpus']} {r['codec']}: round trip no longer exact")
+        for name, (higher_better, tol) in metrics.items():
+            now, then = r.get(name), base.get(name)
+            if now is None or then is None or then == 0:
+                continue
+            change = (now - then) / then
+            if (change < -tol) if higher_better else (change > tol):
+                regressions.append(f"{r['corpus']} {r['codec']}: {name} {then} -> {now} ({change * 100:+.1f}%)")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="IFC benchmark harness")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1], help="Corpus sizes in MB (e.g. 1 100 1000)")
+    parser.add_argument("--kinds", nargs="+", choices=KINDS, default=KINDS, help="Corpus types")
+    parser.add_argument("--codecs", nargs="+", choices=CODECS, default=CODECS, help="Codecs to run")
+    parser.add_argument("--repeat", type=int, default=1, help="Runs per measurement (best is kept)")
+    parser.add_argument("--corpus-dir", default="bench_corpus", help="Where corpora are generated")
+    parser.add_argument("--output", help="Write results as JSON")
+    parser.add_argument("--save-baseline", help="Write results as the new baseline")
+    parser.add_argument("--baseline", help="Compare against a baseline; exit 1 on regressions")
+    parser.add_argument("--tolerance", type=float, default=0.10,
+                        help="Allowed relative throughput/RSS regression (sizes allow 1%%)")
+    parser.add_argument("--measure", nargs=4, metavar=("CODEC", "OP", "SRC", "DST"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.measure:
+        print(json.dumps(measure(*args.measure)))
+        return 0
+
+    results = []
+    with tempfile.TemporaryDirectory() as workdir:
+        for size_mb in args.sizes:
+            for kind in args.kinds:
+                path = build_corpus(args.corpus_dir, kind, size_mb)
+                for codec in args.codecs:
+                    results.append(bench_one(path, codec, args.repeat, workdir))
+    print_table(results)
+
+    report = {"python": platform.python_version(), "platform": platform.platform(), "results": results}
+    for path in (args.output, args.save_baseline):
+        if path:
+            with open(path, 'w') as f:
+                json.dump(report, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        print(f"\n{len(regressions)} regression(s) against {args.baseline}")
+        for line in regressions:
+            print(f"  {line}")
+        return 1 if regressions else 0
+    return 0
 
 if __name__ == "__main__":
-    input_path = "intelligent_file_compressor/examples/story.txt"
-    output_path = "intelligent_file_compressor/examples/story.ifc"
-    benchmark(input_path, output_path)
+    sys.exit(main())
@@ -0,0 +1,54 @@
+import os
+import sys
+import time
+from intelligent_file_compressor.core.file_detector import FileDetector
+from intelligent_file_compressor.strategies import registry
+from intelligent_file_compressor.strategies.base_strategy import MultiStreamStrategy
+
+EXAMPLES = [
+    "intelligent_file_compressor/examples/large_sample.json",
+    "intelligent_file_compressor/examples/large_data.csv",
+    "intelligent_file_compressor/examples/server.log",
+    "intelligent_file_compressor/examples/story.txt",
+]
+
+def token_streams(input_file):
+    """Tokenize a file and route its tokens the way the compressor does."""
+    file_type = FileDetector.detect(input_file)
+    _, strat_cls = registry.strategy_for(file_type)
+    strategy = strat_cls()
+    tokens = list(strategy.tokenize(strategy.parse(input_file)))
+    if isinstance(strategy, MultiStreamStrategy):
+        return strategy.split_streams(tokens)
+    return {"text": tokens}
+
+def benchmark_entropy(input_file, entropy):
+    from intelligent_file_compressor.algorithms.multi_stream import MultiStreamCoder
+    streams = token_streams(input_file)
+
+    coder = MultiStreamCoder(entropy)
+    start = time.perf_counter()
+    coder.train(streams)
+    layout, payload = coder.encode(streams)
+    enc_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    decoded = coder.decode(layout, payload)
+    dec_time = time.perf_counter() - start
+
+    ok = all(decoded[name] == [str(t) for t in tokens] for name, tokens in streams.items())
+    return len(payload), enc_time, dec_time, ok
+
+def main(files):
+    print(f"{'file':<20} {'coder':<8} {'payload':>10} {'encode s':>9} {'decode s':>9}  ok")
+    for input_file in files:
+        if not os.path.exists(input_file):
+            print(f"Error: {input_file} not found (run generate_large_examples.py).")
+            continue
+        for entropy in ("huffman", "rans"):
+            size, enc_time, dec_time, ok = benchmark_entropy(input_file, entropy)
+            name = os.path.basename(input_file)
+            print(f"{name:<20} {entropy:<8} {size:>10} {enc_time:>9.3f} {dec_time:>9.3f}  {ok}")
+
+if __name__ == "__main__":
+    main(sys.argv[1:] or EXAMPLES)
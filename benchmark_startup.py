@@ -0,0 +1,48 @@
+"""
+Cold-start time of the CLI: interpreter + imports + one tiny command, as a
+script invoking `ifc` thousands of times would see it. Each run is a fresh
+process; the median of --runs is reported next to a bare interpreter.
+
+    python benchmark_startup.py --runs 20
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+def wall(cmd, runs):
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(cmd, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        times.append(time.perf_counter() - start)
+    return statistics.median(times)
+
+def main():
+    parser = argparse.ArgumentParser(description="CLI cold-start benchmark")
+    parser.add_argument("--runs", type=int, default=10, help="Processes per command (median is kept)")
+    args = parser.parse_args()
+
+    cli = [sys.executable, "-m", "intelligent_file_compressor.cli.main"]
+    with tempfile.TemporaryDirectory() as tmp:
+        sample = os.path.join(tmp, "tiny.log")
+        with open(sample, 'w') as f:
+            f.write("2024-01-01 00:00:00 INFO service started\n")
+        subprocess.run(cli + ["compress", sample], check=True, stdout=subprocess.DEVNULL)
+
+        commands = [
+            ("python -c pass", [sys.executable, "-c", "pass"]),
+            ("ifc --help", cli + ["--help"]),
+            ("ifc stats", cli + ["stats", sample + ".ifc"]),
+            ("ifc compress", cli + ["compress", sample]),
+            ("ifc decompress", cli + ["decompress", sample + ".ifc"]),
+        ]
+        print(f"{'command':<16} {'median ms':>10}")
+        for name, cmd in commands:
+            print(f"{name:<16} {wall(cmd, args.runs) * 1000:>10.1f}")
+
+if __name__ == "__main__":
+    main()
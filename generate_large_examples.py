@@ -2,100 +2,114 @@ import os
 import json
 import csv
 import random
-import time
 from datetime import datetime, timedelta
 
 OUTPUT_DIR = "intelligent_file_compressor/examples"
-os.makedirs(OUTPUT_DIR, exist_ok=True)
 
-def generate_json(filename, size_mb=1):
+# Generators take an optional seed (same seed, same bytes) and either a
+# record count or a target size in MB, so benchmark corpora of any scale
+# can be produced without holding the whole file in memory.
+
+def generate_json(filename, size_mb=1, output_dir=OUTPUT_DIR, seed=None):
     print(f"Generating {filename}...")
     # Create a structure that compresses well:
     # 1. Repetitive keys (Dictionary)
     # 2. Monotonic integers (Delta)
-    
-    data = []
+    rng = random.Random(seed)
+    os.makedirs(output_dir, exist_ok=True)
+    filepath = os.path.join(output_dir, filename)
+
     base_int = 1000
     target_size = size_mb * 1024 * 1024
-    
-    while True:
-        # Create a batch
-        batch = []
-        for _ in range(1000):
-            base_int += random.randint(1, 5) # Monotonic increase
+    written = 0
+
+    # Streamed item by item; the output is exactly json.dump(data, f, indent=2)
+    with open(filepath, 'w') as f:
+        f.write("[")
+        while written < target_size:
+            base_int += rng.randint(1, 5) # Monotonic increase
             item = {
                 "id": base_int,
-                "category": random.choice(["A", "B", "C", "D", "E"]),
+                "category": rng.choice(["A", "B", "C", "D", "E"]),
                 "status": "active",
                 "details": {
                     "timestamp": base_int * 10,
                     "checked": True
                 }
             }
-            batch.append(item)
-        
-        data.extend(batch)
-        
-        # Check size roughly
-        current_size = len(json.dumps(data))
-        if current_size >= target_size:
-            break
-            
-    with open(os.path.join(OUTPUT_DIR, filename), 'w') as f:
-        json.dump(data, f, indent=2)
-    print(f"Done. Size: {os.path.getsize(os.path.join(OUTPUT_DIR, filename)) / 1024:.2f} KB")
-
-def generate_csv(filename, rows=50000):
+            chunk = ("\n  " if written == 0 else ",\n  ") + json.dumps(item, indent=2).replace("\n", "\n  ")
+            f.write(chunk)
+            written += len(chunk)
+        f.write("\n]")
+    print(f"Done. Size: {os.path.getsize(filepath) / 1024:.2f} KB")
+
+def generate_csv(filename, rows=50000, output_dir=OUTPUT_DIR, seed=None, size_mb=None):
     print(f"Generating {filename}...")
-    filepath = os.path.join(OUTPUT_DIR, filename)
-    
+    rng = random.Random(seed)
+    os.makedirs(output_dir, exist_ok=True)
+    filepath = os.path.join(output_dir, filename)
+    target_size = size_mb * 1024 * 1024 if size_mb else None
+
     with open(filepath, 'w', newline='') as f:
         writer = csv.writer(f)
         writer.writerow(["ID", "Category", "Value", "Description"])
-        
+
         id_counter = 1000
         categories = ["Hardware", "Software", "Service", "Consulting", "Other"] * 5
         descriptions = ["Standard Item", "Premium Item", "Legacy Item", "Refurbished Item"] * 5
-        
-        for _ in range(rows):
-            id_counter += random.randint(1, 3) # Delta friendly
-            cat = random.choice(categories) # Dictionary friendly
-            val = random.randint(100, 9999)
-            desc = random.choice(descriptions)
-            
+
+        written = 0
+        while (written < target_size) if target_size else (rows > 0):
+            id_counter += rng.randint(1, 3) # Delta friendly
+            cat = rng.choice(categories) # Dictionary friendly
+            val = rng.randint(100, 9999)
+            desc = rng.choice(descriptions)
+
             writer.writerow([id_counter, cat, val, desc])
-            
+            written += len(str(id_counter)) + len(cat) + len(str(val)) + len(desc) + 5
+            rows -= 1
+
     print(f"Done. Size: {os.path.getsize(filepath) / 1024:.2f} KB")
 
-def generate_log(filename, lines=50000):
+def generate_log(filename, lines=50000, output_dir=OUTPUT_DIR, seed=None, size_mb=None):
     print(f"Generating {filename}...")
-    filepath = os.path.join(OUTPUT_DIR, filename)
-    
-    start_time = datetime.now()
-    
+    rng = random.Random(seed)
+    os.makedirs(output_dir, exist_ok=True)
+    filepath = os.path.join(output_dir, filename)
+    target_size = size_mb * 1024 * 1024 if size_mb else None
+
+    start_time = datetime(2024, 1, 1)
+
     with open(filepath, 'w') as f:
-        for i in range(lines):
+        written = 0
+        i = 0
+        while (written < target_size) if target_size else (i < lines):
             ts = start_time + timedelta(seconds=i)
             ts_str = ts.strftime("%Y-%m-%d %H:%M:%S")
-            
-            level = random.choice(["INFO", "INFO", "INFO", "WARN", "ERROR"])
-            msg = random.choice([
+
+            level = rng.choice(["INFO", "INFO", "INFO", "WARN", "ERROR"])
+            msg = rng.choice([
                 "Connection established successfully",
                 "User logged in from 192.168.1.1",
                 "Database query executed in 0.05s",
                 "Cache miss for key user_123",
                 "Retrying operation after timeout"
             ])
-            
-            f.write(f"{ts_str} {level} {msg}\n")
-            
+
+            line = f"{ts_str} {level} {msg}\n"
+            f.write(line)
+            written += len(line)
+            i += 1
+
     print(f"Done. Size: {os.path.getsize(filepath) / 1024:.2f} KB")
 
-def generate_text(filename, size_mb=1):
+def generate_text(filename, size_mb=1, output_dir=OUTPUT_DIR, seed=None):
     print(f"Generating {filename}...")
-    filepath = os.path.join(OUTPUT_DIR, filename)
+    rng = random.Random(seed)
+    os.makedirs(output_dir, exist_ok=True)
+    filepath = os.path.join(output_dir, filename)
     target_size = size_mb * 1024 * 1024
-    
+
     words = [
         "lorem", "ipsum", "dolor", "sit", "amet", "consectetur", "adipiscing", "elit",
         "sed", "do", "eiusmod", "tempor", "incididunt", "ut", "labore", "et", "dolore",
@@ -103,12 +117,14 @@ def generate_text(filename, size_mb=1):
         "exercitation", "ullamco", "laboris", "nisi", "ut", "aliquip", "ex", "ea",
         "commodo", "consequat"
     ]
-    
+
     with open(filepath, 'w') as f:
-        while f.tell() < target_size:
-            line = " ".join(random.choices(words, k=20)) + ".\n"
+        written = 0
+        while written < target_size:
+            line = " ".join(rng.choices(words, k=20)) + ".\n"
             f.write(line)
-            
+            written += len(line)
+
     print(f"Done. Size: {os.path.getsize(filepath) / 1024:.2f} KB")
 
 if __name__ == "__main__":
@@ -0,0 +1,3 @@
+from intelligent_file_compressor.cli.main import main
+
+main()
@@ -0,0 +1,56 @@
+import base64
+import hashlib
+from typing import Dict, Any, Iterable, Tuple
+
+class BloomFilter:
+    """
+    Set membership with no false negatives and a small false-positive rate.
+    Used as a per-block index: "can this block contain symbol s?".
+    Positions come from double hashing a single BLAKE2b digest.
+    """
+    BITS_PER_ITEM = 10 # ~1% false positives with 7 hashes
+    HASHES = 7
+
+    def __init__(self, size_bits: int, hashes: int = HASHES):
+        self.size_bits = max(8, (size_bits + 7) // 8 * 8)
+        self.hashes = hashes
+        self.bits = bytearray(self.size_bits // 8)
+
+    @classmethod
+    def of(cls, items: Iterable[str]) -> 'BloomFilter':
+        items = set(items)
+        bloom = cls(len(items) * cls.BITS_PER_ITEM)
+        for item in items:
+            bloom.add(item)
+        return bloom
+
+    @staticmethod
+    def digest(item: str) -> Tuple[int, int]:
+        """Hash once per item; reuse the result to probe many filters."""
+        d = hashlib.blake2b(item.encode('utf-8'), digest_size=16).digest()
+        return int.from_bytes(d[:8], 'big'), int.from_bytes(d[8:], 'big') | 1
+
+    def _positions(self, digest: Tuple[int, int]):
+        h1, h2 = digest
+        for i in range(self.hashes):
+            yield (h1 + i * h2) % self.size_bits
+
+    def add(self, item: str):
+        for pos in self._positions(BloomFilter.digest(item)):
+            self.bits[pos >> 3] |= 1 << (pos & 7)
+
+    def contains_digest(self, digest: Tuple[int, int]) -> bool:
+        return all(self.bits[pos >> 3] >> (pos & 7) & 1 for pos in self._positions(digest))
+
+    def __contains__(self, item: str) -> bool:
+        return self.contains_digest(BloomFilter.digest(item))
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"k": self.hashes, "bits": base64.b64encode(bytes(self.bits)).decode('ascii')}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'BloomFilter':
+        bits = base64.b64decode(data["bits"])
+        bloom = cls(len(bits) * 8, data["k"])
+        bloom.bits = bytearray(bits)
+        return bloom
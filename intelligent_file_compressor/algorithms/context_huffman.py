@@ -0,0 +1,149 @@
+from collections import Counter, defaultdict
+from typing import Dict, List, Any, Callable, Iterator
+from .huffman import HuffmanEncoder, bit_string, peek_table, decode_long
+from ..utils.bit_stream import BitWriter
+
+class ContextHuffmanEncoder:
+    """
+    Order-1 context-modelled Huffman coding.
+    The table used for a token is selected by the class of the previous token
+    (see `context_of`). Each context table keeps at most `max_symbols` of its
+    most frequent tokens plus an ESCAPE symbol; escaped tokens are then coded
+    with a shared fallback table.
+    """
+    ESCAPE = "" # Tokenizers never produce empty tokens
+
+    def __init__(self, context_of: Callable[[str], str], start: str, max_symbols: int = 1024):
+        self.context_of = context_of
+        self.start = start
+        self.max_symbols = max_symbols
+        self.tables = {}  # context -> HuffmanEncoder
+        self.fallback = HuffmanEncoder()
+        self.total_tokens = 0
+        self.counts = defaultdict(Counter) # observed, not yet built: context -> token counts
+
+    def train(self, tokens: Iterator[Any]):
+        self.observe(tokens)
+        self.build()
+
+    def observe(self, tokens: Iterator[Any]):
+        """Adds token counts per context; the context starts over at `start`."""
+        counts = self.counts
+        context_of = self._cached_context_of()
+        ctx = self.start
+        for token in tokens:
+            token = str(token)
+            counts[ctx][token] += 1
+            ctx = context_of(token)
+
+    def build(self):
+        """Builds the context and fallback tables from the observed counts."""
+        counts, self.counts = self.counts, defaultdict(Counter)
+        escaped = Counter()
+        self.tables = {}
+        self.total_tokens = 0
+        for ctx, counter in counts.items():
+            self.total_tokens += sum(counter.values())
+            kept = dict(counter.most_common(self.max_symbols))
+            for token, count in counter.items():
+                if token not in kept:
+                    escaped[token] += count
+            missed = sum(counter.values()) - sum(kept.values())
+            if missed:
+                kept[self.ESCAPE] = missed
+            table = HuffmanEncoder()
+            table.build_from_frequencies(kept)
+            self.tables[ctx] = table
+        self.fallback.build_from_frequencies(escaped)
+
+    def encode(self, tokens: Iterator[Any], writer: BitWriter, ctx: str = None) -> str:
+        """
+        Writes the codes of tokens. Pass the returned context back in as ctx
+        to continue the same stream with the next batch of tokens.
+        """
+        if not self.tables:
+            raise ValueError("Context model not built. Call train() first.")
+
+        context_of = self._cached_context_of()
+        fallback = self.fallback.codes
+        ctx = self.start if ctx is None else ctx
+        for token in tokens:
+            token = str(token)
+            codes = self.tables[ctx].codes
+            code = codes.get(token)
+            if code is None:
+                if token not in fallback:
+                    raise KeyError(f"Token '{token}' not found in context model.")
+                writer.write_string(codes[self.ESCAPE])
+                code = fallback[token]
+            writer.write_string(code)
+            ctx = context_of(token)
+        return ctx
+
+    def decode(self, data: bytes, count: int) -> List[str]:
+        if count == 0:
+            return []
+
+        decoders = {}
+        max_len = 1
+        for ctx, table in self.tables.items():
+            lookup, peek, longest = peek_table(table.reverse_mapping)
+            decoders[ctx] = (lookup, peek, longest, table.reverse_mapping)
+            max_len = max(max_len, longest)
+        if self.fallback.reverse_mapping:
+            fb = self.fallback.reverse_mapping
+            fb_lookup, fb_peek, fb_longest = peek_table(fb)
+            max_len = max(max_len, fb_longest)
+
+        bits, total = bit_string(data, 2 * max_len)
+        context_of = self._cached_context_of()
+        escape = self.ESCAPE
+
+        decoded = []
+        append = decoded.append
+        pos = 0
+        ctx = self.start
+        for _ in range(count):
+            lookup, peek, longest, mapping = decoders[ctx]
+            entry = lookup.get(bits[pos:pos + peek])
+            if entry is None:
+                entry = decode_long(bits, pos, peek, longest, mapping)
+            pos += entry[1]
+            token = entry[0]
+            if token == escape:
+                entry = fb_lookup.get(bits[pos:pos + fb_peek])
+                if entry is None:
+                    entry = decode_long(bits, pos, fb_peek, fb_longest, fb)
+                pos += entry[1]
+                token = entry[0]
+            if pos > total:
+                raise ValueError("Corrupt Huffman stream: unexpected end of data.")
+            append(token)
+            ctx = context_of(token)
+        return decoded
+
+    def _cached_context_of(self) -> Callable[[str], str]:
+        cache = {}
+        context_of = self.context_of
+
+        def lookup(token: str) -> str:
+            ctx = cache.get(token)
+            if ctx is None:
+                ctx = cache[token] = context_of(token)
+            return ctx
+        return lookup
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "tables": {ctx: table.to_lengths() for ctx, table in self.tables.items()},
+            "fallback": self.fallback.to_lengths()
+        }
+
+    def from_dict(self, data: Dict[str, Any]):
+        self.tables = {}
+        for ctx, lengths in data["tables"].items():
+            table = HuffmanEncoder()
+            table.from_lengths(lengths)
+            self.tables[ctx] = table
+        self.fallback = HuffmanEncoder()
+        self.fallback.from_lengths(data["fallback"])
@@ -16,12 +16,26 @@ class DictionaryEncoder:
     def get_value(self, id: int) -> Any:
         return self.reverse.get(id)
 
-    def to_dict(self) -> Dict[int, Any]:
+    def to_dict(self, after: int = 0) -> Dict[int, Any]:
+        """Entries with an ID above `after` (all entries by default)."""
+        if after:
+            return {k: v for k, v in self.reverse.items() if k > after}
         return self.reverse
 
+    def max_id(self) -> int:
+        return self.next_id - 1
+
     def from_dict(self, data: Dict[str, Any]):
         # JSON keys are always strings, convert back to int
         self.reverse = {int(k): v for k, v in data.items()}
         self.forward = {v: k for k, v in self.reverse.items()}
         if self.reverse:
             self.next_id = max(self.reverse.keys()) + 1
+
+    def update(self, data: Dict[str, Any]):
+        """Add entries (e.g. from a shared dictionary) keeping existing IDs."""
+        for k, v in data.items():
+            key_id = int(k)
+            self.reverse[key_id] = v
+            self.forward[v] = key_id
+            self.next_id = max(self.next_id, key_id + 1)
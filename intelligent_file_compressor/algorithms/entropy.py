@@ -0,0 +1,72 @@
+from abc import ABC, abstractmethod
+from typing import Dict, List, Any, Iterator
+
+class EntropyCoder(ABC):
+    """
+    Common interface of the entropy coding backends (Huffman, rANS).
+    A coder is trained on a token sample, then encodes a token list into a
+    standalone byte string that decodes given the token count.
+    """
+    NAME = ""
+
+    @abstractmethod
+    def train(self, tokens: Iterator[Any]):
+        """Build the model from token frequencies."""
+        pass
+
+    @abstractmethod
+    def build_from_frequencies(self, counts: Dict[str, int]):
+        """Build the model from symbol -> count (e.g. merged over many blocks)."""
+        pass
+
+    @abstractmethod
+    def encode_bytes(self, tokens: Iterator[Any]) -> bytes:
+        """Encode tokens with the trained model."""
+        pass
+
+    @abstractmethod
+    def decode_bytes(self, data: bytes, count: int) -> List[str]:
+        """Decode exactly `count` tokens."""
+        pass
+
+    @abstractmethod
+    def has_symbol(self, symbol: str) -> bool:
+        """Whether the model can code `symbol`."""
+        pass
+
+    @abstractmethod
+    def alphabet(self) -> List[str]:
+        """Every symbol the model can code."""
+        pass
+
+    @abstractmethod
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialize the model for the file header."""
+        pass
+
+    @abstractmethod
+    def from_dict(self, data: Dict[str, Any]):
+        """Restore a model written by to_dict."""
+        pass
+
+
+def coder_classes() -> Dict[str, type]:
+    from .huffman import HuffmanEncoder
+    from .rans import RANSEncoder
+    return {HuffmanEncoder.NAME: HuffmanEncoder, RANSEncoder.NAME: RANSEncoder}
+
+def create_coder(name: str) -> EntropyCoder:
+    """Instantiate an entropy coder by name ('huffman' or 'rans')."""
+    classes = coder_classes()
+    if name not in classes:
+        raise ValueError(f"Unknown entropy coder: {name}")
+    return classes[name]()
+
+def load_coder(model_data: Dict[str, Any]) -> EntropyCoder:
+    """Restore a coder from header metadata of the form {name: model}."""
+    for name, cls in coder_classes().items():
+        if name in model_data:
+            coder = cls()
+            coder.from_dict(model_data[name])
+            return coder
+    raise ValueError(f"No known entropy model in {sorted(model_data)}")
@@ -1,71 +1,111 @@
-import heapq
 from collections import Counter
+from itertools import groupby
+from operator import itemgetter
 from typing import Dict, List, Any, Tuple, Iterator
+from .entropy import EntropyCoder
 from ..utils.bit_stream import BitWriter, BitReader
 
-class HuffmanNode:
-    def __init__(self, char, freq):
-        self.char = char
-        self.freq = freq
-        self.left = None
-        self.right = None
-
-    def __lt__(self, other):
-        return self.freq < other.freq
-
-class HuffmanEncoder:
+class HuffmanEncoder(EntropyCoder):
     """
     Canonical Huffman Encoder.
     """
+    NAME = "huffman"
+    PEEK_BITS = 12
+    MAX_CODE_LENGTH = 24 # longest code built; bounds decode_long and the decoders' bit buffers
+
     def __init__(self):
         self.codes = {}
         self.reverse_mapping = {}
+        self._lookup = None # cached peek table for decode_bytes
 
     def build_tree(self, tokens: List[Any]) -> Dict[str, str]:
         """Build Huffman tree and return codebook."""
         # Convert tokens to string keys for frequency counting
-        freq = Counter(str(t) for t in tokens)
+        return self.build_from_frequencies(Counter(str(t) for t in tokens))
+
+    def build_from_frequencies(self, freq: Dict[str, int]) -> Dict[str, str]:
+        """Build canonical codes from a symbol -> count mapping."""
+        self.codes = {}
+        self.reverse_mapping = {}
+        self._lookup = None
         self.total_tokens = sum(freq.values())
-        
-        heap = []
-        for key, count in freq.items():
-            heapq.heappush(heap, HuffmanNode(key, count))
 
-        if not heap:
+        if not freq:
             return {}
-            
-        if len(heap) == 1:
-            node = heap[0]
-            self.codes[node.char] = "0"
-            self.reverse_mapping["0"] = node.char
-            return self.codes
 
-        while len(heap) > 1:
-            node1 = heapq.heappop(heap)
-            node2 = heapq.heappop(heap)
-            merged = HuffmanNode(None, node1.freq + node2.freq)
-            merged.left = node1
-            merged.right = node2
-            heapq.heappush(heap, merged)
+        if len(freq) == 1:
+            sym = next(iter(freq))
+            self.codes[sym] = "0"
+            self.reverse_mapping["0"] = sym
+            return self.codes
 
-        root = heap[0]
-        self._make_codes(root, "")
+        # Least frequent first, ties by symbol so the lengths do not depend
+        # on dict order (two sorts with plain keys beat one on tuples)
+        ordered = sorted(freq)
+        ordered.sort(key=freq.__getitem__)
+        lengths = code_lengths([freq[sym] for sym in ordered], self.MAX_CODE_LENGTH)
+        # Lengths descend along `ordered`: canonical order is its runs of
+        # equal lengths from the end, each sorted by symbol
+        canonical = []
+        for length, run in groupby(zip(reversed(lengths), reversed(ordered)), key=itemgetter(0)):
+            canonical.extend((sym, length) for sym in sorted(sym for _, sym in run))
+        self._assign_codes(canonical)
         return self.codes
 
-    def _make_codes(self, node, current_code):
-        if node is None:
-            return
-        if node.char is not None:
-            self.codes[node.char] = current_code
-            self.reverse_mapping[current_code] = node.char
-            return
-        self._make_codes(node.left, current_code + "0")
-        self._make_codes(node.right, current_code + "1")
+    def set_code_lengths(self, lengths: Dict[str, int]):
+        """Assign canonical codes: ordered by (length, symbol), counting up."""
+        self._assign_codes(sorted(lengths.items(), key=lambda kv: (kv[1], kv[0])))
+
+    def _assign_codes(self, ordered: Iterator[Tuple[str, int]]):
+        """Assign codes to (symbol, length) pairs already in canonical order."""
+        self.codes = {}
+        self.reverse_mapping = {}
+        self._lookup = None
+        code = 0
+        prev_len = 0
+        spec = ""
+        for sym, length in ordered:
+            if length != prev_len:
+                code <<= length - prev_len
+                spec = f'0{length}b'
+            bits = format(code, spec)
+            self.codes[sym] = bits
+            self.reverse_mapping[bits] = sym
+            code += 1
+            prev_len = length
+
+    def to_lengths(self) -> Dict[str, Any]:
+        """
+        Compact canonical serialization:
+        n = number of codes per length (1, 2, ...), s = symbols in canonical order.
+        """
+        ordered = sorted(self.codes, key=lambda sym: (len(self.codes[sym]), sym))
+        counts = [0] * max((len(c) for c in self.codes.values()), default=0)
+        for sym in ordered:
+            counts[len(self.codes[sym]) - 1] += 1
+        return {"n": counts, "s": ordered}
+
+    def from_lengths(self, data: Dict[str, Any]):
+        # Symbols are stored in canonical order already: no need to sort again
+        lengths = [i + 1 for i, n in enumerate(data["n"]) for _ in range(n)]
+        self._assign_codes(zip(data["s"], lengths))
 
     def train(self, tokens: Iterator[Any]):
         """Builds the Huffman tree from tokens."""
         self.build_tree(tokens)
 
+    def has_symbol(self, symbol: str) -> bool:
+        return symbol in self.codes
+
+    def alphabet(self) -> List[str]:
+        return list(self.codes)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return self.to_lengths()
+
+    def from_dict(self, data: Dict[str, Any]):
+        self.from_lengths(data)
+
     def encode(self, tokens: Iterator[Any], writer: BitWriter):
         """
         Encodes tokens into the bit writer using existing tree.
@@ -81,9 +121,28 @@ class HuffmanEncoder:
                 raise KeyError(f"Token '{token}' not found in Huffman tree.")
             writer.write_string(code)
 
+    def encode_bytes(self, tokens: Iterator[Any]) -> bytes:
+        """
+        Encodes tokens into a standalone, zero-padded byte string.
+        Used for the independent streams of the multi-stream container.
+        """
+        if not self.codes:
+            raise ValueError("Huffman tree not built. Call train() first.")
+
+        codes = self.codes
+        try:
+            bits = "".join([codes[str(t)] for t in tokens])
+        except KeyError as e:
+            raise KeyError(f"Token {e} not found in Huffman tree.")
+        if not bits:
+            return b""
+        pad = -len(bits) % 8
+        return int(bits + "0" * pad, 2).to_bytes((len(bits) + pad) // 8, 'big')
+
     def decode(self, reader: BitReader, codebook: Dict[str, str], limit: int = None) -> List[str]:
         """
-        Decodes bits back to token keys (strings).
+        Decodes bits back to token keys (strings): `limit` of them, or up
+        to the end of the data. Raises ValueError if the data ends early.
         """
         self.reverse_mapping = codebook
         decoded = []
@@ -104,6 +163,146 @@ class HuffmanEncoder:
                     decoded.append(self.reverse_mapping[current_code])
                     current_code = ""
         except EOFError:
-            pass
-                
+            # Without a limit the stream ends where the data does; a longer
+            # leftover than the zero padding means the data was cut short
+            if limit is not None or len(current_code) >= 8:
+                raise ValueError("Corrupt Huffman stream: unexpected end of data.")
+
         return decoded
+
+    def decode_bytes(self, data: bytes, count: int, codebook: Dict[str, str] = None) -> List[str]:
+        """
+        Decodes exactly `count` tokens from a byte string produced by encode_bytes.
+        Uses a peek table so most symbols cost a single dict lookup.
+        """
+        mapping = codebook if codebook is not None else self.reverse_mapping
+        if count == 0:
+            return []
+        if not mapping:
+            raise ValueError("Huffman codebook is empty.")
+
+        if codebook is None:
+            # Models are reused across files (shared dictionaries), so cache the table
+            if self._lookup is None:
+                self._lookup = peek_table(mapping)
+            table, peek, max_len = self._lookup
+        else:
+            table, peek, max_len = peek_table(mapping)
+        bits, total = bit_string(data, max_len)
+
+        decoded = []
+        append = decoded.append
+        pos = 0
+        for _ in range(count):
+            entry = table.get(bits[pos:pos + peek])
+            if entry is None:
+                entry = decode_long(bits, pos, peek, max_len, mapping)
+            append(entry[0])
+            pos += entry[1]
+            if pos > total:
+                raise ValueError("Corrupt Huffman stream: unexpected end of data.")
+        return decoded
+
+
+def code_lengths(weights: List[int], max_length: int) -> List[int]:
+    """
+    Huffman code lengths for weights in ascending order (at least two),
+    none longer than max_length: lengths[i] is the code length of
+    weights[i], so they come out in descending order.
+
+    Minimum-redundancy lengths are computed in place over the sorted array
+    (Moffat and Katajainen): leaves and merged nodes are both taken in
+    ascending order, so the two are merged like two queues, without a heap
+    or tree nodes. If the longest code is too long, the count of codes per
+    length is repaired as in JPEG (Annex K.3): each pair of codes over the
+    limit becomes one code a bit shorter, and the other takes a leaf one
+    level under a shorter code, keeping the code complete.
+    """
+    n = len(weights)
+    if n > 1 << max_length:
+        raise ValueError(f"{n} symbols do not fit in codes of {max_length} bits")
+    a = list(weights)
+
+    # Left to right: merged weights, leaving parent pointers behind
+    a[0] += a[1]
+    root, leaf = 0, 2
+    for nxt in range(1, n - 1):
+        if leaf >= n or a[root] < a[leaf]:
+            a[nxt] = a[root]
+            a[root] = nxt
+            root += 1
+        else:
+            a[nxt] = a[leaf]
+            leaf += 1
+        if leaf >= n or (root < nxt and a[root] < a[leaf]):
+            a[nxt] += a[root]
+            a[root] = nxt
+            root += 1
+        else:
+            a[nxt] += a[leaf]
+            leaf += 1
+
+    # Right to left: depths of the merged nodes
+    a[n - 2] = 0
+    for nxt in range(n - 3, -1, -1):
+        a[nxt] = a[a[nxt]] + 1
+
+    # Right to left: depths of the leaves
+    available, used, depth = 1, 0, 0
+    root, nxt = n - 2, n - 1
+    while available > 0:
+        while root >= 0 and a[root] == depth:
+            used += 1
+            root -= 1
+        while available > used:
+            a[nxt] = depth
+            nxt -= 1
+            available -= 1
+        available, used, depth = 2 * used, 0, depth + 1
+
+    if a[0] <= max_length:
+        return a
+
+    counts = [0] * (a[0] + 1)
+    for length in a:
+        counts[length] += 1
+    for length in range(a[0], max_length, -1):
+        while counts[length]:
+            shorter = length - 2
+            while not counts[shorter]:
+                shorter -= 1
+            counts[length] -= 2
+            counts[length - 1] += 1
+            counts[shorter + 1] += 2
+            counts[shorter] -= 1
+    return [length for length in range(max_length, 0, -1) for _ in range(counts[length])]
+
+def bit_string(data: bytes, pad: int) -> Tuple[str, int]:
+    """Returns data as a '0'/'1' string with `pad` zero bits appended, and its unpadded length."""
+    bits = format(int.from_bytes(data, 'big'), f'0{len(data) * 8}b') if data else ""
+    return bits + "0" * pad, len(bits)
+
+def peek_table(mapping: Dict[str, str]) -> Tuple[Dict[str, Tuple[str, int]], int, int]:
+    """
+    Builds a lookup table over the next `peek` bits -> (symbol, code length)
+    for every code no longer than the peek window.
+    """
+    max_len = max(len(c) for c in mapping)
+    peek = min(max_len, HuffmanEncoder.PEEK_BITS)
+    table = {}
+    for code, symbol in mapping.items():
+        if len(code) <= peek:
+            fill = peek - len(code)
+            for i in range(1 << fill):
+                suffix = format(i, f'0{fill}b') if fill else ""
+                table[code + suffix] = (symbol, len(code))
+    return table, peek, max_len
+
+def decode_long(bits: str, pos: int, peek: int, max_len: int, mapping: Dict[str, str]) -> Tuple[str, int]:
+    """Slow path for codes longer than the peek window."""
+    length = peek + 1
+    while length <= max_len and bits[pos:pos + length] not in mapping:
+        length += 1
+    if length > max_len:
+        raise ValueError("Corrupt Huffman stream: invalid code.")
+    return mapping[bits[pos:pos + length]], length
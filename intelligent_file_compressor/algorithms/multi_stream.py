@@ -0,0 +1,305 @@
+from collections import Counter
+from typing import Dict, List, Any, Tuple, Callable, Iterable
+from .entropy import create_coder, load_coder
+
+# Escapes: with escape on, every model fitted here also has ESCAPE, a
+# symbol that codes a token the model does not know. The token itself goes, in order, into a
+# side stream `<name>/esc` after the stream: each one as a varint byte
+# length and its UTF-8 bytes. A token that happens to equal ESCAPE is
+# always escaped, so ESCAPE is never a real symbol of such a model.
+ESCAPE = "\x1b"
+ESCAPED = "/esc"
+
+class MultiStreamCoder:
+    """
+    Context-separated entropy coding.
+    Every token class (stream) gets its own entropy model and its own
+    bitstream, so each stream can be decoded independently of the others.
+    A stream that only ever carries a single symbol is elided: the model
+    stores the symbol and no bits are written for it.
+
+    With escape, models of other streams escape tokens they cannot code
+    (see ESCAPE), so a model fitted on a sample, on earlier data or on
+    other files (a shared model) can still code the whole stream; elided
+    streams and models without ESCAPE cannot. It is off by default: to a
+    model that codes the very tokens it was fitted on, ESCAPE is dead
+    weight, a whole bit more for some symbol of a small Huffman alphabet.
+
+    Models can also come from a pre-trained shared model (.ifcdict); those
+    are used whenever they cover a stream and are never serialized.
+
+    Layout: [[name, token_count, byte_size], ...] in payload order.
+    """
+    def __init__(self, entropy: str = "huffman", escape: bool = False):
+        self.entropy = entropy # backend for new models: 'huffman' or 'rans'
+        self.escape = escape   # whether new models get ESCAPE
+        self.models = {}     # stream name -> EntropyCoder
+        self.constants = {}  # stream name -> the only symbol (elided)
+        self.escapes = set() # streams whose model has ESCAPE
+        self.shared_models = {}
+        self.shared_constants = {}
+        self.shared_escapes = set()
+
+    def load_shared(self, shared: 'MultiStreamCoder'):
+        """Use the models of a pre-trained coder for streams they cover."""
+        self.shared_models = dict(shared.models)
+        self.shared_constants = dict(shared.constants)
+        self.shared_escapes = set(shared.escapes)
+
+    def train(self, streams: Dict[str, List[Any]]):
+        """Builds one model per stream not already covered by a shared model."""
+        self.train_counts({name: Counter(map(str, tokens)) for name, tokens in streams.items()})
+
+    def train_counts(self, counts: Dict[str, Dict[str, int]]):
+        """
+        Same as train(), from symbol -> count mappings per stream. Streams
+        that already have a local model get a new one.
+        """
+        for name, freq in counts.items():
+            if self._use_shared(name, freq):
+                self.models.pop(name, None)
+                self.constants.pop(name, None)
+                self.escapes.discard(name)
+                continue
+            if len(freq) == 1 and not (self.escape and ESCAPE in freq):
+                self.models.pop(name, None)
+                self.escapes.discard(name)
+                self.constants[name] = next(iter(freq))
+            elif freq:
+                if self.escape:
+                    freq = dict(freq)
+                    freq[ESCAPE] = freq.get(ESCAPE, 0) + 1
+                model = create_coder(self.entropy)
+                model.build_from_frequencies(freq)
+                self.constants.pop(name, None)
+                self.models[name] = model
+                if self.escape:
+                    self.escapes.add(name)
+                else:
+                    self.escapes.discard(name)
+
+    def covers(self, name: str, symbols: Iterable[str]) -> bool:
+        """
+        Whether the current model of a stream (local or shared) has every
+        symbol, so that none of them needs an escape.
+        """
+        return not self.unknown(name, symbols)
+
+    def unknown(self, name: str, symbols: Iterable[str]) -> List[str]:
+        """The symbols the current model of a stream does not have."""
+        constant, model = self._model(name)
+        if constant is not None:
+            return [s for s in symbols if s != constant]
+        if model is not None:
+            escapes = self.escaping(name)
+            return [s for s in symbols if (escapes and s == ESCAPE) or not model.has_symbol(s)]
+        return list(symbols)
+
+    def escaping(self, name: str) -> bool:
+        """Whether the current model of a stream escapes what it does not know."""
+        if name in self.constants or name in self.models:
+            return name in self.escapes
+        return name not in self.shared_constants and name in self.shared_escapes
+
+    def _use_shared(self, name: str, freq: Dict[str, int]) -> bool:
+        """
+        Whether the shared model should code a stream with these symbol
+        counts: it has every symbol, or it escapes the others into fewer
+        literal bytes than the symbols a local model would store.
+        """
+        if name in self.shared_constants:
+            return all(s == self.shared_constants[name] for s in freq)
+        model = self.shared_models.get(name)
+        if model is None:
+            return False
+        escapes = name in self.shared_escapes
+        unknown = [s for s in freq if (escapes and s == ESCAPE) or not model.has_symbol(s)]
+        if not unknown:
+            return True
+        if not escapes:
+            return False
+        literals = sum(freq[s] * (len(s.encode('utf-8')) + 1) for s in unknown)
+        return literals < sum(len(s.encode('utf-8')) + 3 for s in freq)
+
+    def _model(self, name: str) -> Tuple[Any, Any]:
+        """Returns (constant, model) for a stream; local models win over shared ones."""
+        if name in self.constants:
+            return self.constants[name], None
+        if name in self.models:
+            return None, self.models[name]
+        if name in self.shared_constants:
+            return self.shared_constants[name], None
+        if name in self.shared_models:
+            return None, self.shared_models[name]
+        return None, None
+
+    def alphabet(self, name: str) -> List[str]:
+        """Every symbol a stream's model has, ESCAPE aside (empty for unknown streams)."""
+        constant, model = self._model(name)
+        if constant is not None:
+            return [constant]
+        if model is None:
+            return []
+        if self.escaping(name):
+            return [s for s in model.alphabet() if s != ESCAPE]
+        return model.alphabet()
+
+    def encode(self, streams: Dict[str, List[Any]]) -> Tuple[List[List[Any]], bytes]:
+        """Returns (layout, payload) using the trained models."""
+        layout = []
+        chunks = []
+        for name, tokens in streams.items():
+            constant, model = self._model(name)
+            literals = []
+            if not tokens or constant is not None:
+                data = b""
+            elif model is not None:
+                escapes = self.escaping(name)
+                try:
+                    if escapes and ESCAPE in tokens:
+                        raise KeyError(ESCAPE)
+                    data = model.encode_bytes(tokens)
+                except KeyError:
+                    # Only now pay for looking up every token
+                    if not escapes:
+                        raise
+                    tokens, literals = escape_tokens(tokens, model)
+                    data = model.encode_bytes(tokens)
+            else:
+                raise KeyError(f"No model trained for stream '{name}'.")
+            layout.append([name, len(tokens), len(data)])
+            chunks.append(data)
+            if literals:
+                data = pack_literals(literals)
+                layout.append([name + ESCAPED, len(literals), len(data)])
+                chunks.append(data)
+        return layout, b"".join(chunks)
+
+    def decode_stream(self, name: str, layout: List[List[Any]], payload: bytes) -> List[str]:
+        """Decodes a single stream without touching the others."""
+        return self.read_stream(name, layout, lambda offset, size: payload[offset:offset + size])
+
+    def read_stream(self, name: str, layout: List[List[Any]], read: Callable[[int, int], bytes]) -> List[str]:
+        """Decodes a single stream, fetching only its bytes (and escaped tokens) via read(offset, size)."""
+        tokens = []
+        offset = 0
+        for stream_name, count, size in layout:
+            if stream_name == name:
+                tokens = self._decode(name, count, read(offset, size) if size else b"")
+            elif stream_name == name + ESCAPED:
+                return unescape_tokens(tokens, unpack_literals(read(offset, size), count))
+            offset += size
+        return tokens
+
+    def decode(self, layout: List[List[Any]], payload: bytes) -> Dict[str, List[str]]:
+        """Decodes every stream in the layout."""
+        streams = {}
+        offset = 0
+        for name, count, size in layout:
+            data = payload[offset:offset + size]
+            if name.endswith(ESCAPED) and name[:-len(ESCAPED)] in streams:
+                base = name[:-len(ESCAPED)]
+                streams[base] = unescape_tokens(streams[base], unpack_literals(data, count))
+            else:
+                streams[name] = self._decode(name, count, data)
+            offset += size
+        return streams
+
+    def _decode(self, name: str, count: int, data: bytes) -> List[str]:
+        if count == 0:
+            return []
+        constant, model = self._model(name)
+        if constant is not None:
+            return [constant] * count
+        if model is None:
+            raise ValueError(f"No model for stream '{name}'.")
+        return model.decode_bytes(data, count)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serializes the file-local models only."""
+        models = {name: {"symbol": symbol} for name, symbol in self.constants.items()}
+        for name, model in self.models.items():
+            models[name] = {model.NAME: model.to_dict()}
+            if name in self.escapes:
+                models[name]["escape"] = True
+        return models
+
+    def from_dict(self, data: Dict[str, Any]):
+        self.models = {}
+        self.constants = {}
+        self.escapes = set()
+        self.update_dict(data)
+
+    def update_dict(self, data: Dict[str, Any]):
+        """
+        Replaces the local models of the streams in data (as written by
+        to_dict; {"shared": true} drops the local model of a stream that the
+        shared model covers).
+        """
+        for name, model_data in data.items():
+            self.models.pop(name, None)
+            self.constants.pop(name, None)
+            self.escapes.discard(name)
+            if "shared" in model_data:
+                continue
+            if "symbol" in model_data:
+                self.constants[name] = model_data["symbol"]
+            else:
+                self.models[name] = load_coder(model_data)
+                if model_data.get("escape"):
+                    self.escapes.add(name)
+
+
+def escape_tokens(tokens: List[Any], model: Any) -> Tuple[List[str], List[str]]:
+    """tokens with those the model does not have (and ESCAPE itself) replaced by ESCAPE, and those tokens."""
+    coded, literals = [], []
+    for token in map(str, tokens):
+        if token != ESCAPE and model.has_symbol(token):
+            coded.append(token)
+        else:
+            coded.append(ESCAPE)
+            literals.append(token)
+    return coded, literals
+
+def unescape_tokens(tokens: List[str], literals: List[str]) -> List[str]:
+    """Puts the escaped tokens back in place of the ESCAPE symbols, in order."""
+    literals = iter(literals)
+    try:
+        return [next(literals) if token == ESCAPE else token for token in tokens]
+    except StopIteration:
+        raise ValueError("Corrupt escape stream: fewer tokens than escapes.")
+
+def pack_literals(literals: List[str]) -> bytes:
+    """Each literal as a varint byte length followed by its UTF-8 bytes."""
+    out = bytearray()
+    for literal in literals:
+        data = literal.encode('utf-8')
+        n = len(data)
+        while n >= 0x80:
+            out.append(n & 0x7F | 0x80)
+            n >>= 7
+        out.append(n)
+        out += data
+    return bytes(out)
+
+def unpack_literals(data: bytes, count: int) -> List[str]:
+    """Reads `count` literals written by pack_literals."""
+    literals = []
+    pos = 0
+    try:
+        for _ in range(count):
+            n = shift = 0
+            while True:
+                byte = data[pos]
+                pos += 1
+                n |= (byte & 0x7F) << shift
+                shift += 7
+                if byte < 0x80:
+                    break
+            if pos + n > len(data):
+                raise IndexError
+            literals.append(data[pos:pos + n].decode('utf-8'))
+            pos += n
+    except IndexError:
+        raise ValueError("Corrupt escape stream: unexpected end of data.")
+    return literals
@@ -0,0 +1,173 @@
+from bisect import bisect_right
+from collections import Counter
+from typing import Dict, List, Any, Iterator
+from .entropy import EntropyCoder
+
+class RANSEncoder(EntropyCoder):
+    """
+    Static range Asymmetric Numeral Systems (rANS) coder.
+    Unlike Huffman it is not limited to whole bits per symbol, so heavily
+    skewed alphabets (e.g. SEV:1 on 95% of log lines) cost a fraction of a bit.
+
+    Byte-wise renormalization as in ryg_rans, with states in [L, 256 * L).
+    Symbols are spread round-robin over STATES interleaved states that share
+    one byte stream, which keeps the dependency chain per state short.
+
+    Payload: STATES x 5-byte final states (big-endian) | renormalization bytes
+    """
+    NAME = "rans"
+    STATES = 4
+    RANS_L = 1 << 31
+    STATE_BYTES = 5
+    MIN_SCALE_BITS = 12
+    MAX_SCALE_BITS = 24
+    TABLE_SCALE_BITS = 16 # Direct slot->symbol table up to this size
+
+    def __init__(self):
+        self.scale_bits = self.MIN_SCALE_BITS
+        self.symbols = []
+        self.freqs = {}
+        self.cums = {}
+        self.total_tokens = 0
+
+    def train(self, tokens: Iterator[Any]):
+        self.build_from_frequencies(Counter(str(t) for t in tokens))
+
+    def build_from_frequencies(self, counts: Dict[str, int]):
+        """Normalize counts to a power-of-two total, keeping every symbol >= 1."""
+        self.total_tokens = sum(counts.values())
+        symbols = sorted(counts)
+        if not symbols:
+            self._set_freqs([], [], self.MIN_SCALE_BITS)
+            return
+
+        scale_bits = max(self.MIN_SCALE_BITS, (len(symbols) * 4).bit_length())
+        if scale_bits > self.MAX_SCALE_BITS:
+            raise ValueError(f"Alphabet too large for rANS: {len(symbols)} symbols")
+        target = 1 << scale_bits
+        total = sum(counts.values())
+
+        freqs = [max(1, counts[s] * target // total) for s in symbols]
+        diff = target - sum(freqs)
+        # Hand the rounding error to the most frequent symbols
+        order = sorted(range(len(symbols)), key=lambda i: -freqs[i])
+        i = 0
+        while diff != 0:
+            idx = order[i % len(order)]
+            if diff > 0:
+                freqs[idx] += diff
+                diff = 0
+            elif freqs[idx] > 1:
+                step = min(freqs[idx] - 1, -diff)
+                freqs[idx] -= step
+                diff += step
+            i += 1
+        self._set_freqs(symbols, freqs, scale_bits)
+
+    def _set_freqs(self, symbols: List[str], freqs: List[int], scale_bits: int):
+        self.scale_bits = scale_bits
+        self.symbols = symbols
+        self.freqs = {}
+        self.cums = {}
+        self._find = None
+        cum = 0
+        for s, f in zip(symbols, freqs):
+            self.freqs[s] = f
+            self.cums[s] = cum
+            cum += f
+
+    def encode_bytes(self, tokens: Iterator[Any]) -> bytes:
+        if not self.freqs:
+            raise ValueError("rANS model not built. Call train() first.")
+
+        tokens = [str(t) for t in tokens]
+        scale = self.scale_bits
+        freqs = self.freqs
+        cums = self.cums
+        bound = (self.RANS_L >> scale) << 8
+        n_states = self.STATES
+        states = [self.RANS_L] * n_states
+        out = bytearray()
+
+        for i in range(len(tokens) - 1, -1, -1):
+            sym = tokens[i]
+            f = freqs.get(sym)
+            if f is None:
+                raise KeyError(f"Token '{sym}' not found in rANS model.")
+            j = i % n_states
+            x = states[j]
+            x_max = bound * f
+            while x >= x_max:
+                out.append(x & 0xFF)
+                x >>= 8
+            q, r = divmod(x, f)
+            states[j] = (q << scale) + r + cums[sym]
+
+        out.reverse()
+        head = b"".join(x.to_bytes(self.STATE_BYTES, 'big') for x in states)
+        return head + bytes(out)
+
+    def decode_bytes(self, data: bytes, count: int) -> List[str]:
+        if count == 0:
+            return []
+        n_states = self.STATES
+        width = self.STATE_BYTES
+        pos = n_states * width
+        if len(data) < pos:
+            raise ValueError("Corrupt rANS stream: missing state header.")
+
+        states = [int.from_bytes(data[i:i + width], 'big') for i in range(0, pos, width)]
+        scale = self.scale_bits
+        mask = (1 << scale) - 1
+        low = self.RANS_L
+        symbols = self.symbols
+        freq_list = [self.freqs[s] for s in symbols]
+        cum_list = [self.cums[s] for s in symbols]
+
+        if self._find is None:
+            # Cached: models are reused across files (shared dictionaries)
+            if scale <= self.TABLE_SCALE_BITS:
+                slot_table = []
+                for idx, f in enumerate(freq_list):
+                    slot_table.extend([idx] * f)
+                self._find = slot_table.__getitem__
+            else:
+                self._find = lambda slot: bisect_right(cum_list, slot) - 1
+        find = self._find
+
+        decoded = []
+        append = decoded.append
+        end = len(data)
+        j = 0
+        for _ in range(count):
+            x = states[j]
+            slot = x & mask
+            idx = find(slot)
+            append(symbols[idx])
+            x = freq_list[idx] * (x >> scale) + slot - cum_list[idx]
+            while x < low:
+                if pos >= end:
+                    raise ValueError("Corrupt rANS stream: unexpected end of data.")
+                x = (x << 8) | data[pos]
+                pos += 1
+            states[j] = x
+            j += 1
+            if j == n_states:
+                j = 0
+        return decoded
+
+    def has_symbol(self, symbol: str) -> bool:
+        return symbol in self.freqs
+
+    def alphabet(self) -> List[str]:
+        return list(self.symbols)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "b": self.scale_bits,
+            "s": self.symbols,
+            "f": [self.freqs[s] for s in self.symbols]
+        }
+
+    def from_dict(self, data: Dict[str, Any]):
+        self._set_freqs(data["s"], data["f"], data["b"])
@@ -1,13 +1,66 @@
 import sys
 import os
+import re
 import argparse
 
-# Add parent dir to path so we can import modules
-sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+# Package modules are imported by the commands that use them: `stats` and
+# `list` only read headers and must not pay for the compressor, the
+# strategies or multiprocessing on every invocation.
 
-from intelligent_file_compressor.core.compressor import Compressor
-from intelligent_file_compressor.core.decompressor import Decompressor
-from intelligent_file_compressor.cli.stats import show_stats
+def load_shared_models(paths):
+    from intelligent_file_compressor.core.shared_model import SharedModel
+    return [SharedModel.load(p) for p in paths]
+
+def parse_range(spec: str):
+    """'A:B' -> (A, B); A defaults to 0 and B to the end of the file."""
+    start, sep, stop = spec.partition(":")
+    if not sep:
+        raise ValueError(f"Range must look like A:B, got '{spec}'")
+    return int(start or 0), int(stop) if stop else sys.maxsize
+
+def add_profile_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument("--profile", nargs="?", const="-", metavar="JSON",
+                        help="Print a phase/counter breakdown, or write it as JSON to the given file")
+    parser.add_argument("--profile-capture", choices=["cprofile", "sample"],
+                        help="Also capture a cProfile or sampling profile (with --profile)")
+
+def make_profiler(args):
+    """Profiler for --profile (None when profiling is off)."""
+    if not args.profile:
+        return None
+    from intelligent_file_compressor.utils.profiling import Profiler
+    profiler = Profiler(capture=args.profile_capture)
+    profiler.start()
+    return profiler
+
+def report_profile(profiler, args):
+    if profiler is None:
+        return
+    profiler.stop()
+    if args.profile == "-":
+        print(profiler.format())
+    else:
+        import json
+        with open(args.profile, 'w') as f:
+            json.dump(profiler.report(), f, indent=2)
+        print(f"Profile written to {args.profile}")
+
+def stdout_closed():
+    """
+    Whoever read stdout stopped (`ifc grep app.log.ifc INFO | head -1`):
+    exit without a traceback. stdout is pointed at /dev/null first, or
+    flushing it at exit would fail all over again.
+    """
+    devnull = os.open(os.devnull, os.O_WRONLY)
+    os.dup2(devnull, sys.stdout.fileno())
+    sys.exit(1)
+
+def parse_predicate(spec: str):
+    """'price>=100' -> ('price', '>=', '100')"""
+    match = re.match(r'^(.+?)\s*(==|<=|>=|=|<|>)\s*(.*)$', spec)
+    if not match:
+        raise ValueError(f"Predicate must look like COLUMN<op>VALUE, got '{spec}'")
+    return match.group(1), match.group(2), match.group(3)
 
 def main():
     parser = argparse.ArgumentParser(description="Intelligent File Compressor")
@@ -16,14 +69,133 @@ def main():
     # Compress
     compress_parser = subparsers.add_parser("compress", help="Compress a file")
     compress_parser.add_argument("file", help="File to compress")
+    compress_parser.add_argument("--text-order", type=int, choices=[0, 1], default=0,
+                                 help="Text model order (1 = context-modelled Huffman, not with --entropy rans)")
+    compress_parser.add_argument("--entropy", choices=["huffman", "rans"], default="huffman",
+                                 help="Entropy coder backend")
+    compress_parser.add_argument("--exact", action="store_true",
+                                 help="Restore JSON byte for byte (keeps whitespace and number/escape spelling)")
+    compress_parser.add_argument("--dict", help="Shared model (.ifcdict) to compress with")
+    compress_parser.add_argument("--workers", type=int, default=1,
+                                 help="Worker processes for tokenizing/encoding blocks (LOG, CSV)")
+    compress_parser.add_argument("--append", action="store_true",
+                                 help="Logs: only compress what was added since the last --append run, as new blocks of FILE.ifc")
+    compress_parser.add_argument("--append-model", choices=["auto", "extend", "reuse"], default="auto",
+                                 help="With --append, for symbols the models do not have: refit models that cannot escape them "
+                                      "or that see them often (auto), extend every model concerned, or only escape them")
+    add_profile_arguments(compress_parser)
+
+    # Follow
+    follow_parser = subparsers.add_parser("follow", help="Compress a growing log as it is written (like tail -F)")
+    follow_parser.add_argument("file", help="Log file to follow (may be rotated; a last line without a newline "
+                                            "is stored with one when the file is rotated)")
+    follow_parser.add_argument("output", help="Appendable .ifc file to extend (created if missing)")
+    follow_parser.add_argument("--flush-bytes", type=int, default=1 << 20,
+                               help="Write a batch of blocks once this many bytes of lines are pending")
+    follow_parser.add_argument("--flush-interval", type=float, default=5.0,
+                               help="... or once the oldest pending line has waited this many seconds")
+    follow_parser.add_argument("--poll-interval", type=float, default=0.5,
+                               help="Seconds between checks of an idle file")
+    follow_parser.add_argument("--entropy", choices=["huffman", "rans"], default="huffman",
+                               help="Entropy coder backend (for a new output file)")
+    follow_parser.add_argument("--append-model", choices=["auto", "extend", "reuse"], default="auto",
+                               help="For symbols the models do not have: refit models that cannot escape them or that see "
+                                    "them often (auto), extend every model concerned, or only escape them")
 
     # Decompress
     decompress_parser = subparsers.add_parser("decompress", help="Decompress an .ifc file")
     decompress_parser.add_argument("file", help="File to decompress")
+    decompress_parser.add_argument("--dict", action="append", default=[],
+                                   help="Shared model (.ifcdict) the file was compressed with")
+    decompress_parser.add_argument("--workers", type=int, default=1,
+                                   help="Worker processes for decoding blocks (LOG, CSV)")
+    add_profile_arguments(decompress_parser)
+
+    # Train shared model
+    train_parser = subparsers.add_parser("train-dict", help="Train a shared model from sample files")
+    train_parser.add_argument("files", nargs="+", help="Sample files (all of one type)")
+    train_parser.add_argument("-o", "--output", required=True, help="Output .ifcdict file")
+    train_parser.add_argument("--id", help="Model ID stored in compressed files")
+    train_parser.add_argument("--entropy", choices=["huffman", "rans"], default="huffman",
+                              help="Entropy coder backend")
+
+    # Compress directory
+    batch_parser = subparsers.add_parser("compress-dir", help="Compress every supported file in a directory")
+    batch_parser.add_argument("src", help="Source directory")
+    batch_parser.add_argument("dst", help="Output directory (layout mirrors src)")
+    batch_parser.add_argument("--jobs", type=int, default=os.cpu_count() or 1, help="Worker processes")
+    batch_parser.add_argument("--text-order", type=int, choices=[0, 1], default=0,
+                              help="Text model order (1 = context-modelled Huffman, not with --entropy rans)")
+    batch_parser.add_argument("--entropy", choices=["huffman", "rans"], default="huffman",
+                              help="Entropy coder backend")
+    batch_parser.add_argument("--exact", action="store_true",
+                              help="Restore JSON byte for byte (keeps whitespace and number/escape spelling)")
+    batch_parser.add_argument("--dict", action="append", default=[],
+                              help="Shared model (.ifcdict), one per file type")
+
+    # Archive
+    archive_parser = subparsers.add_parser("archive", help="Compress files/directories into one .ifca archive")
+    archive_parser.add_argument("output", help="Archive to create (.ifca)")
+    archive_parser.add_argument("inputs", nargs="+", help="Files or directories to add")
+    archive_parser.add_argument("--no-shared-models", action="store_true",
+                                help="Give every member its own model")
+    archive_parser.add_argument("--entropy", choices=["huffman", "rans"], default="huffman",
+                                help="Entropy coder backend")
+    archive_parser.add_argument("--exact", action="store_true",
+                                help="Restore JSON byte for byte (keeps whitespace and number/escape spelling)")
+
+    list_parser = subparsers.add_parser("list", help="List the members of an archive")
+    list_parser.add_argument("archive", help=".ifca archive")
+
+    extract_parser = subparsers.add_parser("extract", help="Extract members of an archive")
+    extract_parser.add_argument("archive", help=".ifca archive")
+    extract_parser.add_argument("members", nargs="*", help="Members to extract (default: all)")
+    extract_parser.add_argument("-o", "--output-dir", default=".", help="Destination directory")
+
+    # Random access
+    cat_parser = subparsers.add_parser("cat", help="Print a range of lines/rows of a compressed log or CSV")
+    cat_parser.add_argument("file", help=".ifc file (LOG or CSV)")
+    cat_range = cat_parser.add_mutually_exclusive_group(required=True)
+    cat_range.add_argument("--lines", help="Log lines A:B (0-based, B exclusive)")
+    cat_range.add_argument("--rows", help="CSV data rows A:B (0-based, B exclusive, header not counted)")
+    cat_parser.add_argument("--dict", action="append", default=[],
+                            help="Shared model (.ifcdict) the file was compressed with")
+
+    path_parser = subparsers.add_parser("jsonpath", help="Extract values from a compressed JSON file")
+    path_parser.add_argument("file", help=".ifc JSON file")
+    path_parser.add_argument("path", help="JSONPath-lite expression, e.g. '$.items[*].id'")
+    path_parser.add_argument("--dict", action="append", default=[],
+                             help="Shared model (.ifcdict) the file was compressed with")
+
+    grep_parser = subparsers.add_parser("grep", help="Search a compressed log without decompressing it")
+    grep_parser.add_argument("pattern", help="Literal text to search for")
+    grep_parser.add_argument("file", help=".ifc log file")
+    grep_parser.add_argument("-E", "--regex", action="store_true", help="Treat pattern as a regular expression (scans every block)")
+    grep_parser.add_argument("-n", "--line-number", action="store_true", help="Prefix lines with their 1-based line number")
+    grep_parser.add_argument("--dict", action="append", default=[],
+                             help="Shared model (.ifcdict) the file was compressed with")
+
+    query_parser = subparsers.add_parser("query", help="Select columns/rows of a compressed CSV")
+    query_parser.add_argument("file", help=".ifc CSV file")
+    query_parser.add_argument("-c", "--columns", help="Comma-separated columns to output (default: all)")
+    query_parser.add_argument("-w", "--where", action="append", default=[],
+                              help="Predicate like 'price>=100' or 'city=Paris' (repeatable, ANDed)")
+    query_parser.add_argument("--dict", action="append", default=[],
+                              help="Shared model (.ifcdict) the file was compressed with")
+
+    # Verify
+    verify_parser = subparsers.add_parser("verify", help="Check compressed files against their checksums")
+    verify_parser.add_argument("files", nargs="+", help=".ifc files to check")
+    verify_parser.add_argument("--decode", action="store_true", help="Also decode every file completely")
+    verify_parser.add_argument("--original", help="Also compare the decoded text with this original (one file only)")
+    verify_parser.add_argument("--workers", type=int, default=4, help="Threads checking blocks (and processes decoding them)")
+    verify_parser.add_argument("--dict", action="append", default=[],
+                               help="Shared model (.ifcdict) the files were compressed with (for decoding)")
 
     # Stats
-    stats_parser = subparsers.add_parser("stats", help="Show file statistics")
-    stats_parser.add_argument("file", help=".ifc file to analyze")
+    stats_parser = subparsers.add_parser("stats", help="Show file statistics (several files: one line each and totals)")
+    stats_parser.add_argument("files", nargs="+", help=".ifc files to analyze")
+    stats_parser.add_argument("--json", action="store_true", help="Print the stats and totals as JSON")
 
     args = parser.parse_args()
 
@@ -33,25 +205,196 @@ def main():
              # Simple hack for now, argparse handles it if we add argument
              pass
              
-        c = Compressor()
+        options = {t: {"entropy": args.entropy} for t in ("json", "csv", "log", "text")}
+        options["text"]["order"] = args.text_order
+        options["json"]["exact"] = args.exact
+        shared = load_shared_models([args.dict] if args.dict else [])
+        from intelligent_file_compressor.core.compressor import Compressor
+        profiler = make_profiler(args)
+        c = Compressor(options=options, shared_models=shared, profiler=profiler, workers=args.workers)
         try:
-            c.compress(args.file, output_file)
+            if args.append:
+                c.append(args.file, output_file, args.append_model)
+            else:
+                c.compress(args.file, output_file)
+            report_profile(profiler, args)
         except Exception as e:
             print(f"Compression failed: {e}")
         
+    elif args.command == "follow":
+        import signal
+        import threading
+        from intelligent_file_compressor.core.compressor import Compressor
+        from intelligent_file_compressor.core.follow import LogFollower
+        follower = LogFollower(Compressor(options={"log": {"entropy": args.entropy}}, verbose=False),
+                               args.file, args.output, flush_bytes=args.flush_bytes,
+                               flush_interval=args.flush_interval, poll_interval=args.poll_interval,
+                               model=args.append_model)
+        stop = threading.Event()
+        signal.signal(signal.SIGTERM, lambda *_: stop.set())
+        try:
+            follower.run(stop)
+        except KeyboardInterrupt:
+            pass
+        except Exception as e:
+            print(f"Following failed: {e}")
+        print(f"{follower.records} records appended to {args.output}")
+
     elif args.command == "decompress":
         if not args.file.endswith(".ifc"):
             print("Error: Input file must be .ifc")
             return
         output_file = args.file.replace(".ifc", ".restored")
-        d = Decompressor()
+        from intelligent_file_compressor.core.decompressor import Decompressor
+        profiler = make_profiler(args)
+        d = Decompressor(shared_models=load_shared_models(args.dict), profiler=profiler, workers=args.workers)
         try:
             d.decompress(args.file, output_file)
+            report_profile(profiler, args)
         except Exception as e:
             print(f"Decompression failed: {e}")
         
+    elif args.command == "compress-dir":
+        options = {t: {"entropy": args.entropy} for t in ("json", "csv", "log", "text")}
+        options["text"]["order"] = args.text_order
+        options["json"]["exact"] = args.exact
+        from intelligent_file_compressor.core.compressor import Compressor
+        c = Compressor(options=options, shared_models=load_shared_models(args.dict), verbose=False)
+        report = c.compress_dir(args.src, args.dst, jobs=args.jobs)
+        
+        for path, error in report.failures:
+            print(f"FAILED {path}: {error}")
+        print(f"Files:       {report.files} ({len(report.failures)} failed)")
+        print(f"Input:       {report.bytes_in:,} bytes")
+        print(f"Output:      {report.bytes_out:,} bytes ({report.ratio * 100:.2f}%)")
+        print(f"Time:        {report.seconds:.2f} s ({report.throughput:.2f} MB/s)")
+        
+    elif args.command == "train-dict":
+        from intelligent_file_compressor.core.compressor import Compressor
+        options = {t: {"entropy": args.entropy} for t in ("json", "csv", "log")}
+        try:
+            model = Compressor(options=options).train_shared_model(args.files, args.id)
+            model.save(args.output)
+            print(f"Shared model '{model.id}' ({model.hash}) written to {args.output}")
+        except Exception as e:
+            print(f"Training failed: {e}")
+        
+    elif args.command == "archive":
+        options = {t: {"entropy": args.entropy} for t in ("json", "csv", "log", "text")}
+        options["json"]["exact"] = args.exact
+        from intelligent_file_compressor.core.compressor import Compressor
+        try:
+            members = Compressor(options=options).compress_archive(
+                args.inputs, args.output, share_models=not args.no_shared_models)
+            print(f"{len(members)} members written to {args.output}")
+        except Exception as e:
+            print(f"Archiving failed: {e}")
+        
+    elif args.command == "list":
+        from intelligent_file_compressor.storage.archive import IFCArchiveReader
+        with open(args.archive, 'rb') as f:
+            archive = IFCArchiveReader(f)
+        print(f"{'Original':>12} {'Compressed':>12} {'CRC32':>8}  Name")
+        for m in archive.members:
+            print(f"{m['original_size']:>12} {m['compressed_size']:>12} {m['crc32']:08x}  {m['name']}")
+        
+    elif args.command == "extract":
+        from intelligent_file_compressor.core.decompressor import Decompressor
+        try:
+            written = Decompressor().extract_archive(args.archive, args.output_dir, args.members or None)
+            for path in written:
+                print(f"Extracted {path}")
+        except Exception as e:
+            print(f"Extraction failed: {e}")
+        
+    elif args.command == "cat":
+        try:
+            from intelligent_file_compressor.core.decompressor import Decompressor
+            start, stop = parse_range(args.lines or args.rows)
+            d = Decompressor(shared_models=load_shared_models(args.dict))
+            records = d.read_records(args.file, start, stop)
+        except Exception as e:
+            print(f"Read failed: {e}")
+            return
+        try:
+            if args.rows:
+                import csv
+                csv.writer(sys.stdout, lineterminator='\n').writerows(records)
+            else:
+                for line in records:
+                    print(line)
+            sys.stdout.flush()
+        except BrokenPipeError:
+            stdout_closed()
+        
+    elif args.command == "jsonpath":
+        import json
+        from intelligent_file_compressor.core.decompressor import Decompressor
+        d = Decompressor(shared_models=load_shared_models(args.dict))
+        try:
+            for value in d.json_path(args.file, args.path):
+                print(json.dumps(value))
+            sys.stdout.flush()
+        except BrokenPipeError:
+            stdout_closed()
+        except Exception as e:
+            print(f"Query failed: {e}")
+        
+    elif args.command == "grep":
+        from intelligent_file_compressor.core.decompressor import Decompressor
+        d = Decompressor(shared_models=load_shared_models(args.dict))
+        try:
+            for number, line in d.grep(args.file, args.pattern, regex=args.regex):
+                print(f"{number + 1}:{line}" if args.line_number else line)
+            sys.stdout.flush()
+        except BrokenPipeError:
+            stdout_closed()
+        except Exception as e:
+            print(f"Search failed: {e}")
+        
+    elif args.command == "query":
+        import csv
+        from intelligent_file_compressor.core.decompressor import Decompressor
+        d = Decompressor(shared_models=load_shared_models(args.dict))
+        try:
+            columns = args.columns.split(",") if args.columns else None
+            rows = d.query(args.file, columns, [parse_predicate(w) for w in args.where])
+            writer = csv.writer(sys.stdout, lineterminator='\n')
+            for row in rows:
+                writer.writerow(row)
+            sys.stdout.flush()
+        except BrokenPipeError:
+            stdout_closed()
+        except Exception as e:
+            print(f"Query failed: {e}")
+        
+    elif args.command == "verify":
+        if args.original and len(args.files) > 1:
+            parser.error("--original takes a single file")
+        from intelligent_file_compressor.core.decompressor import Decompressor
+        d = Decompressor(shared_models=load_shared_models(args.dict), workers=args.workers)
+        failed = 0
+        for path in args.files:
+            try:
+                report = d.verify(path, decode=args.decode, original=args.original)
+            except OSError as e:
+                print(f"{path}: FAILED ({e})")
+                failed += 1
+                continue
+            if report.ok:
+                print(f"{path}: OK ({', '.join(report.checked) or 'no checksums'})")
+            else:
+                failed += 1
+                print(f"{path}: FAILED")
+                for problem in report.problems:
+                    print(f"  {problem}")
+        if failed:
+            sys.exit(1)
+
     elif args.command == "stats":
-        show_stats(args.file)
+        from intelligent_file_compressor.cli.stats import show_stats
+        if not show_stats(args.files, args.json):
+            sys.exit(1)
         
     else:
         parser.print_help()
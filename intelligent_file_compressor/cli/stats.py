@@ -1,38 +1,113 @@
+import json
 import os
-import sys
-# Add parent dir to path
-sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+from typing import Any, Dict, List
 
+from intelligent_file_compressor.core.metadata import FileMetadata
 from intelligent_file_compressor.storage.reader import IFCReader
+from intelligent_file_compressor.strategies import registry
 
-def show_stats(file_path: str):
-    if not os.path.exists(file_path):
-        print(f"File not found: {file_path}")
-        return
-
+def read_stats(file_path: str) -> Dict[str, Any]:
+    """
+    Stats of one .ifc file from its header: the payload is never read.
+    Files written before stats were stored only know their sizes.
+    """
+    with open(file_path, 'rb') as f:
+        strat_id, metadata = IFCReader.read_header(f)
+        header_size = f.tell()
+    stats = FileMetadata.from_dict(metadata.get("stats", {}))
+    if stats.compressed_size < 0:
+        stats.compressed_size = os.path.getsize(file_path)
+    if stats.header_size < 0:
+        stats.header_size = header_size
     try:
-        strat_id, metadata, compressed_data = IFCReader.read(file_path)
-        original_size = os.path.getsize(file_path) # This is actually compressed size on disk
-        # We don't store original size in IFC1 header explicitly in the spec provided!
-        # "Outputs: original size, compressed size, compression ratio"
-        # Spec says: "Metadata MUST include: dictionaries, key maps, type info, huffman codebook, delta bases"
-        # It DOES NOT explicitly say "Original Size" in the table.
-        # But stats command requires it.
-        # Let's assume we should have stored it or we can't show it accurately without decompressing.
-        # Wait, the prompt says "Outputs: original size".
-        # I should probably add it to metadata or header.
-        # For now, let's just show compressed size and metadata info.
-        
-        comp_size = len(compressed_data) + len(str(metadata)) # Approx
-        file_size = os.path.getsize(file_path)
-        
-        print(f"\n📊 Stats for {os.path.basename(file_path)}")
-        print(f"--------------------------------")
-        print(f"Strategy ID:    {strat_id}")
-        print(f"File Size:      {file_size} bytes")
-        print(f"Payload Size:   {len(compressed_data)} bytes")
-        print(f"Meta Size:      {file_size - len(compressed_data)} bytes")
-        print(f"--------------------------------")
-
-    except Exception as e:
-        print(f"Error reading stats: {e}")
+        file_type = registry.get(strat_id).file_type
+    except ValueError:
+        file_type = f"#{strat_id}"
+    entry = {"path": file_path, "strategy": file_type, "strategy_id": strat_id}
+    entry.update(stats.to_dict())
+    entry["ratio"] = round(stats.ratio, 4)
+    return entry
+
+def summarize(entries: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Totals over many files, overall and per strategy. Sizes and the ratio
+    cover only files whose original size is known; the others are counted
+    in `unknown`.
+    """
+    def total(group):
+        known = [e for e in group if e["original_size"] >= 0]
+        original = sum(e["original_size"] for e in known)
+        compressed = sum(e["compressed_size"] for e in known)
+        return {"files": len(group), "unknown": len(group) - len(known), "original_size": original,
+                "compressed_size": compressed, "ratio": round(compressed / original, 4) if original else 0.0}
+
+    by_strategy = {}
+    for entry in entries:
+        by_strategy.setdefault(entry["strategy"], []).append(entry)
+    summary = total(entries)
+    summary["strategies"] = {name: total(group) for name, group in sorted(by_strategy.items())}
+    return summary
+
+def _size(n: int) -> str:
+    return "?" if n < 0 else str(n)
+
+def _print_file(entry: Dict[str, Any]):
+    print(f"\n📊 Stats for {os.path.basename(entry['path'])}")
+    print("--------------------------------")
+    print(f"Strategy:       {entry['strategy']} (ID {entry['strategy_id']})")
+    print(f"Original Size:  {_size(entry['original_size'])} bytes")
+    print(f"File Size:      {entry['compressed_size']} bytes")
+    print(f"Meta Size:      {entry['header_size']} bytes")
+    if entry["ratio"]:
+        print(f"Ratio:          {entry['ratio'] * 100:.2f}%")
+    for label, key in (("Records", "records"), ("Tokens", "tokens"), ("Symbols", "distinct_symbols"),
+                       ("Dictionary", "dictionary_entries"), ("Codebook", "codebook_bytes"),
+                       ("Time (ms)", "time_ms")):
+        if entry[key] >= 0:
+            print(f"{label + ':':<16}{entry[key]}")
+    if entry["streams"]:
+        print(f"{'Stream':<12} {'Tokens':>10} {'Bytes':>10} {'Symbols':>8}")
+        for name, s in entry["streams"].items():
+            print(f"{name:<12} {_size(s['tokens']):>10} {_size(s['bytes']):>10} {_size(s['symbols']):>8}")
+    print("--------------------------------")
+
+def _print_summary(entries: List[Dict[str, Any]], summary: Dict[str, Any]):
+    print(f"{'Original':>12} {'Compressed':>12} {'Ratio':>7}  {'Type':<6} Name")
+    for e in entries:
+        ratio = f"{e['ratio'] * 100:.1f}%" if e["ratio"] else "?"
+        print(f"{_size(e['original_size']):>12} {e['compressed_size']:>12} {ratio:>7}  {e['strategy']:<6} {e['path']}")
+    print()
+    for name, group in list(summary["strategies"].items()) + [("total", summary)]:
+        unknown = f" ({group['unknown']} of unknown size)" if group["unknown"] else ""
+        print(f"{name + ':':<7} {group['files']} files{unknown}, {group['original_size']} -> "
+              f"{group['compressed_size']} bytes ({group['ratio'] * 100:.1f}%)")
+
+def show_stats(paths: List[str], as_json: bool = False) -> bool:
+    """
+    Prints the stats of one file in detail, or one line per file and the
+    totals for several; as_json prints {"files": [...], "summary": {...},
+    "errors": [{"path", "error"}]} and nothing else.
+    Returns False if some file could not be read.
+    """
+    entries, errors = [], []
+    for path in paths:
+        if not os.path.exists(path):
+            errors.append({"path": path, "error": "File not found"})
+            continue
+        try:
+            entries.append(read_stats(path))
+        except Exception as e:
+            errors.append({"path": path, "error": f"Error reading stats: {e}"})
+
+    summary = summarize(entries)
+    if as_json:
+        print(json.dumps({"files": entries, "summary": summary, "errors": errors}, indent=2))
+        return not errors
+    for error in errors:
+        print(f"{error['error']}: {error['path']}")
+    if len(paths) == 1:
+        for entry in entries:
+            _print_file(entry)
+    elif entries:
+        _print_summary(entries, summary)
+    return not errors
@@ -0,0 +1,185 @@
+import asyncio
+import io
+import tempfile
+from concurrent.futures import Executor
+from typing import Any, AsyncIterator, Iterator, BinaryIO
+from .compressor import Compressor
+from .decompressor import Decompressor
+from .file_detector import FileDetector
+from ..storage.reader import IFCReader
+
+# asyncio front end of Compressor and Decompressor.
+#
+# Sources are asyncio.StreamReader-like (an async read(n) returning b"" at
+# EOF) or async iterables of bytes. Sinks have write() and, like
+# asyncio.StreamWriter, optionally an async drain() that is awaited after
+# every chunk, so a slow consumer holds the encoder back.
+#
+# The event loop only moves bytes: parsing, training, encoding and decoding
+# run in `executor` (the loop's default thread pool if None). Compression
+# is one call that writes a temporary file; decoding is one block per call,
+# by a generator that lives across calls, so the executor must run in this
+# process. For parallel block coding pass a Compressor or Decompressor with
+# workers > 1.
+
+CHUNK_SIZE = 1 << 16 # bytes per read from a source / per decompressed chunk
+QUEUE_CHUNKS = 4     # source chunks buffered ahead of the decoder
+
+async def compress_stream(reader: Any, writer: Any, strategy: str = None, name: str = None,
+                          compressor: Compressor = None, executor: Executor = None):
+    """
+    Compress everything read from `reader` and write the IFC1 file to
+    `writer`. strategy is a file type ('json', 'csv', 'log', 'text', ...);
+    without it the type is detected from the extension of `name`, and
+    ValueError is raised before anything is read if that is not possible
+    (the content is never sniffed). The writer is drained but not closed.
+    """
+    async for chunk in compress_iter(reader, strategy, name, compressor, executor):
+        await _write(writer, chunk)
+
+async def decompress_stream(reader: Any, writer: Any, decompressor: Decompressor = None,
+                            executor: Executor = None):
+    """
+    Decompress the IFC1 file read from `reader` and write the original to
+    `writer`. Blocked files (LOG, CSV) are decoded while they arrive, one
+    block at a time. The writer is drained but not closed.
+    """
+    async for chunk in decompress_iter(reader, decompressor, executor):
+        await _write(writer, chunk)
+
+async def compress_iter(source: Any, strategy: str = None, name: str = None,
+                        compressor: Compressor = None, executor: Executor = None) -> AsyncIterator[bytes]:
+    """
+    The IFC1 encoding of source as an async iterator of byte chunks.
+
+    The models are fitted on the whole input before the header can be
+    written, so the input is first spooled to an anonymous temporary file
+    rather than held in memory. It is compressed into a second one, whose
+    header gets the stats like any file's (the output is the same as
+    Compressor.compress gives), which is then sent in chunks of CHUNK_SIZE.
+    The type is detected as for compress_stream, before spooling.
+    """
+    if strategy is None:
+        strategy = FileDetector.detect_name(name)
+    loop = asyncio.get_running_loop()
+    compressor = compressor or Compressor(verbose=False)
+    with tempfile.TemporaryFile() as spool, tempfile.TemporaryFile() as out:
+        async for chunk in _chunks(source):
+            await loop.run_in_executor(executor, spool.write, chunk)
+        spool.seek(0)
+        await loop.run_in_executor(executor, compressor.compress_to, spool, out, strategy, name or "")
+        out.seek(0)
+        while True:
+            chunk = await loop.run_in_executor(executor, out.read, CHUNK_SIZE)
+            if not chunk:
+                break
+            yield chunk
+
+async def decompress_iter(source: Any, decompressor: Decompressor = None,
+                          executor: Executor = None) -> AsyncIterator[bytes]:
+    """
+    The original bytes of the IFC1 file read from source, as an async
+    iterator of chunks of about CHUNK_SIZE bytes.
+
+    Incoming chunks are queued (at most QUEUE_CHUNKS ahead: reading the
+    source waits for the decoder) and the decoder reads them in the executor
+    through a blocking file object, so nothing is spooled to disk.
+    """
+    loop = asyncio.get_running_loop()
+    decompressor = decompressor or Decompressor()
+    queue = asyncio.Queue(QUEUE_CHUNKS)
+    feeder = loop.create_task(_feed(source, queue))
+    chunks = _decoded(decompressor, io.BufferedReader(_QueueReader(queue, loop), CHUNK_SIZE))
+    try:
+        while True:
+            chunk = await loop.run_in_executor(executor, next, chunks, None)
+            if chunk is None:
+                break
+            yield chunk
+        await feeder
+    finally:
+        if not feeder.done():
+            # Unblock a decoder still waiting for input, then stop reading
+            feeder.cancel()
+            while not queue.empty():
+                queue.get_nowait()
+            queue.put_nowait(None)
+
+def _decoded(decompressor: Decompressor, f: BinaryIO) -> Iterator[bytes]:
+    """Original bytes of the IFC1 file read from f, in chunks of about CHUNK_SIZE bytes."""
+    strat_id, metadata = IFCReader.read_header(f)
+    parts = []
+    size = 0
+    for text in decompressor.reconstruct_iter(strat_id, metadata, f):
+        parts.append(text)
+        size += len(text)
+        if size >= CHUNK_SIZE:
+            yield "".join(parts).encode('utf-8')
+            parts = []
+            size = 0
+    if parts:
+        yield "".join(parts).encode('utf-8')
+
+async def _chunks(source: Any) -> AsyncIterator[bytes]:
+    """Byte chunks of a StreamReader-like object or an async iterable."""
+    if hasattr(source, "read"):
+        while True:
+            chunk = await source.read(CHUNK_SIZE)
+            if not chunk:
+                return
+            yield chunk
+    elif hasattr(source, "__aiter__"):
+        async for chunk in source:
+            if chunk:
+                yield bytes(chunk)
+    else:
+        raise TypeError(f"Expected a StreamReader or an async iterable of bytes, got {type(source).__name__}")
+
+async def _feed(source: Any, queue: asyncio.Queue):
+    """Puts the chunks of source into queue, then None (EOF) or the error that ended the source."""
+    try:
+        async for chunk in _chunks(source):
+            await queue.put(chunk)
+    except Exception as e:
+        # Raised by the decoder, in the consumer's task
+        await queue.put(e)
+        return
+    await queue.put(None)
+
+async def _write(writer: Any, data: bytes):
+    writer.write(data)
+    drain = getattr(writer, "drain", None)
+    if drain is not None:
+        await drain()
+
+
+class _QueueReader(io.RawIOBase):
+    """
+    Blocking, read-only file object over the chunks an event loop puts
+    into an asyncio.Queue (None = EOF, an exception = failed source). Only
+    for use from a thread other than the loop's.
+    """
+
+    def __init__(self, queue: asyncio.Queue, loop: asyncio.AbstractEventLoop):
+        self.queue = queue
+        self.loop = loop
+        self.pending = memoryview(b"")
+        self.eof = False
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, b: Any) -> int:
+        while not self.pending and not self.eof:
+            item = asyncio.run_coroutine_threadsafe(self.queue.get(), self.loop).result()
+            if item is None:
+                self.eof = True
+            elif isinstance(item, Exception):
+                self.eof = True
+                raise item
+            else:
+                self.pending = memoryview(item)
+        n = min(len(b), len(self.pending))
+        b[:n] = self.pending[:n]
+        self.pending = self.pending[n:]
+        return n
@@ -0,0 +1,100 @@
+import os
+import time
+from dataclasses import dataclass, field
+from typing import Dict, Any, List, Tuple
+from .file_detector import FileDetector
+
+@dataclass
+class BatchReport:
+    """Aggregate result of a batch compression run."""
+    files: int = 0
+    bytes_in: int = 0
+    bytes_out: int = 0
+    seconds: float = 0.0
+    failures: List[Tuple[str, str]] = field(default_factory=list) # (path, error)
+
+    @property
+    def ratio(self) -> float:
+        return self.bytes_out / self.bytes_in if self.bytes_in else 0.0
+
+    @property
+    def throughput(self) -> float:
+        """Input MB/s over the wall-clock time of the whole batch."""
+        return self.bytes_in / (1024 * 1024) / self.seconds if self.seconds else 0.0
+
+
+def collect_files(src_dir: str, dst_dir: str) -> List[Tuple[str, str]]:
+    """
+    Walk src_dir and pair every supported file with its .ifc path under dst_dir,
+    mirroring the directory layout.
+    """
+    pairs = []
+    for dirpath, _, filenames in os.walk(src_dir):
+        for name in sorted(filenames):
+            path = os.path.join(dirpath, name)
+            if not FileDetector.is_supported(path):
+                continue
+            rel = os.path.relpath(path, src_dir)
+            pairs.append((path, os.path.join(dst_dir, rel + ".ifc")))
+    return pairs
+
+
+# --- Worker side ---
+# One Compressor per worker process: options and shared models are loaded
+# once and reused for every file the worker handles.
+_worker_compressor = None
+
+def _init_worker(options: Dict[str, Dict[str, Any]], shared_bodies: List[Tuple[int, Dict[str, Any]]]):
+    global _worker_compressor
+    from .compressor import Compressor
+    from .shared_model import SharedModel
+    shared = [SharedModel(strategy_id, body) for strategy_id, body in shared_bodies]
+    _worker_compressor = Compressor(options=options, shared_models=shared, verbose=False)
+
+def _compress_one(input_path: str, output_path: str) -> Tuple[str, int, int, str]:
+    """Returns (input_path, bytes_in, bytes_out, error)."""
+    try:
+        out_dir = os.path.dirname(output_path)
+        if out_dir:
+            os.makedirs(out_dir, exist_ok=True)
+        _worker_compressor.compress(input_path, output_path)
+        return input_path, os.path.getsize(input_path), os.path.getsize(output_path), ""
+    except Exception as e:
+        return input_path, 0, 0, str(e)
+
+
+def run_batch(compressor: Any, pairs: List[Tuple[str, str]], jobs: int = 1) -> BatchReport:
+    """
+    Compress (input, output) pairs, largest inputs first so the long jobs
+    start early and the pool drains evenly.
+    """
+    global _worker_compressor
+    pairs = sorted(pairs, key=lambda p: os.path.getsize(p[0]), reverse=True)
+    report = BatchReport()
+    start = time.perf_counter()
+
+    if jobs <= 1:
+        previous = _worker_compressor
+        _worker_compressor = compressor
+        try:
+            results = [_compress_one(i, o) for i, o in pairs]
+        finally:
+            _worker_compressor = previous
+    else:
+        # Imported here: multiprocessing is costly to load and single-file runs never need it
+        from concurrent.futures import ProcessPoolExecutor, as_completed
+        shared = [(m.strategy_id, m.body) for m in compressor.shared_models.values()]
+        with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker,
+                                 initargs=(compressor.options, shared)) as pool:
+            futures = [pool.submit(_compress_one, i, o) for i, o in pairs]
+            results = [f.result() for f in as_completed(futures)]
+
+    for path, size_in, size_out, error in results:
+        if error:
+            report.failures.append((path, error))
+            continue
+        report.files += 1
+        report.bytes_in += size_in
+        report.bytes_out += size_out
+    report.seconds = time.perf_counter() - start
+    return report
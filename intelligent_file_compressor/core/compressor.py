@@ -1,84 +1,679 @@
+import io
+import json
 import os
+import time
+import zlib
+from typing import Dict, Any, List, Optional, Tuple, BinaryIO
 from .file_detector import FileDetector
-from ..strategies.json_strategy import JSONStrategy
-from ..strategies.text_strategy import TextStrategy
-from ..strategies.csv_strategy import CSVStrategy
-from ..strategies.log_strategy import LogStrategy
+from ..strategies import registry
 from ..storage.writer import IFCWriter
-from ..utils.bit_stream import BitWriter
+from ..storage.reader import IFCReader
+from ..storage.blocks import BlockReader, BlockWriter, MODEL_FRAME, STATE_FRAME
+from .pipeline import Pipeline
+from .metadata import FileMetadata
+from .shared_model import SharedModel
+from .batch import BatchReport, run_batch, collect_files
+from .utils import file_crc32
+from ..storage.archive import IFCArchiveWriter
+from ..utils.profiling import NULL_PROFILER
+from ..utils.sources import Source, is_path, source_name, source_size
+
+# Bytes in front of the resume offset of an appendable file whose CRC is
+# kept, to notice inputs that were truncated or replaced since
+APPEND_TAIL = 4096
+
+# Blocks appends leave out of the index (or an eighth of the indexed ones,
+# if more) before one writes a new index frame: index frames grow the file
+# in proportion to its blocks, and readers scan few frames past the index
+INDEX_TAIL = 64
+
+# Inputs up to this size are coded in memory before their header is
+# written, so the header holds only the stats that are known, and no room
+# to fill them in afterwards (which would make small files several times
+# larger). Below STREAM_STATS_INPUT the per-stream stats are left out too.
+EXACT_HEADER_INPUT = 1 << 20
+STREAM_STATS_INPUT = 1 << 10
 
 class Compressor:
-    def __init__(self):
-        self.strategies = {
-            FileDetector.JSON: (1, JSONStrategy),
-            FileDetector.CSV: (2, CSVStrategy),
-            FileDetector.LOG: (3, LogStrategy),
-            FileDetector.TEXT: (4, TextStrategy)
-        }
+    def __init__(self, options: Dict[str, Dict[str, Any]] = None, shared_models: List[SharedModel] = None,
+                 verbose: bool = True, profiler=None, workers: int = 1):
+        self.verbose = verbose
+        # Worker processes per file (blocks are tokenized/encoded in parallel)
+        self.workers = workers
+        # Phase timers/counters (utils.profiling.Profiler); off by default
+        self.profiler = profiler or NULL_PROFILER
+        # Per file type strategy options, e.g. {"text": {"order": 1}, "log": {"entropy": "rans"}}
+        self.options = options or {}
+        # Pre-trained models (.ifcdict), used for files of the matching strategy
+        self.shared_models = {m.strategy_id: m for m in (shared_models or [])}
+
+    def train_shared_model(self, sample_paths: List[str], model_id: str = None) -> SharedModel:
+        """Train a shared model (.ifcdict) from sample files of one type."""
+        file_type = FileDetector.detect(sample_paths[0])
+        strat_id, strat_cls = registry.strategy_for(file_type)
+        for path in sample_paths[1:]:
+            if FileDetector.detect(path) != file_type:
+                raise ValueError(f"Mixed sample types: {path} is not {file_type}")
+        strategy = strat_cls(**self.options.get(file_type, {}))
+        return SharedModel.train(strat_id, strategy, sample_paths, model_id)
 
     def compress(self, input_path: str, output_path: str):
-        print(f"Compressing {input_path}...")
+        if self.verbose:
+            print(f"Compressing {input_path}...")
         
-        # 1. Detect
+        with open(output_path, 'wb') as f:
+            self.compress_to(input_path, f)
+
+        if self.verbose:
+            print(f"Written to {output_path}")
+
+    def append(self, input_path: str, output_path: str, model: str = "auto") -> int:
+        """
+        Compress the lines added to the log input_path since output_path was
+        last written, as new blocks at the end of output_path (which is
+        created if missing). Existing blocks are neither decoded nor
+        rewritten, so the cost follows the new data only. Only complete
+        lines are taken; a state frame at the end of the file records where
+        the next append resumes (offset, record count and a CRC of the bytes
+        before the offset).
+
+        model decides what happens to symbols the models in effect do not
+        have. Models escape them (see MultiStreamCoder), but an elided
+        stream or a model written before escapes existed cannot: "auto"
+        refits those streams on the new data, and also streams with a new
+        symbol that occurs PROMOTE_COUNT times (rarer ones stay escaped);
+        "extend" refits every stream with new symbols, keeping every symbol
+        they already had; "reuse" escapes what it can and raises ValueError
+        for the rest. Refitted models go into a model frame in front of the
+        new blocks. Returns the number of records appended.
+        """
+        if model not in ("auto", "extend", "reuse"):
+            raise ValueError(f"Unknown append model mode: {model}")
         file_type = FileDetector.detect(input_path)
-        strat_id, strat_cls = self.strategies[file_type]
-        strategy = strat_cls()
-        
-        # Check if strategy supports streaming (has 'train' method)
-        if hasattr(strategy, 'train'):
-            # --- Streaming Flow ---
-            
-            # Pass 1: Train
-            parsed_1 = strategy.parse(input_path)
-            tokens_1 = strategy.tokenize(parsed_1)
-            strategy.train(tokens_1)
-            
-            # Collect Metadata
-            metadata = {
-                "huffman_tree": strategy.huffman.reverse_mapping,
-                "token_count": strategy.huffman.total_tokens
-            }
-            if hasattr(strategy, 'dict_encoder'):
-                metadata['dict_main'] = strategy.dict_encoder.to_dict()
-            if hasattr(strategy, 'dict_encoders'):
-                metadata['dict_cols'] = {str(k): v.to_dict() for k, v in strategy.dict_encoders.items()}
-            
-            # Pass 2: Write & Encode
-            with open(output_path, 'wb') as f:
-                IFCWriter.write_header(f, strat_id, metadata)
-                
-                parsed_2 = strategy.parse(input_path)
-                tokens_2 = strategy.tokenize(parsed_2)
-                
-                bit_writer = BitWriter(f)
-                strategy.encode(tokens_2, bit_writer)
-                bit_writer.close()
-                
+        spec = registry.for_type(file_type)
+        if not spec.supports(registry.APPEND):
+            raise ValueError(f"Appending is not supported for {file_type} files")
+
+        with open(input_path, 'rb') as src:
+            if not os.path.exists(output_path):
+                data = src.read()
+                end = data.rfind(b"\n") + 1
+                with open(output_path, 'wb') as f:
+                    appended = self.start_appendable(f, file_type, os.path.basename(input_path),
+                                                     memoryview(data)[:end], end, _tail_crc(src, end))
+            else:
+                with open(output_path, 'r+b') as f:
+                    target = Appender(self, f, spec, output_path)
+                    offset = target.resume_offset(src)
+                    if offset is None:
+                        raise ValueError(f"{input_path} does not continue {output_path} (truncated or rotated?)")
+                    src.seek(offset)
+                    data = src.read()
+                    end = data.rfind(b"\n") + 1
+                    appended = 0
+                    if end:
+                        appended = target.add(memoryview(data)[:end], offset + end,
+                                              _tail_crc(src, offset + end), model)
+
+        if self.verbose:
+            print(f"Appended {appended} records to {output_path}")
+        return appended
+
+    def start_appendable(self, f: BinaryIO, file_type: str, name: str, lines: Source,
+                         offset: int, tail_crc: int) -> int:
+        """
+        Writes a new appendable file to f: lines (complete lines only),
+        compressed as usual, and a state frame saying the next append
+        resumes at input offset `offset`, after bytes with CRC tail_crc
+        (see _tail_crc). Returns the number of records written.
+        """
+        began = time.perf_counter()
+        start = f.tell()
+        # Appended lines are coded with these models
+        strat_id, strategy, pipeline, metadata = self._prepare(lines, file_type, name, escape=True)
+        header = self._write_header(f, strat_id, metadata, source_size(lines))
+        pipeline.write(f)
+        metadata["index"] = f.tell() - start - len(header)
+        f.write(pipeline.index_frame())
+        records = sum(meta["count"] for meta in pipeline.block_metas)
+        state = BlockWriter.frame_header(_state_meta(offset, records, tail_crc, {}, pipeline.payload_crc), 0)
+        f.write(state)
+        self._complete_header(f, start, strat_id, strategy, metadata, pipeline, header, source_size(lines), began)
+        f.write(IFCWriter.trailer(IFCWriter.header_crc(strat_id, metadata), zlib.crc32(state, pipeline.payload_crc)))
+        return records
+
+    def compress_bytes(self, data: Source, file_type: str = None, name: str = None) -> bytes:
+        """
+        IFC1 encoding of in-memory data (bytes, bytearray, memoryview, ...),
+        read in place. Without file_type the type is detected from the
+        extension of name; only plugins with a content sniffer look at the
+        data itself, so nameless JSON, CSV, LOG or text needs file_type or
+        name (ValueError otherwise).
+        """
+        out = io.BytesIO()
+        self.compress_to(data, out, file_type, name)
+        return out.getvalue()
+
+    def compress_to(self, source: Source, f: BinaryIO, file_type: str = None, name: str = None) -> int:
+        """
+        Write the IFC1 encoding of source (a path, bytes-like data or a
+        binary file object, read from its current position) at the current
+        position of f. file_type overrides detection; name replaces the file
+        name stored in the header. Returns the strategy ID used.
+        """
+        profiler = self.profiler
+        began = time.perf_counter()
+        seekable = f.seekable()
+        start = f.tell() if seekable else 0
+        bytes_in = source_size(source)
+        strat_id, strategy, pipeline, metadata = self._prepare(source, file_type, name)
+
+        counters = None
+        if 0 <= bytes_in <= EXACT_HEADER_INPUT:
+            # Coded in memory first, so the header is written once, with
+            # its stats and without room to fill them in
+            payload = io.BytesIO()
+            pipeline.write(payload)
+            if strategy.block_size:
+                metadata["index"] = payload.tell()
+                payload.write(pipeline.index_frame())
+            with profiler.phase("write"):
+                header, counters = self._exact_header(strat_id, strategy, metadata, pipeline,
+                                                      payload.tell(), bytes_in, began)
+                f.write(header)
+                f.write(payload.getbuffer())
+        else:
+            with profiler.phase("write"):
+                header = self._write_header(f, strat_id, metadata, bytes_in)
+            pipeline.write(f)
+            if seekable:
+                if strategy.block_size:
+                    metadata["index"] = f.tell() - start - len(header)
+                    f.write(pipeline.index_frame())
+                # The header gets the stats (and index) that are only known now
+                counters = self._complete_header(f, start, strat_id, strategy, metadata, pipeline,
+                                                 header, bytes_in, began)
+        f.write(IFCWriter.trailer(IFCWriter.header_crc(strat_id, metadata), pipeline.payload_crc))
+
+        if profiler.enabled and counters is not None:
+            label = os.fspath(source) if is_path(source) else metadata["name"] or "<data>"
+            profiler.record_file(label, counters)
+        return strat_id
+
+    def _prepare(self, source: Source, file_type: str = None, name: str = None,
+                 escape: bool = False) -> Tuple[int, Any, Pipeline, Dict[str, Any]]:
+        """
+        (strategy ID, strategy, pipeline, header metadata) for source,
+        with every block observed and the models fitted (with escape,
+        multi-stream models that can escape tokens they do not have).
+        """
+        # 1. Detect
+        if file_type is None:
+            file_type = FileDetector.detect(source, name)
+        spec = registry.for_type(file_type)
+        strat_id = spec.id
+        strategy = spec.load()(**self.options.get(file_type, {}))
+        if escape:
+            strategy.coder.escape = True
+
+        shared = self.shared_models.get(strat_id) if spec.supports(registry.MULTI_STREAM) else None
+        if shared is not None:
+            shared.apply(strategy)
+
+        # Observe every block and fit the models; the caller writes the
+        # header and then has the pipeline encode the payload block by block
+        pipeline = Pipeline(strategy, self.profiler, self.workers)
+        metadata = {"name": source_name(source) if name is None else name, "checksum": "crc32"}
+        metadata.update(pipeline.prepare(source))
+
+        # Add dictionary tables if present
+        if shared is not None:
+            # Only what the shared model does not already hold
+            metadata['shared_dict'] = shared.reference()
+            metadata.update(shared.dictionary_delta(strategy))
         else:
-            # --- Legacy Flow ---
-            
-            # 2. Parse
-            parsed = strategy.parse(input_path)
-            
-            # 3. Tokenize
-            tokens = strategy.tokenize(parsed)
-            
-            # 4. Encode
-            compressed_data = strategy.encode(tokens)
-            
-            # 5. Collect Metadata
-            metadata = {
-                "huffman_tree": strategy.huffman.reverse_mapping
-            }
-            # Add dictionary tables if present
             if hasattr(strategy, 'dict_encoder'):
                 metadata['dict_main'] = strategy.dict_encoder.to_dict()
             if hasattr(strategy, 'dict_encoders'):
                 metadata['dict_cols'] = {str(k): v.to_dict() for k, v in strategy.dict_encoders.items()}
-                
-            # 6. Write
-            with open(output_path, 'wb') as f:
-                IFCWriter.write_header(f, strat_id, metadata)
-                f.write(compressed_data)
+        return strat_id, strategy, pipeline, metadata
+
+    @staticmethod
+    def _write_header(f: BinaryIO, strat_id: int, metadata: Dict[str, Any], bytes_in: int) -> bytes:
+        """
+        Writes a header whose stats (and, for a blocked payload, the offset
+        of its index frame) are unknown yet, with room to fill them in (see
+        _complete_header). Returns it.
+        """
+        stats = FileMetadata.placeholder(metadata.get("streams", {}), bytes_in)
+        metadata["stats"] = stats.to_dict()
+        room = stats.room()
+        if "block_size" in metadata:
+            metadata["index"] = -1
+            room += len(str(FileMetadata.LIMIT)) - len("-1")
+        header = IFCWriter.header_bytes(strat_id, metadata)
+        header = IFCWriter.header_bytes(strat_id, metadata, len(header) + room)
+        f.write(header)
+        return header
+
+    def _complete_header(self, f: BinaryIO, start: int, strat_id: int, strategy: Any, metadata: Dict[str, Any],
+                         pipeline: Pipeline, header: bytes, bytes_in: int,
+                         began: float) -> Dict[str, Any]:
+        """
+        Rewrites the header written at `start` by _write_header with the
+        stats of the file written up to the current position of f, plus the
+        trailer to come. Returns the file's counters.
+        """
+        end = f.tell()
+        stats, counters = self._stats(strategy, metadata, pipeline, bytes_in, len(header),
+                                      end - start + IFCWriter.TRAILER_SIZE, began)
+        metadata["stats"] = stats.to_dict()
+        header = IFCWriter.header_bytes(strat_id, metadata, len(header))
+        f.seek(start)
+        f.write(header)
+        f.seek(end)
+        return counters
+
+    def _exact_header(self, strat_id: int, strategy: Any, metadata: Dict[str, Any], pipeline: Pipeline,
+                      payload_size: int, bytes_in: int, began: float) -> Tuple[bytes, Dict[str, Any]]:
+        """
+        (header, counters) of a file whose payload of payload_size bytes is
+        coded already: the header holds its final stats (the known ones),
+        unpadded.
+        """
+        size = 0
+        while True:
+            # Its own size is in the stats: grow it until it holds
+            stats, counters = self._stats(strategy, metadata, pipeline, bytes_in, size,
+                                          size + payload_size + IFCWriter.TRAILER_SIZE, began)
+            if bytes_in < STREAM_STATS_INPUT:
+                stats.streams = {}
+            metadata["stats"] = stats.known()
+            header = IFCWriter.header_bytes(strat_id, metadata)
+            if len(header) == size:
+                return header, counters
+            size = len(header)
+
+    def _stats(self, strategy: Any, metadata: Dict[str, Any], pipeline: Pipeline, bytes_in: int,
+               header_size: int, size: int, began: float) -> Tuple[FileMetadata, Dict[str, Any]]:
+        """(stats, counters) of a file of `size` bytes with a header of header_size bytes."""
+        layouts = [meta['layout'] for meta in pipeline.block_metas if 'layout' in meta]
+        counters = self._counters(strategy, metadata, layouts, bytes_in, header_size, size)
+        models = metadata.get("streams", {})
+        stats = FileMetadata(
+            original_size=bytes_in, compressed_size=size, header_size=header_size,
+            records=sum(meta["count"] for meta in pipeline.block_metas) if strategy.block_size else -1,
+            tokens=counters["tokens"], distinct_symbols=counters["distinct_symbols"],
+            dictionary_entries=counters["dictionary_entries"], codebook_bytes=counters["codebook_bytes"],
+            # Only when profiling: the output is the same for the same input otherwise
+            time_ms=round((time.perf_counter() - began) * 1000) if self.profiler.enabled else -1,
+            # Streams that have models (the ones _write_header keeps room for)
+            streams={name: {k: s[k] for k in ("tokens", "bytes", "symbols")}
+                     for name, s in counters.get("streams", {}).items() if name in models})
+        return stats, counters
+
+    @staticmethod
+    def _counters(strategy: Any, metadata: Dict[str, Any], layouts: List[List[List[Any]]],
+                  bytes_in: int, header_bytes: int, bytes_out: int) -> Dict[str, Any]:
+        """Profiling counters for one compressed file."""
+        streams = {}
+        for layout in layouts:
+            for name, count, size in layout:
+                stream = streams.setdefault(name, {"tokens": 0, "bytes": 0})
+                stream["tokens"] += count
+                stream["bytes"] += size
+        for name, stream in streams.items():
+            stream["symbols"] = len(strategy.coder.alphabet(name))
+            stream["avg_bits"] = round(stream["bytes"] * 8 / stream["tokens"], 3) if stream["tokens"] else 0.0
+
+        if streams:
+            tokens = sum(s["tokens"] for s in streams.values())
+            symbols = sum(s["symbols"] for s in streams.values())
+            codebook = metadata.get("streams", {})
+        else:
+            # TEXT: one model (order 0) or one table per context (order 1)
+            tokens = metadata.get("token_count", 0)
+            model = metadata.get("context_model") or metadata
+            codebook = {k: v for k, v in model.items() if k not in ("name", "token_count", "order", "checksum", "stats")}
+            if getattr(strategy, 'order', 0) == 1:
+                symbols = len(set().union(*(t.codes for t in strategy.context_model.tables.values())))
+            else:
+                symbols = len(strategy.model.alphabet())
+        payload_bytes = bytes_out - header_bytes
+
+        dictionary = len(strategy.dict_encoder.forward) if hasattr(strategy, 'dict_encoder') else 0
+        dictionary += sum(len(e.forward) for e in getattr(strategy, 'dict_encoders', {}).values())
+        counters = {
+            "bytes_in": bytes_in,
+            "bytes_out": bytes_out,
+            "header_bytes": header_bytes,
+            "tokens": tokens,
+            "distinct_symbols": symbols,
+            "dictionary_entries": dictionary,
+            "codebook_bytes": len(json.dumps(codebook, separators=(',', ':'))),
+            "avg_code_bits": round(payload_bytes * 8 / tokens, 3) if tokens else 0.0
+        }
+        if streams:
+            counters["streams"] = streams
+        return counters
+
+    def compress_many(self, pairs: List[Tuple[str, str]], jobs: int = 1) -> BatchReport:
+        """
+        Compress many (input_path, output_path) pairs over a pool of `jobs`
+        worker processes. Each worker builds one Compressor with these options
+        and shared models and reuses it for all its files.
+        """
+        return run_batch(self, pairs, jobs)
+
+    def compress_dir(self, src_dir: str, dst_dir: str, jobs: int = 1) -> BatchReport:
+        """Compress every supported file under src_dir into dst_dir (mirrored, + .ifc)."""
+        return self.compress_many(collect_files(src_dir, dst_dir), jobs)
+
+    def compress_archive(self, inputs: List[str], output_path: str, share_models: bool = True) -> List[Dict[str, Any]]:
+        """
+        Compress files and directories into one IFCA archive.
+        Files are stored under their base name, directory contents under
+        their path relative to the directory. With share_models, members of
+        the same multi-stream type share one model trained on all of them.
+        Returns the archive's member entries.
+        """
+        members = []
+        for path in inputs:
+            if os.path.isdir(path):
+                for file_path, _ in collect_files(path, ""):
+                    members.append((os.path.relpath(file_path, path).replace(os.sep, "/"), file_path))
+            else:
+                members.append((os.path.basename(path), path))
+        names = [name for name, _ in members]
+        if len(set(names)) != len(names):
+            raise ValueError("Duplicate member names in archive input")
+
+        shared = list(self.shared_models.values())
+        if share_models:
+            by_type = {}
+            for _, path in members:
+                by_type.setdefault(FileDetector.detect(path), []).append(path)
+            for file_type, paths in by_type.items():
+                spec = registry.for_type(file_type)
+                if len(paths) < 2 or spec.id in self.shared_models or not spec.supports(registry.MULTI_STREAM):
+                    continue
+                shared.append(self.train_shared_model(paths, model_id=f"archive-{file_type}"))
+
+        compressor = Compressor(options=self.options, shared_models=shared, verbose=False)
+        from .decompressor import Decompressor
+        decompressor = Decompressor(shared)
+        with open(output_path, 'w+b') as f:
+            writer = IFCArchiveWriter(f)
+            for name, path in members:
+                if self.verbose:
+                    print(f"Adding {name}...")
+                offset = f.tell()
+                strat_id = compressor.compress_to(path, f)
+                end = f.tell()
+                # What extraction has to give, checked against when it does
+                f.seek(offset)
+                restored_size, restored_crc32 = decompressor.canonical_crc32(*IFCReader.read_header(f), path)
+                f.seek(end)
+                writer.add_member(name, strat_id, offset, end - offset, os.path.getsize(path),
+                                  file_crc32(path), restored_size, restored_crc32)
+            for model in compressor.shared_models.values():
+                writer.add_model(model.strategy_id, model.body)
+            writer.close()
+        return writer.members
+
+
+class Appender:
+    """
+    An appendable blocked file open for writing (f, opened 'r+b'): its
+    strategy with the models in effect at the end of the file, the number
+    of records in it and the state frame of the last append.
+
+    Every add() writes its frames (blocks, a new state frame and trailer)
+    after the end of the file, where readers, who stop at the trailer, do
+    not look. Then one 4-byte write makes the old state frame take the old
+    trailer as its data, and readers go on to the new frames: they see
+    either the old or the new file, never a torn tail. The stats in the
+    header are rewritten last. A file written by compress() has no state
+    frame, so its first append writes over its trailer instead. Once
+    INDEX_TAIL blocks are missing from the file's index, add() writes a
+    new index frame in front of the state frame.
+    """
+
+    def __init__(self, compressor: Compressor, f: BinaryIO, spec: Any, path: str):
+        from .decompressor import Decompressor
+        strat_id, metadata = IFCReader.read_header(f)
+        if strat_id != spec.id or 'block_size' not in metadata:
+            raise ValueError(f"{path} is not a blocked {spec.file_type} file")
+        payload_start = f.tell()
+        entries = BlockReader.scan(f)
+        strategy = Decompressor(list(compressor.shared_models.values()))._strategy(strat_id, metadata)
+        for entry in entries:
+            if entry.kind == MODEL_FRAME:
+                strategy.update_model(entry.meta)
+        strategy.block_size = metadata['block_size']
+        strategy.coder.escape = True
+        # Refitted models use the backend the file already uses
+        strategy.coder.entropy = next((m.NAME for m in strategy.coder.models.values()),
+                                      compressor.options.get(spec.file_type, {}).get("entropy", "huffman"))
+
+        self.compressor = compressor
+        self.f = f
+        self.path = path
+        self.strat_id = strat_id
+        self.metadata = metadata
+        self.payload_start = payload_start
+        self.strategy = strategy
+        self.head = metadata['head']
+        self.records = sum(entry.count for entry in entries if entry.kind is None)
+        # Index of every block (see BlockWriter.index_frame) and how many
+        # of them the index frame the header points at has
+        self.blocks = [[e.first, e.count, e.offset - payload_start] for e in entries if e.kind is None]
+        self.models = [e.offset - payload_start for e in entries if e.kind == MODEL_FRAME]
+        pointer = metadata.get("index", -1)
+        self.indexed = sum(1 for offset in (b[2] for b in self.blocks) if offset < pointer)
+        self.state = entries[-1].meta if entries and entries[-1].kind == STATE_FRAME else None
+        # Where the next frame goes: after the last frame (anything after
+        # the trailer is left over from an interrupted add and overwritten)
+        self.end = f.tell()
+        self.commit = None # where the DATA_LEN of the old state frame is
+
+        # Files with checksums get a new trailer: the payload CRC up to
+        # the old state frame is kept in it (or in the trailer)
+        self.checksum = metadata.get("checksum") == "crc32"
+        if self.checksum:
+            # Stays the same: the stats that appends update are not covered
+            self.header_crc = IFCWriter.header_crc(strat_id, metadata)
+            trailer = f.read(IFCWriter.TRAILER_SIZE)
+            if len(trailer) != IFCWriter.TRAILER_SIZE or not trailer.startswith(IFCWriter.TRAILER_MAGIC):
+                raise ValueError(f"{path} is truncated: it has no checksum trailer")
+            if self.state is not None and "payload_crc" in self.state:
+                last = entries[-1]
+                f.seek(last.offset)
+                self._take_trailer(last.offset, f.read(last.data_offset - last.offset), trailer,
+                                   self.state["payload_crc"])
+            else:
+                self.payload_crc = int.from_bytes(trailer[8:], 'big')
+
+    def resume_offset(self, src: BinaryIO) -> Optional[int]:
+        """
+        Where the file's next lines start in the input src (a seekable
+        binary file), or None if src does not continue the file: it is
+        shorter than the recorded offset, or the bytes before it changed.
+        """
+        if self.state is not None:
+            offset = self.state["offset"]
+            if src.seek(0, io.SEEK_END) < offset or _tail_crc(src, offset) != self.state["tail_crc"]:
+                return None
+            return offset
+        # Written by compress(): it took the whole input, one record per line
+        src.seek(0)
+        for _ in range(self.records):
+            if not src.readline():
+                break
+        return src.tell()
+
+    def add(self, lines: Source, offset: int, tail_crc: int, model: str = "auto") -> int:
+        """
+        Appends lines (complete lines only) as new blocks, with a model frame
+        in front if model allows refitting streams the models cannot code
+        (see Compressor.append), and a state frame for input offset `offset`
+        after bytes with CRC tail_crc. Returns the number of records added.
+        """
+        began = time.perf_counter()
+        strategy = self.strategy
+        strategy.counts = {}
+        pipeline = Pipeline(strategy, self.compressor.profiler, self.compressor.workers)
+        pipeline.prepare_append(lines, self.head, self.records)
+        promote = {"reuse": 0, "extend": 1}.get(model, strategy.PROMOTE_COUNT)
+        refit = strategy.uncovered_streams(promote)
+        if refit and model == "reuse":
+            raise ValueError(f"The models of {self.path} cannot code the new data (streams: {', '.join(refit)})")
+
+        out = io.BytesIO()
+        base = self.end - self.payload_start
+        if refit:
+            frame = {"kind": MODEL_FRAME}
+            frame.update(strategy.refit(refit, keep_symbols=model == "extend", promote=promote))
+            BlockWriter.write_block(out, frame, b"")
+            self.models.append(base)
+        codebook = out.tell()
+        pipeline.write(out)
+        self.blocks += [[meta["first"], meta["count"], base + codebook + offset]
+                        for meta, offset in zip(pipeline.block_metas, pipeline.block_offsets)]
+        index = None
+        # Only files written with an index have a place for where it is
+        if "index" in self.metadata and len(self.blocks) - self.indexed >= max(INDEX_TAIL, self.indexed // 8):
+            index = base + out.tell()
+            out.write(BlockWriter.index_frame(self.blocks, self.models))
+        added = sum(meta["count"] for meta in pipeline.block_metas)
+        self.records += added
+        payload_crc = zlib.crc32(out.getvalue(), self.payload_crc) if self.checksum else None
+        self.state = _state_meta(offset, self.records, tail_crc, self.state or {}, payload_crc)
+        state_offset = self.end + out.tell()
+        state = BlockWriter.frame_header(self.state, 0)
+        out.write(state)
+        trailer = None
+        size = state_offset + len(state)
+        if self.checksum:
+            size += IFCWriter.TRAILER_SIZE
+            trailer = IFCWriter.trailer(self.header_crc, zlib.crc32(state, payload_crc))
+            out.write(trailer)
+        header = self._updated_header(pipeline, source_size(lines), codebook, size, began, index)
+        if index is not None and self.metadata["index"] == index:
+            self.indexed = len(self.blocks)
+
+        f = self.f
+        f.seek(self.end)
+        f.write(out.getbuffer())
+        f.truncate()
+        f.flush()
+        if self.commit is not None:
+            # Readers go on past the old trailer from here on
+            f.seek(self.commit)
+            f.write(BlockWriter.data_len(IFCWriter.TRAILER_SIZE))
+            f.flush()
+        if header is not None:
+            # Last: only the stats and index change, which HEADER_CRC leaves
+            # out, so until then the file is whole with the ones of before
+            # (the old index still holds, just without the new blocks)
+            f.seek(0)
+            f.write(header)
+            f.flush()
+        if self.checksum:
+            self._take_trailer(state_offset, state, trailer, payload_crc)
+        else:
+            self.end = state_offset + len(state)
+        return added
+
+    def _take_trailer(self, offset: int, frame: bytes, trailer: bytes, payload_crc: int):
+        """
+        Sets up the next add() to append after the trailer and then make the
+        state frame (frame: all of it, at offset, with payload_crc the CRC
+        of the payload in front of it) take that trailer as its data.
+        """
+        self.commit = offset + BlockWriter.DATA_LEN_OFFSET
+        self.end = offset + len(frame) + len(trailer)
+        at = BlockWriter.DATA_LEN_OFFSET
+        frame = frame[:at] + BlockWriter.data_len(len(trailer)) + frame[at + 4:]
+        self.payload_crc = zlib.crc32(trailer, zlib.crc32(frame, payload_crc))
+
+    def _updated_header(self, pipeline: Pipeline, bytes_in: int, codebook_bytes: int, size: int,
+                        began: float, index: Optional[int]) -> Optional[bytes]:
+        """
+        The header with its stats brought up to date with blocks just coded
+        by pipeline, for a file of `size` bytes, and pointing at the index
+        frame at payload offset index if given; None if nothing changes
+        (stats are only kept up to date if they are complete: not written
+        unseekable or before they existed). Headers written without room
+        (see EXACT_HEADER_INPUT) that no longer fit drop what is unknown,
+        then all stats (which stay unknown from then on), then the new
+        index; None if even that does not fit.
+        """
+        stats = self._updated_stats(pipeline, bytes_in, codebook_bytes, size, began)
+        options = [self.metadata.get("stats")]
+        if stats is not None:
+            options = [stats.to_dict(), stats.known(), {}]
+        elif "stats" in self.metadata:
+            options.append({})
+        for pointer in (index, None) if index is not None else (None,):
+            for option in options:
+                metadata = dict(self.metadata)
+                if pointer is not None:
+                    metadata["index"] = pointer
+                if option is not None:
+                    metadata["stats"] = option
+                if metadata == self.metadata:
+                    return None
+                try:
+                    header = IFCWriter.header_bytes(self.strat_id, metadata, self.payload_start)
+                except ValueError:
+                    continue
+                self.metadata = metadata
+                return header
+        return None
+
+    def _updated_stats(self, pipeline: Pipeline, bytes_in: int, codebook_bytes: int, size: int,
+                       began: float) -> Optional[FileMetadata]:
+        """The stats after the blocks just coded by pipeline; None if they are not complete."""
+        if "stats" not in self.metadata:
+            return None
+        stats = FileMetadata.from_dict(self.metadata["stats"])
+        if stats.compressed_size < 0 or bytes_in < 0:
+            return None
+        for layout in (meta["layout"] for meta in pipeline.block_metas if "layout" in meta):
+            for name, count, length in layout:
+                stats.tokens += count
+                if name in stats.streams:
+                    stats.streams[name]["tokens"] += count
+                    stats.streams[name]["bytes"] += length
+        for name, stream in stats.streams.items():
+            stream["symbols"] = len(self.strategy.coder.alphabet(name))
+        if stats.streams:
+            stats.distinct_symbols = sum(stream["symbols"] for stream in stats.streams.values())
+        else:
+            stats.distinct_symbols = -1 # counted over streams left out of the stats
+        stats.original_size += bytes_in
+        stats.compressed_size = size
+        stats.records = self.records
+        stats.codebook_bytes += codebook_bytes
+        if stats.time_ms >= 0 and self.compressor.profiler.enabled:
+            stats.time_ms += round((time.perf_counter() - began) * 1000)
+        else:
+            stats.time_ms = -1 # some write was not timed
+        return stats
+
+
+def _state_meta(offset: int, records: int, tail_crc: int,
+                previous: Dict[str, Any], payload_crc: int = None) -> Dict[str, Any]:
+    """Meta of a state frame (see Compressor.append); payload_crc: of the payload in front of it."""
+    state = dict(previous)
+    state.update({"kind": STATE_FRAME, "offset": offset, "records": records, "tail_crc": tail_crc})
+    if payload_crc is not None:
+        state["payload_crc"] = payload_crc
+    return state
 
-        print(f"Written to {output_path}")
+def _tail_crc(src: BinaryIO, offset: int) -> int:
+    """CRC32 of the APPEND_TAIL bytes of src in front of offset."""
+    start = max(offset - APPEND_TAIL, 0)
+    src.seek(start)
+    return zlib.crc32(src.read(offset - start))
@@ -1,58 +1,445 @@
-import json
+import io
+import os
+import re
+import struct
+import zlib
+from dataclasses import dataclass, field
+from typing import Dict, Any, List, Iterator, Tuple, BinaryIO
+from ..algorithms.dictionary import DictionaryEncoder
+from .pipeline import Pipeline
+from .shared_model import SharedModel
+from .utils import file_crc32
 from ..storage.reader import IFCReader
-from ..utils.bit_stream import BitReader
-from ..strategies.json_strategy import JSONStrategy
-from ..strategies.text_strategy import TextStrategy
-from ..strategies.csv_strategy import CSVStrategy
-from ..strategies.log_strategy import LogStrategy
+from ..storage.writer import IFCWriter
+from ..storage.archive import IFCArchiveReader
+from ..storage.blocks import BlockEntry, BlockReader, MODEL_FRAME
+from ..utils.text_stream import BufferedTextWriter
+from ..utils.profiling import NULL_PROFILER
+from ..utils.sources import Source, is_path, open_binary
+from ..strategies import registry
+
+@dataclass
+class Verification:
+    """What Decompressor.verify() checked in one file, and what it found wrong."""
+    path: str
+    checked: List[str] = field(default_factory=list)
+    problems: List[str] = field(default_factory=list)
+
+    @property
+    def ok(self) -> bool:
+        return not self.problems
+
 
 class Decompressor:
-    def __init__(self):
-        self.strategy_map = {
-            1: JSONStrategy,
-            2: CSVStrategy,
-            3: LogStrategy,
-            4: TextStrategy
-        }
+    def __init__(self, shared_models: List[SharedModel] = None, profiler=None, workers: int = 1):
+        # Worker processes per file (blocks are decoded in parallel)
+        self.workers = workers
+        # Phase timers/counters (utils.profiling.Profiler); off by default
+        self.profiler = profiler or NULL_PROFILER
+        # Pre-trained models (.ifcdict) referenced by compressed files, by ID
+        self.shared_models = {m.id: m for m in (shared_models or [])}
 
     def decompress(self, input_path: str, output_path: str):
         print(f"Decompressing {input_path}...")
         
-        # 1. Read
-        strat_id, metadata, compressed_data = IFCReader.read(input_path)
+        # 1. Read the header; blocked payloads are then read block by block
+        with open(input_path, 'rb') as f:
+            with self.profiler.phase("read"):
+                strat_id, metadata = IFCReader.read_header(f)
+            self._write(self.reconstruct_iter(strat_id, metadata, f), output_path)
+        if self.profiler.enabled:
+            self.profiler.record_file(input_path, {"bytes_in": os.path.getsize(input_path),
+                                                   "bytes_out": os.path.getsize(output_path)})
         
-        # 2. Strategy
-        if strat_id not in self.strategy_map:
-            raise ValueError(f"Unknown strategy ID: {strat_id}")
-        strategy = self.strategy_map[strat_id]()
+        print(f"Restored to {output_path}")
+
+    def decompress_bytes(self, data: Source) -> bytes:
+        """Original bytes of an in-memory IFC1 file (bytes, bytearray, memoryview, ...)."""
+        out = io.BytesIO()
+        self.decompress_to(data, out)
+        return out.getvalue()
+
+    def decompress_to(self, source: Source, f: BinaryIO):
+        """
+        Write the original bytes of an IFC1 file (a path, bytes-like data or
+        a binary file object, read from its current position; it need not be
+        seekable) at the current position of f.
+        """
+        with open_binary(source) as src:
+            with self.profiler.phase("read"):
+                strat_id, metadata = IFCReader.read_header(src)
+            self._write_to(self.reconstruct_iter(strat_id, metadata, src), f)
+
+    def restore(self, strat_id: int, metadata: Dict[str, Any], compressed_data: bytes, output_path: str):
+        """Decode an already-read IFC1 payload and write the original to output_path."""
+        self._write(self.reconstruct_iter(strat_id, metadata, io.BytesIO(compressed_data)), output_path)
+
+    def reconstruct_iter(self, strat_id: int, metadata: Dict[str, Any], payload: BinaryIO) -> Iterator[str]:
+        """
+        Output text of an IFC1 payload (read from the current position of
+        payload), chunk by chunk. Blocked files are decoded one block at a
+        time, so output starts after the first block and memory stays flat.
+        """
+        strategy = self._strategy(strat_id, metadata)
+        return Pipeline(strategy, self.profiler, self.workers).decompress(metadata, payload)
+
+    def canonical_crc32(self, strat_id: int, metadata: Dict[str, Any], source: Source) -> Tuple[int, int]:
+        """
+        (size, CRC32) of the bytes that decompressing a file with this
+        header must restore when source was its input (see
+        Pipeline.canonical), without decoding it.
+        """
+        size = crc = 0
+        for text in Pipeline(self._strategy(strat_id, metadata)).canonical(metadata, source):
+            data = text.encode('utf-8')
+            size += len(data)
+            crc = zlib.crc32(data, crc)
+        return size, crc
+
+    def _write(self, chunks: Iterator[str], output_path: str):
+        with open(output_path, 'wb') as f:
+            self._write_to(chunks, f)
+
+    def _write_to(self, chunks: Iterator[str], f: BinaryIO):
+        # 5. Write Output (newline='': exact-mode JSON keeps its line endings)
+        text = io.TextIOWrapper(f, encoding='utf-8', newline='')
+        try:
+            with self.profiler.phase("write"):
+                BufferedTextWriter(text).write_all(self.profiler.iterate("reconstruct", chunks))
+        finally:
+            text.detach() # flushes; f stays open
+
+    def read_records(self, source: Source, start: int, stop: int) -> List[Any]:
+        """
+        Records [start, stop) of a blocked file (log lines or CSV data rows,
+        0-based, end exclusive). The blocks covering the range are looked up
+        in the file's index frame (see BlockReader.index); only they, the
+        frames appended after the index and the model frames in front of
+        them are read, and only the covering blocks decoded. Files without
+        an index have every frame header read instead.
+        """
+        with open_binary(source) as f:
+            strat_id, metadata = IFCReader.read_header(f)
+            if 'block_size' not in metadata:
+                raise ValueError(f"{_label(source)} has no block index (only LOG and CSV files are blocked)")
+            strategy = self._strategy(strat_id, metadata)
+            payload_start = f.tell()
+            entries = BlockReader.index(f, metadata, payload_start)
+            if entries is None:
+                f.seek(payload_start)
+                entries = BlockReader.scan(f)
+            records = []
+            for entry in _covering_blocks(f, strategy, entries, start, stop):
+                block = strategy.block_records(strategy.decode_block(entry.meta, BlockReader.read_data(f, entry)))
+                lo = max(start - entry.first, 0)
+                records.extend(block[lo:stop - entry.first])
+        return records
+
+    def grep(self, source: Source, pattern: str, regex: bool = False) -> Iterator[Tuple[int, str]]:
+        """
+        Yields (line_number, line) for every line of a compressed log that
+        contains the literal pattern (or matches it as a regular expression
+        with regex=True). For literal patterns, blocks that the symbol tables
+        and per-block bloom filters rule out are neither read nor decoded.
+        """
+        with open_binary(source) as f:
+            strat_id, metadata = IFCReader.read_header(f)
+            strategy = self._strategy(strat_id, metadata)
+            if 'block_size' not in metadata or not registry.get(strat_id).supports(registry.GREP):
+                raise ValueError(f"{_label(source)} is not a blocked log file")
+            if regex:
+                match = re.compile(pattern).search
+                may_match = None
+            else:
+                match = lambda line: pattern in line
+                may_match = strategy.block_filter(pattern)
+            for entry in BlockReader.scan(f):
+                if entry.kind == MODEL_FRAME:
+                    strategy.update_model(entry.meta)
+                    if not regex:
+                        may_match = strategy.block_filter(pattern)
+                    continue
+                if entry.kind is not None:
+                    continue
+                if may_match is not None and not may_match(entry.meta):
+                    continue
+                block = strategy.block_records(strategy.decode_block(entry.meta, BlockReader.read_data(f, entry)))
+                for i, line in enumerate(block):
+                    if match(line):
+                        yield entry.first + i, line
+
+    def query(self, source: Source, columns: List[str] = None,
+              where: List[Tuple[str, str, str]] = None) -> Iterator[List[str]]:
+        """
+        Yields the data rows of a compressed CSV that satisfy every
+        (column, op, value) predicate in `where` (op: =, <, <=, >, >=; ranges
+        compare as integers), projected onto `columns` (all by default).
+        Row groups ruled out by their min/max statistics are skipped and only
+        the streams of the referenced columns are read and decoded.
+        """
+        with open_binary(source) as f:
+            strat_id, metadata = IFCReader.read_header(f)
+            strategy = self._strategy(strat_id, metadata)
+            if 'block_size' not in metadata or not registry.get(strat_id).supports(registry.QUERY):
+                raise ValueError(f"{_label(source)} is not a blocked CSV file")
+            headers = metadata['head'][0] if metadata['head'] else []
+            index = {name: i for i, name in enumerate(headers)}
+
+            def resolve(name: str) -> int:
+                if name not in index:
+                    raise KeyError(f"No column named '{name}'")
+                return index[name]
+
+            cols = [resolve(c) for c in columns] if columns else list(range(len(headers)))
+            predicates = []
+            for name, op, value in where or []:
+                if op not in strategy.OPERATORS:
+                    raise ValueError(f"Unsupported operator: {op}")
+                predicates.append((resolve(name), op, value))
+
+            for entry in _data_blocks(strategy, BlockReader.scan(f)):
+                if not strategy.block_may_match(entry.meta, predicates):
+                    continue
+                read = lambda offset, size, entry=entry: BlockReader.read_data(f, entry, offset, size)
+                yield from strategy.query_block(entry.meta, read, cols, predicates)
+
+    def json_path(self, source: Source, path: str) -> Iterator[Any]:
+        """
+        Yields the values of a compressed JSON file matching a JSONPath-lite
+        expression (e.g. '$.items[*].id'), walking the decoded token stream
+        lazily instead of rebuilding the whole document.
+        """
+        strat_id, metadata, compressed_data = IFCReader.read(source)
+        strategy = self._strategy(strat_id, metadata)
+        if not registry.get(strat_id).supports(registry.SELECT):
+            raise ValueError(f"{_label(source)} is not a JSON file")
+        streams = strategy.coder.decode(metadata['layout'], IFCReader.payload(metadata, compressed_data))
+        yield from strategy.select(strategy.iter_tokens(streams), path)
+
+    def verify(self, path: str, decode: bool = False, original: Source = None) -> Verification:
+        """
+        Checks a compressed file without writing anything. The header and
+        payload are checked against the CRCs of the trailer, and every block
+        of a blocked file against its own CRC (self.workers threads at a
+        time), which also tells which blocks are damaged. With decode,
+        the whole file is decoded as well; with original (what the file was
+        compressed from), the decoded text is compared with it as the
+        strategy keeps it (see Pipeline.canonical).
+        """
+        report = Verification(path)
+        size = os.path.getsize(path)
+        with open(path, 'rb') as f:
+            try:
+                strat_id, metadata = IFCReader.read_header(f)
+            except (ValueError, struct.error) as e:
+                report.problems.append(f"header: {e}")
+                return report
+            payload_start = f.tell()
+
+            # The trailer of a blocked file is where its frames end: an
+            # append writes after it before it becomes part of the file
+            end = size
+            entries = frame_problem = None
+            if 'block_size' in metadata:
+                try:
+                    entries = BlockReader.scan(f)
+                    end = f.tell() + IFCWriter.TRAILER_SIZE
+                except (ValueError, struct.error) as e:
+                    frame_problem = f"frames: {e}"
+            if metadata.get("checksum") == "crc32":
+                report.checked.append("checksums")
+                report.problems.extend(_check_trailer(f, strat_id, metadata, payload_start, end))
+            if frame_problem is not None:
+                report.problems.append(frame_problem)
+            elif entries is not None:
+                blocks = [e for e in entries if e.kind is None and "crc" in e.meta]
+                report.checked.append(f"{len(blocks)} blocks")
+                report.problems.extend(self._check_blocks(path, blocks))
+                if metadata.get("index", -1) >= 0:
+                    report.checked.append("index")
+                    report.problems.extend(_check_index(f, metadata, payload_start, entries))
+
+            if decode or original is not None:
+                f.seek(payload_start)
+                report.checked.append("decode" if original is None else "round trip")
+                try:
+                    text = self.reconstruct_iter(strat_id, metadata, f)
+                    if original is None:
+                        for _ in text:
+                            pass
+                    else:
+                        strategy = self._strategy(strat_id, metadata)
+                        expected = Pipeline(strategy).canonical(metadata, original)
+                        offset = _first_difference(text, expected)
+                        if offset >= 0:
+                            report.problems.append(f"round trip: differs from {_label(original)} at character {offset}")
+                except Exception as e:
+                    report.problems.append(f"decode: {e}")
+        return report
+
+    def _check_blocks(self, path: str, blocks: List[BlockEntry]) -> List[str]:
+        """Problems with the block CRCs, in block order."""
+        # zlib and file reads release the GIL, so threads check in parallel
+        from concurrent.futures import ThreadPoolExecutor
+        jobs = max(min(self.workers, len(blocks)), 1)
+
+        def check(group: List[BlockEntry]) -> List[Tuple[int, str]]:
+            problems = []
+            with open(path, 'rb') as f:
+                for entry in group:
+                    try:
+                        BlockReader.read_data(f, entry)
+                    except ValueError as e:
+                        problems.append((entry.first, str(e)))
+            return problems
+
+        with ThreadPoolExecutor(max_workers=jobs) as pool:
+            found = [p for group in pool.map(check, [blocks[i::jobs] for i in range(jobs)]) for p in group]
+        return [message for _, message in sorted(found)]
+
+    def _strategy(self, strat_id: int, metadata: Dict[str, Any]) -> Any:
+        """Strategy instance with the file's models and dictionaries loaded."""
+        strategy = registry.strategy_class(strat_id)()
         
-        # Restore dictionaries
+        if 'shared_dict' in metadata:
+            self._shared_model(metadata['shared_dict']).apply(strategy)
+        
+        # Restore dictionaries (on top of the shared ones, if any)
         if 'dict_main' in metadata and hasattr(strategy, 'dict_encoder'):
-            strategy.dict_encoder.from_dict(metadata['dict_main'])
+            strategy.dict_encoder.update(metadata['dict_main'])
         if 'dict_cols' in metadata and hasattr(strategy, 'dict_encoders'):
             # Reconstruct column encoders
             for k, v in metadata['dict_cols'].items():
-                from ..algorithms.dictionary import DictionaryEncoder
-                enc = DictionaryEncoder()
-                enc.from_dict(v)
-                strategy.dict_encoders[int(k)] = enc
-        
-        # 3. Decode
-        if isinstance(strategy, TextStrategy):
-            tokens = strategy.decode(BitReader(compressed_data), metadata)
-        else:
-            tokens = strategy.decode(compressed_data, metadata)
-        
-        # 4. Reconstruct
-        data = strategy.reconstruct(tokens)
+                enc = strategy.dict_encoders.setdefault(int(k), DictionaryEncoder())
+                enc.update(v)
         
-        # 5. Write Output
-        with open(output_path, 'w', encoding='utf-8') as f:
-            if isinstance(data, (dict, list)):
-                json.dump(data, f, indent=2)
-            elif isinstance(data, str):
-                f.write(data)
-            else:
-                f.write(str(data))
-                
-        print(f"Restored to {output_path}")
+        strategy.load_model(metadata)
+        return strategy
+
+    def extract_archive(self, archive_path: str, output_dir: str, members: List[str] = None) -> List[str]:
+        """
+        Restore members of an IFCA archive into output_dir (all by default).
+        Members are located via the central directory; nothing else is decoded.
+        A restored member whose size or CRC32 differs from its directory
+        entry (restored_size, restored_crc32) is removed again and raises
+        ValueError. Returns the written paths.
+        """
+        written = []
+        with open(archive_path, 'rb') as f:
+            archive = IFCArchiveReader(f)
+            decompressor = Decompressor(list(self.shared_models.values()) +
+                                        [SharedModel(sid, body) for sid, body in archive.models])
+            names = members if members is not None else [m["name"] for m in archive.members]
+            root = os.path.abspath(output_dir)
+            for name in names:
+                output_path = os.path.abspath(os.path.join(root, name))
+                if os.path.commonpath([root, output_path]) != root:
+                    raise ValueError(f"Unsafe member name: {name}")
+                os.makedirs(os.path.dirname(output_path), exist_ok=True)
+                strat_id, metadata, compressed_data = archive.read_member(name)
+                decompressor.restore(strat_id, metadata, compressed_data, output_path)
+                entry = archive.find(name)
+                if "restored_crc32" in entry and (os.path.getsize(output_path) != entry["restored_size"] or
+                                                  file_crc32(output_path) != entry["restored_crc32"]):
+                    os.remove(output_path)
+                    raise ValueError(f"Archive member {name} does not restore to what the directory says "
+                                     f"(size or CRC32)")
+                written.append(output_path)
+        return written
+
+    def _shared_model(self, ref: Dict[str, str]) -> SharedModel:
+        shared = self.shared_models.get(ref['id'])
+        if shared is None:
+            raise ValueError(f"Shared dictionary '{ref['id']}' is required to decompress this file")
+        if shared.hash != ref['hash']:
+            raise ValueError(f"Shared dictionary '{ref['id']}' does not match (hash {shared.hash} != {ref['hash']})")
+        return shared
+
+
+def _data_blocks(strategy: Any, entries: List[BlockEntry]) -> Iterator[BlockEntry]:
+    """Data blocks among the frames of a blocked file, applying model frames on the way."""
+    for entry in entries:
+        if entry.kind == MODEL_FRAME:
+            strategy.update_model(entry.meta)
+        elif entry.kind is None:
+            yield entry
+
+def _covering_blocks(f: BinaryIO, strategy: Any, entries: List[BlockEntry], start: int,
+                     stop: int) -> Iterator[BlockEntry]:
+    """
+    The data blocks among entries that hold records in [start, stop), read
+    with BlockReader.load, applying the model frames in front of them.
+    """
+    wanted = BlockReader.covering(entries, start, stop)
+    if not wanted:
+        return
+    offsets = {entry.offset for entry in wanted}
+    for entry in entries:
+        if entry.offset > wanted[-1].offset:
+            return
+        if entry.kind == MODEL_FRAME:
+            strategy.update_model(BlockReader.load(f, entry).meta)
+        elif entry.offset in offsets:
+            yield BlockReader.load(f, entry)
+
+def _check_index(f: BinaryIO, metadata: Dict[str, Any], payload_start: int, entries: List[BlockEntry]) -> List[str]:
+    """Problems with the index frame of a blocked file, given all its frames (BlockReader.scan)."""
+    indexed = BlockReader.index(f, metadata, payload_start)
+    if indexed is None:
+        return ["index: the header points at no index frame"]
+    located = lambda frames: [(e.kind, e.offset, e.meta.get("first"), e.meta.get("count"))
+                              for e in frames if e.kind in (None, MODEL_FRAME)]
+    if located(indexed) != located(entries):
+        return ["index: does not match the frames"]
+    return []
+
+def _label(source: Source) -> str:
+    """How a source is named in error messages."""
+    return os.fspath(source) if is_path(source) else "Input"
+
+def _check_trailer(f: BinaryIO, strat_id: int, metadata: Dict[str, Any], payload_start: int, end: int) -> List[str]:
+    """Problems with the header and payload CRCs of the file f, whose trailer ends at `end`."""
+    if end - payload_start < IFCWriter.TRAILER_SIZE:
+        return ["trailer: missing (truncated?)"]
+    f.seek(end - IFCWriter.TRAILER_SIZE)
+    trailer = f.read(IFCWriter.TRAILER_SIZE)
+    if trailer[:4] != IFCWriter.TRAILER_MAGIC:
+        return ["trailer: missing (truncated?)"]
+    header_crc, payload_crc = struct.unpack('>II', trailer[4:])
+
+    problems = []
+    if IFCWriter.header_crc(strat_id, metadata) != header_crc:
+        problems.append("header: checksum mismatch")
+    f.seek(payload_start)
+    crc = 0
+    left = end - IFCWriter.TRAILER_SIZE - payload_start
+    while left:
+        chunk = f.read(min(left, 1 << 20))
+        crc = zlib.crc32(chunk, crc)
+        left -= len(chunk)
+    if crc != payload_crc:
+        problems.append("payload: checksum mismatch")
+    return problems
+
+def _first_difference(a: Iterator[str], b: Iterator[str]) -> int:
+    """Offset of the first character where two texts given chunk by chunk differ; -1 if they do not."""
+    a, b = iter(a), iter(b)
+    left = right = ""
+    pos = 0
+    while True:
+        while not left:
+            left = next(a, None)
+            if left is None:
+                left = ""
+                break
+        while not right:
+            right = next(b, None)
+            if right is None:
+                right = ""
+                break
+        if not left or not right:
+            return pos if left or right else -1
+        n = min(len(left), len(right))
+        if left[:n] != right[:n]:
+            return pos + next(i for i in range(n) if left[i] != right[i])
+        left, right, pos = left[n:], right[n:], pos + n
@@ -1,9 +1,13 @@
+import io
 import os
+from ..strategies import registry
+from ..utils.sources import Source, is_path, is_stream
 
 class FileDetector:
     """
     Detects file type based on extension and magic bytes.
-    Returns strict constants: 'json', 'csv', 'log', 'text'.
+    Returns the file type of a registered strategy: 'json', 'csv', 'log',
+    'text' or one added by a plugin.
     """
     
     # Constants
@@ -13,23 +17,57 @@ class FileDetector:
     TEXT = "text"
 
     @staticmethod
-    def detect(file_path: str) -> str:
+    def is_supported(file_path: str) -> bool:
+        """True if some registered strategy (built-in or plugin) accepts the file."""
+        return registry.detect(file_path) is not None
+
+    @staticmethod
+    def detect(source: Source, name: str = None) -> str:
         """
-        Identify file type. Raises ValueError if unsupported.
+        Identify file type via the strategy registry (extensions, then
+        content sniffers of plugins). Data and file objects are detected by
+        the extension of `name`, if any, and their first bytes; a file
+        object is left where it was. Raises ValueError if unsupported.
         """
-        if not os.path.exists(file_path):
-            raise FileNotFoundError(f"File not found: {file_path}")
-
-        _, ext = os.path.splitext(file_path)
-        ext = ext.lower()
-
-        if ext == '.json':
-            return FileDetector.JSON
-        elif ext == '.csv':
-            return FileDetector.CSV
-        elif ext == '.log':
-            return FileDetector.LOG
-        elif ext in ['.txt', '.md']:
-            return FileDetector.TEXT
+        if is_path(source):
+            if not os.path.exists(source):
+                raise FileNotFoundError(f"File not found: {source}")
+            spec = registry.detect(source)
+            ext = os.path.splitext(source)[1].lower()
         else:
+            spec = registry.detect(name or "", FileDetector._head(source))
+            ext = os.path.splitext(name or "")[1].lower()
+        if spec is None:
+            if not ext and not is_path(source):
+                raise ValueError("Unsupported file format: pass the file type or a name with an extension")
             raise ValueError(f"Unsupported file format: {ext}")
+        return spec.file_type
+
+    @staticmethod
+    def detect_name(name: str) -> str:
+        """
+        File type for the extension of name alone, for input that cannot be
+        looked at before it is compressed. Raises ValueError if no strategy
+        claims the extension.
+        """
+        ext = os.path.splitext(name or "")[1].lower()
+        for spec in registry.specs() if ext else ():
+            if ext in spec.extensions:
+                return spec.file_type
+        if not ext:
+            raise ValueError("Cannot detect the type without a name: pass the file type or a name with an extension")
+        raise ValueError(f"Unsupported file format: {ext}")
+
+    @staticmethod
+    def _head(source: Source) -> bytes:
+        """First HEAD_SIZE bytes of data or a file object, without consuming them."""
+        if not is_stream(source):
+            return bytes(memoryview(source).cast('B')[:registry.HEAD_SIZE])
+        if hasattr(source, "peek"):
+            return source.peek(registry.HEAD_SIZE)[:registry.HEAD_SIZE]
+        if not source.seekable():
+            raise ValueError("Cannot detect the type of an unseekable stream: pass the file type")
+        pos = source.tell()
+        head = source.read(registry.HEAD_SIZE)
+        source.seek(pos, io.SEEK_SET)
+        return head
@@ -0,0 +1,167 @@
+import os
+import threading
+import time
+import zlib
+from .compressor import APPEND_TAIL, Appender, Compressor
+from ..strategies import registry
+
+# Follows a growing log like `tail -F` and appends it to an appendable IFC1
+# file (see Compressor.append) as it grows. Complete lines are collected
+# until flush_bytes of them are pending or the oldest has waited
+# flush_interval seconds, then written as blocks followed by a new state
+# frame. Each flush ends with the file complete and readable, and a
+# restarted follower resumes where the last flush stopped.
+#
+# Rotation: when the path names a new file (rename + create) the old one
+# is read to its end, its last line flushed even without a newline (one is
+# added: the restored log ends that line with "\n"), and the new file
+# followed from its start. A file that shrinks below what was read
+# (copytruncate) is followed from its start as well.
+
+# Read size once a partial line of flush_bytes or more is pending
+READ_MIN = 1 << 16
+
+class LogFollower:
+    def __init__(self, compressor: Compressor, input_path: str, output_path: str, file_type: str = "log",
+                 flush_bytes: int = 1 << 20, flush_interval: float = 5.0, poll_interval: float = 0.5,
+                 model: str = "auto"):
+        self.spec = registry.for_type(file_type)
+        if not self.spec.supports(registry.APPEND):
+            raise ValueError(f"Following is not supported for {file_type} files")
+        self.compressor = compressor
+        self.input_path = input_path
+        self.output_path = output_path
+        self.file_type = file_type
+        self.flush_bytes = flush_bytes
+        self.flush_interval = flush_interval
+        self.poll_interval = poll_interval
+        self.model = model
+        self.src = None        # the followed file, once it exists
+        self.offset = 0        # input offset of the first pending byte
+        self.pending = bytearray()
+        self.tail = b""        # up to APPEND_TAIL input bytes before offset
+        self.since = None      # when the oldest pending byte was read
+        self.records = 0       # records appended by this follower
+        self._target = None    # Appender on the output file
+        self._out = None
+
+    def run(self, stop: threading.Event = None):
+        """Follows the input until stop is set (or forever), then flushes and closes."""
+        stop = stop or threading.Event()
+        try:
+            while not stop.is_set():
+                if not self.step():
+                    stop.wait(self._idle_wait())
+        finally:
+            self.close()
+
+    def step(self) -> bool:
+        """
+        Reads what the input has in store, up to flush_bytes pending,
+        flushing when a threshold is reached. Returns whether anything was
+        read.
+        """
+        if self.src is None and not self._open():
+            return False
+        data = self.src.read(self.flush_bytes - len(self.pending) if len(self.pending) < self.flush_bytes else READ_MIN)
+        if data:
+            if not self.pending:
+                self.since = time.monotonic()
+            self.pending += data
+        else:
+            self._check_rotation()
+        if self._due():
+            self.flush()
+        return bool(data)
+
+    def flush(self, final: bool = False) -> int:
+        """
+        Writes the pending complete lines (with final, the partial last
+        line too, with a newline added) as new blocks. Returns the number
+        of records written.
+        """
+        end = len(self.pending) if final else self.pending.rfind(b"\n") + 1
+        if not end:
+            return 0
+        lines = bytes(self.pending[:end])
+        del self.pending[:end]
+        self.since = time.monotonic() if self.pending else None
+        self.offset += end
+        self.tail = (self.tail + lines)[-APPEND_TAIL:]
+        if not lines.endswith(b"\n"):
+            lines += b"\n"
+        crc = zlib.crc32(self.tail)
+
+        if self._target is None:
+            self._out = open(self.output_path, 'w+b')
+            added = self.compressor.start_appendable(self._out, self.file_type, os.path.basename(self.input_path),
+                                                     lines, self.offset, crc)
+            self._out.flush()
+            self._out.seek(0)
+            self._target = Appender(self.compressor, self._out, self.spec, self.output_path)
+        else:
+            added = self._target.add(lines, self.offset, crc, self.model)
+        self.records += added
+        if self.compressor.verbose:
+            print(f"Appended {added} records to {self.output_path}")
+        return added
+
+    def close(self):
+        """Flushes the pending complete lines and closes both files."""
+        try:
+            self.flush()
+        finally:
+            for f in (self.src, self._out):
+                if f is not None:
+                    f.close()
+            self.src = self._out = self._target = None
+
+    def _open(self) -> bool:
+        """Opens the input (and the output, if it exists); False if there is no input yet."""
+        try:
+            self.src = open(self.input_path, 'rb')
+        except FileNotFoundError:
+            return False
+        if self._target is None and os.path.exists(self.output_path):
+            self._out = open(self.output_path, 'r+b')
+            self._target = Appender(self.compressor, self._out, self.spec, self.output_path)
+            offset = self._target.resume_offset(self.src)
+            if offset is None:
+                # Rotated while nobody was following: take the new file from its start
+                if self.compressor.verbose:
+                    print(f"{self.input_path} does not continue {self.output_path}, reading it from the start")
+                offset = 0
+            self.offset = offset
+            self.src.seek(max(offset - APPEND_TAIL, 0))
+            self.tail = self.src.read(offset - self.src.tell())
+        return True
+
+    def _check_rotation(self):
+        """Switches to a new file at the input path; called when the current one is read to its end."""
+        try:
+            stat = os.stat(self.input_path)
+        except FileNotFoundError:
+            return # renamed, the new file is not there yet
+        current = os.fstat(self.src.fileno())
+        read = self.offset + len(self.pending)
+        if (stat.st_ino, stat.st_dev) != (current.st_ino, current.st_dev):
+            self.flush(final=True)
+            self.src.close()
+            self.src = None
+        elif current.st_size < read:
+            self.flush(final=True)
+            self.src.seek(0)
+        else:
+            return
+        self.offset = 0
+        self.tail = b""
+
+    def _due(self) -> bool:
+        if len(self.pending) >= self.flush_bytes:
+            return True
+        return self.since is not None and time.monotonic() - self.since >= self.flush_interval
+
+    def _idle_wait(self) -> float:
+        if self.since is None or b"\n" not in self.pending:
+            return self.poll_interval
+        return max(min(self.poll_interval, self.since + self.flush_interval - time.monotonic()), 0)
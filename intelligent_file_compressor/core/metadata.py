@@ -1,39 +1,59 @@
-from dataclasses import dataclass, field
-from typing import Dict, Any, Optional
 import json
+from dataclasses import dataclass, field, asdict
+from typing import Dict, Any, Iterable
 
 @dataclass
 class FileMetadata:
-    version: str = "1.0"
-    strategy_name: str = "GENERIC"
-    original_size: int = 0
-    compressed_size: int = 0
-    dictionary: Dict[int, str] = field(default_factory=dict)
-    extra_params: Dict[str, Any] = field(default_factory=dict)
-
-    def to_bytes(self) -> bytes:
-        """Serialize metadata to JSON bytes."""
-        data = {
-            "v": self.version,
-            "s": self.strategy_name,
-            "os": self.original_size,
-            "cs": self.compressed_size,
-            "d": self.dictionary,
-            "e": self.extra_params
-        }
-        return json.dumps(data).encode('utf-8')
+    """
+    Size and coding statistics of one compressed file, stored in its header
+    under "stats" so that `ifc stats` reads nothing but the header. -1
+    means not known: the header is written before the payload and filled
+    in afterwards, which is not possible on an unseekable output.
+
+    streams: per stream, {"tokens", "bytes", "symbols"} (multi-stream
+    strategies only); records: lines or data rows of blocked files.
+    """
+    original_size: int = -1
+    compressed_size: int = -1
+    header_size: int = -1
+    records: int = -1
+    tokens: int = -1
+    distinct_symbols: int = -1
+    dictionary_entries: int = -1
+    codebook_bytes: int = -1
+    time_ms: int = -1
+    streams: Dict[str, Dict[str, int]] = field(default_factory=dict)
+
+    # Largest value any field is filled in with: room is kept for it
+    LIMIT = 10 ** 15 - 1
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+    def known(self) -> Dict[str, Any]:
+        """to_dict() without unknown values, for headers never rewritten in place."""
+        return {k: v for k, v in self.to_dict().items() if v != -1 and v != {}}
 
     @classmethod
-    def from_bytes(cls, data: bytes) -> 'FileMetadata':
-        """Deserialize metadata from JSON bytes."""
-        d = json.loads(data.decode('utf-8'))
-        # Convert dictionary keys back to integers if they were stored as strings in JSON
-        dictionary = {int(k): v for k, v in d.get("d", {}).items()}
-        return cls(
-            version=d.get("v", "1.0"),
-            strategy_name=d.get("s", "GENERIC"),
-            original_size=d.get("os", 0),
-            compressed_size=d.get("cs", 0),
-            dictionary=dictionary,
-            extra_params=d.get("e", {})
-        )
+    def from_dict(cls, data: Dict[str, Any]) -> 'FileMetadata':
+        return cls(**{k: v for k, v in data.items() if k in cls.__dataclass_fields__})
+
+    @classmethod
+    def placeholder(cls, stream_names: Iterable[str], original_size: int = -1) -> 'FileMetadata':
+        """Stats of a file about to be written: nothing known but maybe its original size."""
+        return cls(original_size=original_size,
+                   streams={name: {"tokens": -1, "bytes": -1, "symbols": -1} for name in stream_names})
+
+    def room(self) -> int:
+        """Bytes of JSON these stats can grow by once every number is filled in."""
+        full = FileMetadata(**{k: self.LIMIT for k in self.__dataclass_fields__ if k != "streams"})
+        full.streams = {name: {k: self.LIMIT for k in stream} for name, stream in self.streams.items()}
+        return len(json.dumps(full.to_dict())) - len(json.dumps(self.to_dict()))
+
+    @property
+    def ratio(self) -> float:
+        """Compressed / original size; 0.0 if either is unknown."""
+        if self.original_size <= 0 or self.compressed_size < 0:
+            return 0.0
+        return self.compressed_size / self.original_size
+
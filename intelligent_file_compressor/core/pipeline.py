@@ -0,0 +1,316 @@
+import zlib
+from collections import deque
+from itertools import chain, islice
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Tuple, BinaryIO
+from ..storage.blocks import BlockReader, BlockWriter, MODEL_FRAME
+from ..storage.reader import IFCReader
+from ..utils.profiling import NULL_PROFILER
+from ..utils.sources import Source, is_stream
+
+class Pipeline:
+    """
+    Runs a strategy through the streaming protocol of BaseStrategy:
+
+        compress:   parse_iter -> tokenize_iter -> observe ... fit -> encode_block
+        decompress: decode_block -> reconstruct_iter / reconstruct_blocks
+
+    and does everything that is not strategy specific once: cutting the
+    input into blocks (with the head records in front of each), keeping
+    the observed blocks until the models are fitted (or reading the input
+    a second time for rescan strategies), and, with jobs > 1, tokenizing,
+    encoding and decoding blocks in worker processes. Workers hold a copy
+    of the strategy, so tokenization is only farmed out for strategies
+    with stateless_tokenize; at most `window` blocks are in flight.
+
+    Compression is split in two so the caller can write the header in
+    between: prepare() returns the header fields, write() (or chunks())
+    the payload.
+    """
+
+    def __init__(self, strategy: Any, profiler=None, jobs: int = 1, window: int = 0):
+        self.strategy = strategy
+        self.profiler = profiler or NULL_PROFILER
+        self.jobs = jobs
+        self.window = window or 2 * jobs
+        self.block_metas = [] # meta of every encoded block
+        self.block_offsets = [] # where the frame of each is in what chunks() yielded
+        self.payload_crc = 0  # CRC32 of the payload written so far
+        self._source = None
+        self._start = None    # where a file object source starts, for rescans
+        self._head = None     # head records given by prepare_append()
+        self._first = 0       # record number of the first block
+        self._blocks = None   # observed blocks: (first, count, block)
+        self._single = None   # payload of an unblocked input
+
+    # --- Compression ---
+
+    def prepare(self, source: Source) -> Dict[str, Any]:
+        """
+        Observes every block of source and fits the models. Returns the
+        header fields: the models plus block_size and head for a blocked
+        strategy, or the meta of the only block for an unblocked one (which
+        is therefore encoded here already). A file object source is read
+        from its current position; rescan strategies need it seekable.
+        """
+        strategy = self.strategy
+        profiler = self.profiler
+        head, blocks = self._observe(source)
+        with profiler.phase("train"):
+            strategy.fit()
+
+        fields = strategy.model_metadata()
+        if strategy.block_size:
+            fields["block_size"] = strategy.block_size
+            fields["head"] = head
+            self._blocks = blocks
+        else:
+            if blocks is None:
+                head, chunks = self._records(source)
+                _, records = next(chunks)
+                block = strategy.tokenize_iter(chain(head, records))
+            else:
+                block = blocks[0][2]
+            with profiler.phase("encode"):
+                meta, payload = strategy.encode_block(block)
+            fields.update(meta)
+            self.block_metas = [meta]
+            self._single = payload
+        return fields
+
+    def prepare_append(self, source: Source, head: List[Any], first: int):
+        """
+        Observes every block of source, which continues a blocked file after
+        its first `first` records (head: the file's head records). Nothing
+        is fitted: the caller loads or refits the models, then chunks()
+        encodes the new blocks with them.
+        """
+        self._head = head
+        self._first = first
+        _, self._blocks = self._observe(source)
+
+    def _observe(self, source: Source) -> Tuple[List[Any], List[Tuple[int, int, Any]]]:
+        """(head, observed blocks) of source; the blocks are None for rescan strategies."""
+        strategy = self.strategy
+        profiler = self.profiler
+        self._source = source
+        self._start = None
+        if strategy.rescan and is_stream(source):
+            if not source.seekable():
+                raise ValueError(f"{type(strategy).__name__} reads its input twice: pass a seekable file object")
+            self._start = source.tell()
+        head, chunks = self._records(source)
+
+        if strategy.rescan:
+            # Nothing is kept: write() tokenizes the input again
+            with profiler.phase("train"):
+                for _, records in chunks:
+                    strategy.observe(strategy.tokenize_iter(chain(head, records)))
+            return head, None
+        blocks = []
+        for first, records, tokens in self._tokenized(head, chunks):
+            with profiler.phase("train"):
+                blocks.append((first, len(records), strategy.observe(tokens)))
+        return head, blocks
+
+    def write(self, f: BinaryIO):
+        """Encodes the prepared input and writes its payload at the current position of f."""
+        for chunk in self.chunks():
+            with self.profiler.phase("write"):
+                f.write(chunk)
+
+    def chunks(self) -> Iterator[bytes]:
+        """
+        The payload of the prepared input, encoded lazily: the payload
+        chunks of an unblocked input, or the frame header and data of one
+        block after the other. payload_crc follows what was yielded.
+        """
+        profiler = self.profiler
+        if not self.strategy.block_size:
+            payload = self._single
+            self._single = None
+            for chunk in profiler.iterate("encode", [payload] if isinstance(payload, bytes) else payload):
+                self.payload_crc = zlib.crc32(chunk, self.payload_crc)
+                yield chunk
+            return
+
+        self.block_metas = []
+        self.block_offsets = []
+        offset = 0
+        for first, count, (meta, payload) in profiler.iterate("encode", self._encoded()):
+            block_meta = {"first": first, "count": count}
+            block_meta.update(meta)
+            data = payload if isinstance(payload, bytes) else b"".join(payload)
+            block_meta["crc"] = zlib.crc32(data)
+            self.block_metas.append(block_meta)
+            self.block_offsets.append(offset)
+            header = BlockWriter.frame_header(block_meta, len(data))
+            self.payload_crc = zlib.crc32(data, zlib.crc32(header, self.payload_crc))
+            offset += len(header) + len(data)
+            yield header
+            yield data
+
+    def index_frame(self) -> bytes:
+        """
+        The index frame of the blocks chunks() yielded, to follow them
+        (see BlockWriter.index_frame); payload_crc takes it in.
+        """
+        blocks = [[meta["first"], meta["count"], offset] for meta, offset in zip(self.block_metas, self.block_offsets)]
+        frame = BlockWriter.index_frame(blocks, [])
+        self.payload_crc = zlib.crc32(frame, self.payload_crc)
+        return frame
+
+    def _records(self, source: Source) -> Tuple[List[Any], Iterator[Tuple[int, Any]]]:
+        """(head, chunks): chunks yields (first record number, records) per block."""
+        strategy = self.strategy
+        if self._start is not None:
+            source.seek(self._start)
+        records = self.profiler.iterate("parse", strategy.parse_iter(source))
+        head = list(islice(records, strategy.head_records)) if self._head is None else self._head
+        size = strategy.block_size
+        if not size:
+            # One block; only rescan strategies get it lazily
+            return head, iter([(0, records if strategy.rescan else list(records))])
+
+        def chunks() -> Iterator[Tuple[int, List[Any]]]:
+            first = self._first
+            while True:
+                chunk = list(islice(records, size))
+                if not chunk:
+                    return
+                yield first, chunk
+                first += len(chunk)
+        return head, chunks()
+
+    def _tokenized(self, head: List[Any], chunks: Iterator[Tuple[int, List[Any]]]) -> Iterator[Tuple[int, List[Any], List[Any]]]:
+        """(first, records, tokens) per block."""
+        strategy = self.strategy
+        if self.jobs > 1 and strategy.block_size and strategy.stateless_tokenize:
+            chunks = list(chunks)
+            tokens = self._map(_tokenize, [head + records for _, records in chunks])
+            for (first, records), block_tokens in zip(chunks, self.profiler.iterate("tokenize", tokens)):
+                yield first, records, block_tokens
+            return
+        for first, records in chunks:
+            with self.profiler.phase("tokenize"):
+                tokens = list(strategy.tokenize_iter(head + records))
+            yield first, records, tokens
+
+    def _encoded(self) -> Iterator[Tuple[int, int, Tuple[Dict[str, Any], Any]]]:
+        """(first, count, (meta, payload)) per block, in order."""
+        strategy = self.strategy
+        if self._blocks is None:
+            head, chunks = self._records(self._source)
+            for first, records in chunks:
+                yield first, len(records), strategy.encode_block(strategy.tokenize_iter(head + records))
+            return
+        blocks, self._blocks = self._blocks, None
+        if self.jobs > 1:
+            encoded = self._map(_encode, [block for _, _, block in blocks])
+        else:
+            encoded = (strategy.encode_block(block) for _, _, block in blocks)
+        for (first, count, _), result in zip(blocks, encoded):
+            yield first, count, result
+
+    # --- Decompression ---
+
+    def decompress(self, metadata: Dict[str, Any], payload: BinaryIO) -> Iterator[str]:
+        """
+        Output text of an IFC1 payload read from the current position of
+        payload; the strategy's models must already be loaded. Blocked files
+        (LOG, CSV) are decoded one block at a time, so output starts after
+        the first block and memory stays flat. Unblocked ones (JSON, TEXT)
+        are one block: their whole payload is read and decoded into tokens
+        first, and only the output text is produced lazily. payload is read
+        front to back, so it need not be seekable.
+        """
+        strategy = self.strategy
+        profiler = self.profiler
+        if 'block_size' in metadata:
+            records = self._block_records(payload, metadata.get("checksum") == "crc32")
+            return strategy.reconstruct_blocks(metadata.get('head', []), profiler.iterate("decode", records))
+
+        with profiler.phase("read"):
+            data = IFCReader.payload(metadata, payload.read())
+        with profiler.phase("decode"):
+            tokens = strategy.decode_block(metadata, data)
+        return strategy.reconstruct_iter(tokens)
+
+    def canonical(self, metadata: Dict[str, Any], source: Source) -> Iterator[str]:
+        """
+        Output text of source, the input of a file with this header, taken
+        through the strategy without entropy coding: what decompressing the
+        file must give, which is source itself only for lossless strategies.
+        """
+        strategy = self.strategy
+        strategy.block_size = metadata.get('block_size', 0)
+        self._source = source
+        head, chunks = self._records(source)
+        if strategy.block_size:
+            blocks = (strategy.block_records(strategy.coded_tokens(strategy.tokenize_iter(head + records)))
+                      for _, records in chunks)
+            return strategy.reconstruct_blocks(metadata.get('head', []), blocks)
+        _, records = next(chunks)
+        return strategy.reconstruct_iter(strategy.coded_tokens(strategy.tokenize_iter(chain(head, records))))
+
+    def _block_records(self, payload: BinaryIO, trailer: bool = False) -> Iterator[List[Any]]:
+        """Records of every data block of a blocked payload, applying model frames on the way."""
+        strategy = self.strategy
+        frames = BlockReader.read_blocks(payload, trailer)
+        model = []
+
+        def blocks() -> Iterator[Tuple[Dict[str, Any], bytes]]:
+            # Data blocks up to the next model frame, which is left in `model`
+            for meta, data in frames:
+                kind = meta.get("kind")
+                if kind == MODEL_FRAME:
+                    model.append(meta)
+                    return
+                if kind is None:
+                    yield meta, data
+
+        while True:
+            if self.jobs > 1:
+                # Workers copy the strategy at pool start: one pool per model
+                yield from self._map(_decode, blocks(), star=True)
+            else:
+                for meta, data in blocks():
+                    yield strategy.block_records(strategy.decode_block(meta, data))
+            if not model:
+                return
+            strategy.update_model(model.pop())
+
+    # --- Workers ---
+
+    def _map(self, fn: Callable, items: Iterable[Any], star: bool = False) -> Iterator[Any]:
+        """fn over items in a pool of worker processes, in order, window items in flight."""
+        # Imported here: multiprocessing is costly to load and most runs never need it
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(max_workers=self.jobs, initializer=_init_worker,
+                                 initargs=(self.strategy,)) as pool:
+            pending = deque()
+            for item in items:
+                pending.append(pool.submit(fn, *item) if star else pool.submit(fn, item))
+                if len(pending) >= self.window:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+
+
+# --- Worker side ---
+# Every worker gets a copy of the strategy (with its fitted models for
+# encoding and decoding) once, when the pool starts.
+_worker_strategy = None
+
+def _init_worker(strategy: Any):
+    global _worker_strategy
+    _worker_strategy = strategy
+
+def _tokenize(records: List[Any]) -> List[Any]:
+    return list(_worker_strategy.tokenize_iter(records))
+
+def _encode(block: Any) -> Tuple[Dict[str, Any], bytes]:
+    meta, payload = _worker_strategy.encode_block(block)
+    return meta, payload if isinstance(payload, bytes) else b"".join(payload)
+
+def _decode(block_meta: Dict[str, Any], data: bytes) -> List[Any]:
+    return _worker_strategy.block_records(_worker_strategy.decode_block(block_meta, data))
@@ -0,0 +1,95 @@
+import hashlib
+import json
+from typing import Dict, Any, List
+from ..algorithms.dictionary import DictionaryEncoder
+from ..algorithms.multi_stream import MultiStreamCoder
+from ..storage.dict_file import IFCDictFile
+from ..strategies import registry
+
+class SharedModel:
+    """
+    Pre-trained model shared by many small files (zstd dictionary mode).
+    Holds per-stream entropy models and key/column dictionaries trained on
+    a corpus sample. Files compressed with it store only {"id", "hash"}
+    plus whatever the sample did not cover (new keys, models for streams
+    with many new symbols); the models escape a few new symbols.
+    """
+
+    def __init__(self, strategy_id: int, body: Dict[str, Any]):
+        self.strategy_id = strategy_id
+        self.body = body
+        self.id = body["id"]
+        self.hash = SharedModel.body_hash(body)
+        self.dict_main = body.get("dict_main", {})
+        self.dict_cols = body.get("dict_cols", {})
+        # Deserialize once; the models are reused by every file
+        self.coder = MultiStreamCoder()
+        self.coder.from_dict(body["streams"])
+
+    @staticmethod
+    def body_hash(body: Dict[str, Any]) -> str:
+        canonical = json.dumps(body, sort_keys=True).encode('utf-8')
+        return hashlib.sha256(canonical).hexdigest()[:16]
+
+    @classmethod
+    def train(cls, strategy_id: int, strategy: Any, sample_paths: List[str], model_id: str = None) -> 'SharedModel':
+        """Train on sample files with a fresh MultiStreamStrategy instance."""
+        if not registry.get(strategy_id).supports(registry.MULTI_STREAM):
+            raise ValueError("Shared models are only supported for multi-stream strategies")
+
+        streams = {}
+        for path in sample_paths:
+            tokens = strategy.tokenize(strategy.parse(path))
+            for name, stream in strategy.split_streams(tokens).items():
+                streams.setdefault(name, []).extend(stream)
+        strategy.coder.escape = True
+        strategy.coder.train(streams)
+
+        body = {"id": model_id or "", "streams": strategy.coder.to_dict()}
+        if hasattr(strategy, 'dict_encoder'):
+            body['dict_main'] = strategy.dict_encoder.to_dict()
+        if hasattr(strategy, 'dict_encoders'):
+            body['dict_cols'] = {str(k): v.to_dict() for k, v in strategy.dict_encoders.items()}
+        if not body["id"]:
+            body["id"] = SharedModel.body_hash(body)[:8]
+        return cls(strategy_id, json.loads(json.dumps(body)))
+
+    @classmethod
+    def load(cls, path: str) -> 'SharedModel':
+        strategy_id, body = IFCDictFile.read(path)
+        return cls(strategy_id, body)
+
+    def save(self, path: str):
+        IFCDictFile.write(path, self.strategy_id, self.body)
+
+    def reference(self) -> Dict[str, str]:
+        """What a compressed file stores to point at this model."""
+        return {"id": self.id, "hash": self.hash}
+
+    def apply(self, strategy: Any):
+        """Seed a strategy instance with the shared models and dictionaries."""
+        strategy.coder.load_shared(self.coder)
+        if hasattr(strategy, 'dict_encoder'):
+            strategy.dict_encoder.update(self.dict_main)
+        if hasattr(strategy, 'dict_encoders'):
+            for k, v in self.dict_cols.items():
+                enc = DictionaryEncoder()
+                enc.update(v)
+                strategy.dict_encoders[int(k)] = enc
+
+    def dictionary_delta(self, strategy: Any) -> Dict[str, Any]:
+        """Dictionary entries the strategy added on top of the shared ones."""
+        delta = {}
+        if hasattr(strategy, 'dict_encoder'):
+            added = strategy.dict_encoder.to_dict(after=len(self.dict_main))
+            if added:
+                delta['dict_main'] = added
+        if hasattr(strategy, 'dict_encoders'):
+            cols = {}
+            for k, v in strategy.dict_encoders.items():
+                added = v.to_dict(after=len(self.dict_cols.get(str(k), {})))
+                if added:
+                    cols[str(k)] = added
+            if cols:
+                delta['dict_cols'] = cols
+        return delta
@@ -1,5 +1,6 @@
 import os
 import struct
+import zlib
 
 def get_file_size(filepath: str) -> int:
     """Return the size of a file in bytes."""
@@ -17,3 +18,11 @@ def chunk_data(data: bytes, chunk_size: int):
     """Yield chunks of data."""
     for i in range(0, len(data), chunk_size):
         yield data[i:i + chunk_size]
+
+def file_crc32(filepath: str, chunk_size: int = 1 << 20) -> int:
+    """CRC32 of a file's bytes, read in chunks."""
+    crc = 0
+    with open(filepath, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            crc = zlib.crc32(chunk, crc)
+    return crc
@@ -0,0 +1,89 @@
+import struct
+import json
+from typing import Dict, Any, List, Tuple, BinaryIO
+from .reader import IFCReader
+
+class IFCArchiveWriter:
+    """
+    Writes IFCA archives (many compressed members, one central directory):
+    MAGIC (4b) | VER (1b) | MEMBER* | DIRECTORY | DIR_LEN (4b) | DIR_OFFSET (8b) | MAGIC (4b)
+
+    Each member is a complete IFC1 file. The directory (JSON) sits at the end,
+    like ZIP's central directory, so members can be streamed in one pass.
+    """
+    MAGIC = b"IFCA"
+    VERSION = 1
+    FOOTER_SIZE = 16
+
+    def __init__(self, f: BinaryIO):
+        self.f = f
+        self.members = []
+        self.models = []
+        f.write(IFCArchiveWriter.MAGIC)
+        f.write(struct.pack('B', IFCArchiveWriter.VERSION))
+
+    def add_member(self, name: str, strategy_id: int, offset: int, compressed_size: int,
+                   original_size: int, crc32: int, restored_size: int, restored_crc32: int):
+        """
+        Record a member already written at `offset` of the archive stream.
+        crc32 is of the original bytes; restored_size and restored_crc32
+        are of what extracting the member gives, which only lossless
+        strategies restore byte for byte.
+        """
+        self.members.append({
+            "name": name,
+            "strategy": strategy_id,
+            "offset": offset,
+            "compressed_size": compressed_size,
+            "original_size": original_size,
+            "crc32": crc32,
+            "restored_size": restored_size,
+            "restored_crc32": restored_crc32
+        })
+
+    def add_model(self, strategy_id: int, body: Dict[str, Any]):
+        """Embed a shared model that members reference by ID."""
+        self.models.append({"strategy": strategy_id, "body": body})
+
+    def close(self):
+        directory = json.dumps({"members": self.members, "models": self.models}).encode('utf-8')
+        offset = self.f.tell()
+        self.f.write(directory)
+        self.f.write(struct.pack('>IQ', len(directory), offset))
+        self.f.write(IFCArchiveWriter.MAGIC)
+
+
+class IFCArchiveReader:
+    """
+    Reads the central directory of an IFCA archive and seeks to single
+    members without touching the others.
+    """
+
+    def __init__(self, f: BinaryIO):
+        self.f = f
+        if f.read(4) != IFCArchiveWriter.MAGIC:
+            raise ValueError("Invalid file format: Not an IFC archive")
+        version = struct.unpack('B', f.read(1))[0]
+        if version != IFCArchiveWriter.VERSION:
+            raise ValueError(f"Unsupported archive version: {version}")
+
+        f.seek(-IFCArchiveWriter.FOOTER_SIZE, 2)
+        dir_len, dir_offset = struct.unpack('>IQ', f.read(12))
+        if f.read(4) != IFCArchiveWriter.MAGIC:
+            raise ValueError("Corrupt archive: missing central directory")
+        f.seek(dir_offset)
+        directory = json.loads(f.read(dir_len).decode('utf-8'))
+        self.members = directory["members"]
+        self.models = [(m["strategy"], m["body"]) for m in directory["models"]]
+        self._index = {m["name"]: m for m in self.members}
+
+    def find(self, name: str) -> Dict[str, Any]:
+        if name not in self._index:
+            raise KeyError(f"No member named '{name}' in archive")
+        return self._index[name]
+
+    def read_member(self, name: str) -> Tuple[int, Dict[str, Any], bytes]:
+        """Returns (strategy_id, metadata, compressed_data) of one member."""
+        entry = self.find(name)
+        self.f.seek(entry["offset"])
+        return IFCReader.read_stream(self.f, entry["compressed_size"])
@@ -0,0 +1,219 @@
+import bisect
+import struct
+import json
+import zlib
+from dataclasses import dataclass
+from typing import Dict, Any, List, Iterator, Optional, Tuple, BinaryIO
+from .writer import IFCWriter
+
+# Frame kinds (meta["kind"]) besides data blocks, which have none. Model and
+# state frames only occur in files that were appended to (Compressor.append).
+MODEL_FRAME = "model" # replaces the models of some streams for the frames that follow
+STATE_FRAME = "state" # where the next append resumes; the last one is in effect
+INDEX_FRAME = "index" # where the frames in front of it are; the header points at it
+
+@dataclass
+class BlockEntry:
+    """One framed block: its metadata and where its data lives in the stream."""
+    meta: Dict[str, Any]
+    data_offset: int
+    data_len: int
+    offset: int = -1 # start of the frame
+
+    @property
+    def kind(self) -> Optional[str]:
+        """None for a data block, MODEL_FRAME or STATE_FRAME otherwise."""
+        return self.meta.get("kind")
+
+    @property
+    def first(self) -> int:
+        return self.meta["first"]
+
+    @property
+    def count(self) -> int:
+        return self.meta["count"]
+
+
+class BlockWriter:
+    """
+    Writes framed blocks of a blocked payload (LOG, CSV):
+    MAGIC (4b) | META_LEN (4b) | DATA_LEN (4b) | META (JSON) | DATA
+
+    META holds at least the first record number, the record count and the
+    stream layout of DATA, so blocks can be located and decoded on their own,
+    and "crc", the CRC32 of DATA, in files written with checksums.
+    """
+    MAGIC = b"IFCB"
+    FRAME_HEADER_SIZE = 12
+    DATA_LEN_OFFSET = 8 # where DATA_LEN is in the frame header
+
+    @staticmethod
+    def write_block(f: BinaryIO, meta: Dict[str, Any], data: bytes):
+        f.write(BlockWriter.frame_header(meta, len(data)))
+        f.write(data)
+
+    @staticmethod
+    def frame_header(meta: Dict[str, Any], data_len: int) -> bytes:
+        """Everything of a frame that precedes its data."""
+        meta_bytes = json.dumps(meta).encode('utf-8')
+        return BlockWriter.MAGIC + struct.pack('>I', len(meta_bytes)) + BlockWriter.data_len(data_len) + meta_bytes
+
+    @staticmethod
+    def index_frame(blocks: List[List[int]], models: List[int]) -> bytes:
+        """
+        An index frame (empty DATA): blocks is [first, count, offset] of
+        every data block, models the offset of every model frame, offsets
+        counted from the payload start.
+        """
+        return BlockWriter.frame_header({"kind": INDEX_FRAME, "blocks": blocks, "models": models}, 0)
+
+    @staticmethod
+    def data_len(n: int) -> bytes:
+        """The DATA_LEN field of a frame header."""
+        return struct.pack('>I', n)
+
+
+class BlockReader:
+    """
+    Locates the frames of a blocked payload: from the index frame the
+    header points at (see index()), or by hopping from frame header to
+    frame header (scan()). Block data is only read on demand.
+    """
+
+    @staticmethod
+    def index(f: BinaryIO, metadata: Dict[str, Any], payload_start: int) -> Optional[List[BlockEntry]]:
+        """
+        Entries of the data blocks and model frames of the payload at
+        payload_start in f, as the header's index frame has them, followed
+        by those scanned after it (written by appends since). Only first,
+        count and offset are known of indexed frames: load() reads the
+        rest. None if there is no index, or the header's pointer (which
+        no checksum covers) does not lead to one; f is left at the trailer
+        otherwise.
+        """
+        pointer = metadata.get("index", -1)
+        if pointer < 0:
+            return None
+        f.seek(payload_start + pointer)
+        try:
+            frame = BlockReader._read_frame_header(f)
+        except (ValueError, struct.error):
+            return None
+        if frame is None or frame[0] is None or frame[0].get("kind") != INDEX_FRAME:
+            return None
+        meta, data_len, _ = frame
+        entries = [BlockEntry({"first": first, "count": count}, -1, -1, payload_start + offset)
+                   for first, count, offset in meta["blocks"]]
+        entries += [BlockEntry({"kind": MODEL_FRAME}, -1, -1, payload_start + offset) for offset in meta["models"]]
+        entries.sort(key=lambda e: e.offset)
+        f.seek(data_len, 1)
+        return entries + BlockReader.scan(f)
+
+    @staticmethod
+    def load(f: BinaryIO, entry: BlockEntry) -> BlockEntry:
+        """The entry with its frame's meta and data location read, if index() left them out."""
+        if entry.data_offset >= 0:
+            return entry
+        f.seek(entry.offset)
+        frame = BlockReader._read_frame_header(f)
+        meta = frame[0] if frame is not None else None
+        if meta is None or meta.get("kind") != entry.kind or (entry.kind is None and meta.get("first") != entry.first):
+            raise ValueError(f"Corrupt block stream: the index does not match the frame at {entry.offset}")
+        data_len = frame[1]
+        return BlockEntry(meta, f.tell(), data_len, entry.offset)
+
+    @staticmethod
+    def scan(f: BinaryIO) -> List[BlockEntry]:
+        """
+        Index every block from the current position of f to EOF, or to the
+        file's trailer, where f is left.
+        """
+        entries = []
+        while True:
+            offset = f.tell()
+            frame = BlockReader._read_frame_header(f)
+            if frame is None:
+                break
+            meta, data_len, raw = frame
+            if meta is None:
+                f.seek(offset)
+                break
+            data_offset = f.tell()
+            entries.append(BlockEntry(meta, data_offset, data_len, offset))
+            f.seek(data_len, 1)
+        return entries
+
+    @staticmethod
+    def read_blocks(f: BinaryIO, trailer: bool = False) -> Iterator[Tuple[Dict[str, Any], bytes]]:
+        """
+        (meta, data) of every block from the current position of f to EOF,
+        read front to back without seeking, so f may be a pipe or socket.
+        Block checksums are verified, and so is the payload checksum in the
+        file's trailer, which must be there if `trailer` is set.
+        """
+        crc = 0
+        while True:
+            frame = BlockReader._read_frame_header(f)
+            if frame is None:
+                if trailer:
+                    raise ValueError("Corrupt block stream: missing checksum trailer (truncated?)")
+                return
+            meta, data_len, raw = frame
+            if meta is None:
+                if struct.unpack('>I', raw[8:])[0] != crc:
+                    raise ValueError("Corrupt block stream: payload checksum mismatch")
+                return
+            data = f.read(data_len)
+            if len(data) != data_len:
+                raise ValueError("Corrupt block stream: truncated block")
+            BlockReader._check(meta, data)
+            crc = zlib.crc32(data, zlib.crc32(raw, crc))
+            yield meta, data
+
+    @staticmethod
+    def _read_frame_header(f: BinaryIO) -> Optional[Tuple[Optional[Dict[str, Any]], int, bytes]]:
+        """
+        (meta, data_len, frame header bytes) of the frame at the current
+        position of f; None at EOF, (None, 0, trailer bytes) at the trailer.
+        """
+        head = f.read(BlockWriter.FRAME_HEADER_SIZE)
+        if not head:
+            return None
+        if len(head) == IFCWriter.TRAILER_SIZE and head[:4] == IFCWriter.TRAILER_MAGIC:
+            return None, 0, head
+        if len(head) < BlockWriter.FRAME_HEADER_SIZE or head[:4] != BlockWriter.MAGIC:
+            raise ValueError("Corrupt block stream: bad frame header")
+        meta_len, data_len = struct.unpack('>II', head[4:])
+        meta_bytes = f.read(meta_len)
+        try:
+            meta = json.loads(meta_bytes.decode('utf-8'))
+        except ValueError:
+            raise ValueError("Corrupt block stream: bad frame metadata")
+        return meta, data_len, head + meta_bytes
+
+    @staticmethod
+    def _check(meta: Dict[str, Any], data: bytes):
+        if "crc" in meta and zlib.crc32(data) != meta["crc"]:
+            raise ValueError(f"Corrupt block stream: checksum mismatch in the block of record {meta.get('first')}")
+
+    @staticmethod
+    def read_data(f: BinaryIO, entry: BlockEntry, offset: int = 0, size: int = -1) -> bytes:
+        """The block's data, or `size` bytes of it from `offset` (e.g. one stream)."""
+        if size < 0:
+            size = entry.data_len - offset
+        f.seek(entry.data_offset + offset)
+        data = f.read(size)
+        if len(data) != size or offset + size > entry.data_len:
+            raise ValueError("Corrupt block stream: truncated block")
+        if size == entry.data_len:
+            BlockReader._check(entry.meta, data)
+        return data
+
+    @staticmethod
+    def covering(entries: List[BlockEntry], start: int, stop: int) -> List[BlockEntry]:
+        """Data blocks that hold any record in [start, stop), found by bisection."""
+        blocks = [e for e in entries if e.kind is None]
+        firsts = [e.first for e in blocks]
+        lo = max(bisect.bisect_right(firsts, start) - 1, 0)
+        hi = bisect.bisect_left(firsts, stop)
+        return [e for e in blocks[lo:hi] if e.first + e.count > start]
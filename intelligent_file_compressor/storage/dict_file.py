@@ -0,0 +1,38 @@
+import struct
+import json
+from typing import Tuple, Dict, Any
+
+class IFCDictFile:
+    """
+    Reads/writes standalone shared model files (.ifcdict):
+    MAGIC (4b) | VER (1b) | STRAT (1b) | BODY_LEN (4b) | BODY (JSON)
+    """
+    MAGIC = b"IFCD"
+    VERSION = 1
+
+    @staticmethod
+    def write(output_path: str, strategy_id: int, body: Dict[str, Any]):
+        body_bytes = json.dumps(body).encode('utf-8')
+        with open(output_path, 'wb') as f:
+            f.write(IFCDictFile.MAGIC)
+            f.write(struct.pack('B', IFCDictFile.VERSION))
+            f.write(struct.pack('B', strategy_id))
+            f.write(struct.pack('>I', len(body_bytes)))
+            f.write(body_bytes)
+
+    @staticmethod
+    def read(input_path: str) -> Tuple[int, Dict[str, Any]]:
+        """
+        Returns (strategy_id, body)
+        """
+        with open(input_path, 'rb') as f:
+            if f.read(4) != IFCDictFile.MAGIC:
+                raise ValueError("Invalid file format: Not an IFC dictionary file")
+
+            version = struct.unpack('B', f.read(1))[0]
+            if version != IFCDictFile.VERSION:
+                raise ValueError(f"Unsupported dictionary version: {version}")
+
+            strategy_id = struct.unpack('B', f.read(1))[0]
+            body_len = struct.unpack('>I', f.read(4))[0]
+            return strategy_id, json.loads(f.read(body_len).decode('utf-8'))
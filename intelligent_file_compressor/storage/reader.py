@@ -1,33 +1,76 @@
 import struct
 import json
-from typing import Tuple, Dict, Any
+import zlib
+from typing import Tuple, Dict, Any, BinaryIO
+from .writer import IFCWriter
+from ..utils.sources import Source, open_binary
 
 class IFCReader:
     """
     Reads data from IFC1 format.
     """
     MAGIC = b"IFC1"
+    HEADER_SIZE = 10 # MAGIC | VER | STRAT | META_LEN
 
     @staticmethod
-    def read(input_path: str) -> Tuple[int, Dict[str, Any], bytes]:
-        """
-        Returns (strategy_id, metadata, compressed_data)
-        """
-        with open(input_path, 'rb') as f:
-            magic = f.read(4)
-            if magic != IFCReader.MAGIC:
-                raise ValueError("Invalid file format: Not an IFC1 file")
-            
-            version = struct.unpack('B', f.read(1))[0]
-            if version != 1:
-                raise ValueError(f"Unsupported version: {version}")
-                
-            strategy_id = struct.unpack('B', f.read(1))[0]
-            meta_len = struct.unpack('>I', f.read(4))[0]
-            
-            meta_bytes = f.read(meta_len)
-            metadata = json.loads(meta_bytes.decode('utf-8'))
-            
+    def read(source: Source) -> Tuple[int, Dict[str, Any], bytes]:
+        """
+        Returns (strategy_id, metadata, compressed_data) of a path, bytes or
+        binary file object (read from its current position). compressed_data
+        is the payload as stored, trailer included (see payload()).
+        """
+        with open_binary(source) as f:
+            return IFCReader.read_stream(f)
+
+    @staticmethod
+    def read_header(f: BinaryIO) -> Tuple[int, Dict[str, Any]]:
+        """
+        Read the header of one IFC1 file starting at the current position of f.
+        Returns (strategy_id, metadata) and leaves f at the start of the payload.
+        """
+        magic = f.read(4)
+        if magic != IFCReader.MAGIC:
+            raise ValueError("Invalid file format: Not an IFC1 file")
+
+        version = struct.unpack('B', f.read(1))[0]
+        if version != 1:
+            raise ValueError(f"Unsupported version: {version}")
+
+        strategy_id = struct.unpack('B', f.read(1))[0]
+        meta_len = struct.unpack('>I', f.read(4))[0]
+
+        meta_bytes = f.read(meta_len)
+        metadata = json.loads(meta_bytes.decode('utf-8'))
+        return strategy_id, metadata
+
+    @staticmethod
+    def read_stream(f: BinaryIO, size: int = -1) -> Tuple[int, Dict[str, Any], bytes]:
+        """
+        Read one IFC1 file starting at the current position of f.
+        `size` bounds the whole file (header included); -1 reads to EOF.
+        """
+        start = f.tell()
+        strategy_id, metadata = IFCReader.read_header(f)
+
+        if size < 0:
             compressed_data = f.read()
-            
-            return strategy_id, metadata, compressed_data
+        else:
+            compressed_data = f.read(size - (f.tell() - start))
+
+        return strategy_id, metadata, compressed_data
+
+    @staticmethod
+    def payload(metadata: Dict[str, Any], data: bytes) -> bytes:
+        """
+        DATA of a whole payload as stored: the trailer of files with
+        checksums is checked against it and cut off.
+        """
+        if metadata.get("checksum") != "crc32":
+            return data
+        trailer = data[-IFCWriter.TRAILER_SIZE:]
+        if len(trailer) < IFCWriter.TRAILER_SIZE or trailer[:4] != IFCWriter.TRAILER_MAGIC:
+            raise ValueError("Corrupt file: missing checksum trailer (truncated?)")
+        data = data[:-IFCWriter.TRAILER_SIZE]
+        if zlib.crc32(data) != struct.unpack('>I', trailer[8:])[0]:
+            raise ValueError("Corrupt file: payload checksum mismatch")
+        return data
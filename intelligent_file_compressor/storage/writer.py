@@ -1,22 +1,58 @@
 import struct
 import json
+import zlib
 from typing import Dict, Any, BinaryIO
 
 class IFCWriter:
     """
     Writes data in IFC1 format:
-    MAGIC (4b) | VER (1b) | STRAT (1b) | META_LEN (4b) | META | DATA
+    MAGIC (4b) | VER (1b) | STRAT (1b) | META_LEN (4b) | META | DATA [| TRAILER]
+
+    Files whose META has "checksum": "crc32" end in a trailer:
+    TRAILER_MAGIC (4b) | HEADER_CRC (4b) | PAYLOAD_CRC (4b), the CRC32 of
+    the header (see header_crc) and of DATA.
     """
     MAGIC = b"IFC1"
     VERSION = 1
+    TRAILER_MAGIC = b"IFCE"
+    HEADER_SIZE = 10 # MAGIC | VER | STRAT | META_LEN
+    TRAILER_SIZE = 12
+    REWRITTEN = ("stats", "index") # META fields that HEADER_CRC leaves out
+
+    @staticmethod
+    def write_header(f: BinaryIO, strategy_id: int, metadata: Dict[str, Any]) -> int:
+        """Writes the header; returns its HEADER_CRC."""
+        f.write(IFCWriter.header_bytes(strategy_id, metadata))
+        return IFCWriter.header_crc(strategy_id, metadata)
 
     @staticmethod
-    def write_header(f: BinaryIO, strategy_id: int, metadata: Dict[str, Any]):
+    def header_crc(strategy_id: int, metadata: Dict[str, Any]) -> int:
+        """
+        HEADER_CRC: the CRC32 of the header without its padding and the
+        REWRITTEN fields, which are rewritten in place after the trailer is
+        written (by appends, too), so the trailer never has to change with
+        them.
+        """
+        return zlib.crc32(IFCWriter.header_bytes(strategy_id, {k: v for k, v in metadata.items()
+                                                               if k not in IFCWriter.REWRITTEN}))
+
+    @staticmethod
+    def header_bytes(strategy_id: int, metadata: Dict[str, Any], size: int = 0) -> bytes:
+        """
+        The header, with META padded by trailing spaces to make it `size`
+        bytes long if given, so it can be rewritten in place later.
+        """
         meta_bytes = json.dumps(metadata).encode('utf-8')
+        if size:
+            pad = size - IFCWriter.HEADER_SIZE - len(meta_bytes)
+            if pad < 0:
+                raise ValueError(f"Header does not fit in {size} bytes")
+            meta_bytes += b" " * pad
         meta_len = len(meta_bytes)
+        return (IFCWriter.MAGIC + struct.pack('B', IFCWriter.VERSION) + struct.pack('B', strategy_id) +
+                struct.pack('>I', meta_len) + # Big-endian 4-byte int
+                meta_bytes)
 
-        f.write(IFCWriter.MAGIC)
-        f.write(struct.pack('B', IFCWriter.VERSION))
-        f.write(struct.pack('B', strategy_id))
-        f.write(struct.pack('>I', meta_len)) # Big-endian 4-byte int
-        f.write(meta_bytes)
+    @staticmethod
+    def trailer(header_crc: int, payload_crc: int) -> bytes:
+        return IFCWriter.TRAILER_MAGIC + struct.pack('>II', header_crc, payload_crc)
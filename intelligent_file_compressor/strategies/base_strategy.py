@@ -1,15 +1,44 @@
+import json
 from abc import ABC, abstractmethod
-from typing import Any, List, Dict
+from collections import Counter
+from itertools import chain
+from typing import Any, List, Dict, Tuple, Iterator, Iterable
+from ..algorithms.multi_stream import MultiStreamCoder
+from ..utils.sources import Source
 
 class BaseStrategy(ABC):
     """
     Abstract base class for all compression strategies.
-    Enforces the strict pipeline: parse -> tokenize -> encode -> decode -> reconstruct.
+
+    Every strategy implements the same streaming protocol, driven by
+    core.pipeline.Pipeline:
+
+        compress:   parse_iter -> tokenize_iter -> observe (every block) -> fit
+                    -> encode_block (every block)
+        decompress: load_model -> decode_block (every block) -> reconstruct_iter
+
+    A block is block_size records (0 = the whole input is one block); the
+    first head_records records of the input (e.g. a CSV header) are
+    tokenized with every block. Strategies only ever see one block at a
+    time: cutting the input into blocks, keeping blocks between the observe
+    and encode passes and farming them out to worker processes is the
+    pipeline's job.
     """
+    block_size = 0   # records per block, 0 = not blocked
+    head_records = 0 # leading records repeated in every block
+    # Tokenize the input again for the encode pass instead of keeping the
+    # blocks returned by observe() in memory
+    rescan = False
+    # tokenize_iter() keeps no state between blocks (no dictionaries), so
+    # blocks can be tokenized in worker processes
+    stateless_tokenize = False
 
     @abstractmethod
-    def parse(self, file_path: str) -> Any:
-        """Read file and parse into structural data (dict, list, etc)."""
+    def parse(self, source: Source) -> Any:
+        """
+        Read a source (a path, bytes-like data or a binary file object, see
+        utils.sources) and parse it into structural data (dict, list, etc).
+        """
         pass
 
     @abstractmethod
@@ -18,16 +47,204 @@ class BaseStrategy(ABC):
         pass
 
     @abstractmethod
-    def encode(self, tokens: List[Any]) -> bytes:
-        """Compress tokens into binary data (e.g. using Huffman)."""
+    def reconstruct(self, tokens: List[Any]) -> Any:
+        """Rebuild original data structure from tokens."""
         pass
 
+    def parse_iter(self, source: Source) -> Iterator[Any]:
+        """
+        Records of the input, lazily. By default the whole parsed document
+        is one record; record-oriented strategies yield lines, rows, ...
+        and override tokenize_iter to match.
+        """
+        yield self.parse(source)
+
+    def tokenize_iter(self, records: Iterable[Any]) -> Iterator[Any]:
+        """Tokens of one block, given its records (head records first)."""
+        return chain.from_iterable(self.tokenize(document) for document in records)
+
     @abstractmethod
-    def decode(self, encoded_data: bytes, metadata: Dict[str, Any]) -> List[Any]:
-        """Decompress binary data back into tokens."""
+    def observe(self, tokens: Iterable[Any]) -> Any:
+        """
+        Adds the tokens of one block to the training statistics. Returns the
+        block in the form encode_block() takes; the pipeline keeps it until
+        the models are fitted (with rescan, the block is tokenized again and
+        the return value is ignored).
+        """
         pass
 
     @abstractmethod
-    def reconstruct(self, tokens: List[Any]) -> Any:
-        """Rebuild original data structure from tokens."""
+    def fit(self):
+        """Build the models from everything observed so far."""
+        pass
+
+    @abstractmethod
+    def model_metadata(self) -> Dict[str, Any]:
+        """Header fields holding the fitted models."""
+        pass
+
+    @abstractmethod
+    def encode_block(self, block: Any) -> Tuple[Dict[str, Any], Any]:
+        """
+        (block_meta, payload) of one block, using the fitted models. The
+        payload is bytes, or an iterable of byte chunks that is consumed
+        while it is written.
+        """
         pass
+
+    @abstractmethod
+    def load_model(self, metadata: Dict[str, Any]):
+        """Restore the models stored by model_metadata()."""
+        pass
+
+    @abstractmethod
+    def decode_block(self, block_meta: Dict[str, Any], data: bytes) -> List[Any]:
+        """
+        Tokens of one block; the models must already be loaded. An unblocked
+        file is a single block whose meta is the file header.
+        """
+        pass
+
+    def coded_tokens(self, tokens: Iterable[Any]) -> List[Any]:
+        """Tokens of one block as decode_block() returns them after coding them."""
+        return list(tokens)
+
+    def block_records(self, tokens: List[Any]) -> List[Any]:
+        """Records held by the tokens of one block (head excluded)."""
+        raise NotImplementedError(f"{type(self).__name__} is not record-oriented")
+
+    def format_records(self, records: List[Any]) -> str:
+        """Render records (head included, if any) as file text."""
+        raise NotImplementedError(f"{type(self).__name__} is not record-oriented")
+
+    def reconstruct_iter(self, tokens: List[Any]) -> Iterator[str]:
+        """Output text rebuilt from tokens, chunk by chunk."""
+        data = self.reconstruct(tokens)
+        if isinstance(data, (dict, list)):
+            yield json.dumps(data, indent=2)
+        else:
+            yield data if isinstance(data, str) else str(data)
+
+    def reconstruct_blocks(self, head: List[Any], blocks: Iterable[List[Any]]) -> Iterator[str]:
+        """Output text of a blocked file from the records of each block, in order."""
+        if head:
+            yield self.format_records(head)
+        for records in blocks:
+            if records:
+                yield self.format_records(records)
+
+
+class MultiStreamStrategy(BaseStrategy):
+    """
+    Base for strategies that route their tokens into separate streams.
+    Subclasses implement split_streams/merge_streams; every stream runs
+    through its own model in a MultiStreamCoder, trained on the streams
+    of all blocks together.
+
+    Record-oriented strategies (LOG, CSV) are blocked: every block is
+    tokenized and encoded on its own with the file-level models, so any
+    block decodes without the others. They implement
+    block_records/format_records.
+    """
+
+    def __init__(self, entropy: str = "huffman", block_size: int = 0):
+        self.coder = MultiStreamCoder(entropy)
+        self.block_size = block_size
+        self.counts = {} # stream name -> Counter of observed symbols
+
+    @abstractmethod
+    def split_streams(self, tokens: List[Any]) -> Dict[str, List[Any]]:
+        """Route the flat token list into named streams."""
+        pass
+
+    @abstractmethod
+    def merge_streams(self, streams: Dict[str, List[Any]]) -> List[Any]:
+        """Interleave decoded streams back into the flat token list."""
+        pass
+
+    def block_index(self, streams: Dict[str, List[Any]]) -> Dict[str, Any]:
+        """Extra per-block metadata used to skip blocks when searching."""
+        return {}
+
+    def observe(self, tokens: Iterable[Any]) -> Dict[str, List[Any]]:
+        streams = self.split_streams(tokens)
+        for name, stream in streams.items():
+            self.counts.setdefault(name, Counter()).update(map(str, stream))
+        return streams
+
+    def fit(self):
+        self.coder.train_counts(self.counts)
+        self.counts = {}
+
+    def model_metadata(self) -> Dict[str, Any]:
+        return {"streams": self.coder.to_dict()}
+
+    def coded_tokens(self, tokens: Iterable[Any]) -> List[Any]:
+        # Streams are coded as strings
+        streams = self.split_streams(list(tokens))
+        return self.merge_streams({name: [str(t) for t in stream] for name, stream in streams.items()})
+
+    def encode_block(self, streams: Dict[str, List[Any]]) -> Tuple[Dict[str, Any], bytes]:
+        layout, payload = self.coder.encode(streams)
+        block_meta = {"layout": layout}
+        if self.block_size:
+            block_meta.update(self.block_index(streams))
+        return block_meta, payload
+
+    def load_model(self, metadata: Dict[str, Any]):
+        self.coder.from_dict(metadata['streams'])
+
+    # --- Appending (blocked strategies) ---
+    # Appended blocks are coded with the models in effect at the end of the
+    # file; models with an escape code new symbols as escaped literals.
+    # Streams whose models cannot code the new data, or whose new symbols
+    # are worth promoting into the model, are refitted and the new models
+    # written as a model frame, which replaces them for every frame after it.
+
+    # Times a new symbol must occur in appended data before "auto" promotes it
+    PROMOTE_COUNT = 4
+
+    def uncovered_streams(self, promote: int = 1) -> List[str]:
+        """
+        Streams with observed symbols their current model does not have.
+        Models that escape code those anyway: their streams are listed only
+        if one of the new symbols occurred `promote` times (0: never).
+        """
+        names = []
+        for name, counts in self.counts.items():
+            unknown = self.coder.unknown(name, counts)
+            if unknown and (not self.coder.escaping(name) or
+                            (promote and max(counts[s] for s in unknown) >= promote)):
+                names.append(name)
+        return names
+
+    def refit(self, names: List[str], keep_symbols: bool = False, promote: int = 1) -> Dict[str, Any]:
+        """
+        New models for the streams in names, fitted on the observed counts
+        (plus, with keep_symbols, every symbol the old model could code, so
+        the model grows rather than being replaced). New symbols that
+        occurred fewer than `promote` times are left out of models that
+        escape: they stay escaped. Returns the model frame meta holding the
+        models and discards the observed counts.
+        """
+        counts = {name: self.counts[name] for name in names}
+        for name, freq in counts.items():
+            if promote > 1 and self.coder.escaping(name):
+                for symbol in self.coder.unknown(name, list(freq)):
+                    if freq[symbol] < promote:
+                        del freq[symbol]
+        if keep_symbols:
+            for name, freq in counts.items():
+                for symbol in self.coder.alphabet(name):
+                    freq.setdefault(symbol, 1)
+        self.coder.train_counts(counts)
+        self.counts = {}
+        models = self.coder.to_dict()
+        return {"streams": {name: models.get(name, {"shared": True}) for name in names}}
+
+    def update_model(self, frame_meta: Dict[str, Any]):
+        """Applies a model frame."""
+        self.coder.update_dict(frame_meta['streams'])
+
+    def decode_block(self, block_meta: Dict[str, Any], data: bytes) -> List[Any]:
+        return self.merge_streams(self.coder.decode(block_meta['layout'], data))
@@ -1,29 +1,51 @@
 import csv
-from typing import Any, List, Dict
-from .base_strategy import BaseStrategy
+import io
+import operator
+from typing import Any, List, Dict, Tuple, Callable, Iterator, Iterable
+from .base_strategy import MultiStreamStrategy
 from ..algorithms.dictionary import DictionaryEncoder
 from ..algorithms.delta import DeltaEncoder
-from ..algorithms.huffman import HuffmanEncoder
+from ..utils.sources import Source, open_text
 
-class CSVStrategy(BaseStrategy):
+class CSVStrategy(MultiStreamStrategy):
     """
     Strict CSV Strategy:
     - Columnar analysis
     - Numeric -> Delta
     - String -> Dictionary
+
+    Streams:
+    - headers: header names (HEADERS/DATA markers are implied)
+    - columns: COL_INT_i / COL_STR_i markers
+    - c<i>:    values of column i (END_COL is implied by the stream length)
+
+    Rows are encoded in row groups of block_size; every group carries the
+    header and decodes on its own. Row groups store min/max of their int
+    columns, and query_block decodes only the columns a query touches.
     """
-    def __init__(self):
-        self.huffman = HuffmanEncoder()
+    OPERATORS = {"=": operator.eq, "==": operator.eq, "<": operator.lt, "<=": operator.le,
+                 ">": operator.gt, ">=": operator.ge}
+    head_records = 1 # the header row
+
+    def __init__(self, entropy: str = "huffman", block_size: int = 4096):
+        super().__init__(entropy, block_size)
         self.col_types = [] # 'int', 'str'
         self.dict_encoders = {} # col_idx -> encoder
 
-    def parse(self, file_path: str) -> Any:
+    def parse(self, source: Source) -> Any:
         rows = []
-        with open(file_path, 'r', encoding='utf-8', newline='') as f:
+        with open_text(source, newline='') as f:
             reader = csv.reader(f)
             rows = list(reader)
         return rows
 
+    def parse_iter(self, source: Source) -> Iterator[List[str]]:
+        with open_text(source, newline='') as f:
+            yield from csv.reader(f)
+
+    def tokenize_iter(self, records: Iterable[Any]) -> Iterator[Any]:
+        return iter(self.tokenize(records))
+
     def tokenize(self, parsed_data: List[List[str]]) -> List[Any]:
         if not parsed_data:
             return []
@@ -66,13 +88,145 @@ class CSVStrategy(BaseStrategy):
                 
         return tokens
 
-    def encode(self, tokens: List[Any]) -> bytes:
-        return self.huffman.encode(tokens)[0]
+    def split_streams(self, tokens: List[Any]) -> Dict[str, List[Any]]:
+        if not tokens:
+            return {}
+            
+        streams = {"headers": [], "columns": []}
+        iterator = iter(tokens)
+        next(iterator) # HEADERS
+        for t in iterator:
+            if t == "DATA":
+                break
+            streams["headers"].append(t)
+            
+        current = None
+        for t in iterator:
+            if current is None:
+                # Column marker
+                streams["columns"].append(t)
+                current = streams.setdefault(f"c{t.split('_')[-1]}", [])
+            elif t == "END_COL":
+                current = None
+            else:
+                current.append(t)
+        return streams
+
+    def merge_streams(self, streams: Dict[str, List[Any]]) -> List[Any]:
+        if not streams:
+            return []
+            
+        tokens = ["HEADERS"] + list(streams.get("headers", [])) + ["DATA"]
+        for marker in streams.get("columns", []):
+            tokens.append(marker)
+            tokens.extend(streams.get(f"c{marker.split('_')[-1]}", []))
+            tokens.append("END_COL")
+        return tokens
+
+    def block_index(self, streams: Dict[str, List[Any]]) -> Dict[str, Any]:
+        stats = {}
+        for marker in streams.get("columns", []):
+            if marker.startswith("COL_INT_"):
+                i = marker.split("_")[-1]
+                values = DeltaEncoder.decode([int(t[1:]) for t in streams.get(f"c{i}", [])])
+                if values:
+                    stats[i] = [min(values), max(values)]
+        return {"stats": stats} if stats else {}
 
-    def decode(self, encoded_data: bytes, metadata: Dict[str, Any]) -> List[Any]:
-        return self.huffman.decode(encoded_data, metadata['huffman_tree'])
+    def block_may_match(self, block_meta: Dict[str, Any], predicates: List[Tuple[int, str, str]]) -> bool:
+        """False if the row group's min/max statistics rule out every row."""
+        stats = block_meta.get("stats", {})
+        for col, op, value in predicates:
+            if str(col) not in stats:
+                continue
+            try:
+                v = int(value)
+            except ValueError:
+                return False # int column in this group: nothing compares to a non-int
+            lo, hi = stats[str(col)]
+            if op in ("<", "<="):
+                possible = self.OPERATORS[op](lo, v)
+            elif op in (">", ">="):
+                possible = self.OPERATORS[op](hi, v)
+            else:
+                possible = lo <= v <= hi
+            if not possible:
+                return False
+        return True
+
+    def query_block(self, block_meta: Dict[str, Any], read: Callable[[int, int], bytes],
+                    columns: List[int], predicates: List[Tuple[int, str, str]]) -> List[List[str]]:
+        """
+        Rows of one row group that satisfy every (column, op, value) predicate,
+        projected onto `columns`. Predicate columns are decoded first, one at
+        a time, and projected columns only if some row is left; other columns
+        are never read. read(offset, size) fetches bytes of the block's data.
+        """
+        layout = block_meta["layout"]
+        markers = {int(m.split("_")[-1]): m for m in self.coder.read_stream("columns", layout, read)}
+        decoded = {}
+
+        def column(i: int) -> List[str]:
+            if i not in decoded:
+                decoded[i] = self._column_values(i, markers.get(i, ""), self.coder.read_stream(f"c{i}", layout, read))
+            return decoded[i]
+
+        rows = range(block_meta["count"])
+        for col, op, value in predicates:
+            marker = markers.get(col, "")
+            if marker.startswith("COL_STR_") and op in ("=", "=="):
+                # Compare dictionary IDs; a value missing from the dictionary matches nothing
+                vid = self.dict_encoders[col].forward.get(value) if col in self.dict_encoders else None
+                if vid is None:
+                    return []
+                tokens = self.coder.read_stream(f"c{col}", layout, read)
+                target = f"K{vid}"
+                rows = [r for r in rows if r < len(tokens) and tokens[r] == target]
+            else:
+                cells = column(col)
+                rows = [r for r in rows if r < len(cells) and self._compare(cells[r], op, value, marker)]
+            if not rows:
+                return []
+
+        result = []
+        for r in rows:
+            row = []
+            for i in columns:
+                cells = column(i)
+                row.append(cells[r] if r < len(cells) else "")
+            result.append(row)
+        return result
+
+    def _column_values(self, col: int, marker: str, tokens: List[str]) -> List[str]:
+        if marker.startswith("COL_INT_"):
+            return [str(v) for v in DeltaEncoder.decode([int(t[1:]) for t in tokens])]
+        encoder = self.dict_encoders.get(col)
+        return [encoder.get_value(int(t[1:])) for t in tokens] if encoder else []
+
+    def _compare(self, cell: str, op: str, value: str, marker: str) -> bool:
+        if op in ("=", "==") and not marker.startswith("COL_INT_"):
+            return cell == value
+        try:
+            return self.OPERATORS[op](int(cell), int(value))
+        except ValueError:
+            return False
+
+    def block_records(self, tokens: List[Any]) -> List[Any]:
+        return self.reconstruct_rows(tokens)[1:]
+
+    def format_records(self, records: List[Any]) -> str:
+        output = io.StringIO()
+        writer = csv.writer(output, lineterminator='\n') # Use \n for consistency
+        writer.writerows(records)
+        return output.getvalue()
 
     def reconstruct(self, tokens: List[Any]) -> Any:
+        if not tokens:
+            return []
+        return self.format_records(self.reconstruct_rows(tokens))
+
+    def reconstruct_rows(self, tokens: List[Any]) -> List[List[str]]:
+        """Header row followed by the data rows."""
         # 1. Parse Headers
         if not tokens:
             return []
@@ -139,11 +293,7 @@ class CSVStrategy(BaseStrategy):
         # 3. Transpose back to rows
         # Check all cols have same length
         if not columns:
-            import io
-            output = io.StringIO()
-            writer = csv.writer(output)
-            writer.writerow(headers)
-            return output.getvalue()
+            return [headers]
             
         num_rows = len(columns[0])
         rows = [headers]
@@ -157,8 +307,4 @@ class CSVStrategy(BaseStrategy):
                     row.append("") # Should not happen if valid
             rows.append(row)
             
-        import io
-        output = io.StringIO()
-        writer = csv.writer(output, lineterminator='\n') # Use \n for consistency
-        writer.writerows(rows)
-        return output.getvalue()
+        return rows
@@ -1,28 +1,55 @@
 import json
-from typing import Any, List, Dict
+import re
+from itertools import takewhile, chain
+from typing import Any, List, Dict, Iterator, Tuple
 from ..core.token_stream import Token, TokenType
-from .base_strategy import BaseStrategy
+from .base_strategy import MultiStreamStrategy
 from ..algorithms.dictionary import DictionaryEncoder
 from ..algorithms.delta import DeltaEncoder
-from ..algorithms.huffman import HuffmanEncoder
+from ..utils.sources import Source, open_text
 
-class JSONStrategy(BaseStrategy):
+class JSONStrategy(MultiStreamStrategy):
     """
     Strict JSON Strategy:
     - Flatten keys -> Dictionary Encode
     - Monotonic Integers -> Delta Encode
     - Structure -> Tokens
+
+    Streams:
+    - struct: { } [ ] DELTA_INT_SEQ, literals and value type tags (S, I, F)
+    - keys:   K<id>, implied by the grammar before every object member
+    - str:    string values
+    - num:    int/float values
+    - delta:  D<val> tokens of delta sequences, terminated by ]
+
+    select() evaluates JSONPath-lite expressions on the token stream without
+    rebuilding the document.
+
+    Exact mode (byte-identical round trip) lexes the raw text instead of
+    json.load-ing it. Strings, keys and numbers keep their original
+    spelling, and the whitespace in front of every lexeme goes to a side
+    stream per position (ws_key, ws_colon, ws_value, ws_item, ws_comma,
+    ws_close, ws_edge). A gap equal to a newline plus the file's indent
+    unit (ws_indent) times the nesting depth is stored as "N", so the
+    streams of consistently indented files are constant and elided.
     """
     
-    def __init__(self):
+    def __init__(self, entropy: str = "huffman", exact: bool = False):
+        super().__init__(entropy)
         self.dict_encoder = DictionaryEncoder()
-        self.huffman = HuffmanEncoder()
+        self.exact = exact
+        self.gaps = None # ws_* side streams (exact mode)
 
-    def parse(self, file_path: str) -> Any:
-        with open(file_path, 'r', encoding='utf-8') as f:
+    def parse(self, source: Source) -> Any:
+        if self.exact:
+            with open_text(source, newline='') as f:
+                return f.read()
+        with open_text(source) as f:
             return json.load(f)
 
     def tokenize(self, parsed_data: Any) -> List[Any]:
+        if self.exact:
+            return self._tokenize_exact(parsed_data)
         tokens = []
         self._traverse(parsed_data, tokens)
         return tokens
@@ -40,7 +67,7 @@ class JSONStrategy(BaseStrategy):
         elif isinstance(obj, list):
             tokens.append("[")
             # Check for monotonic integers
-            if all(isinstance(x, int) for x in obj) and len(obj) > 2:
+            if all(isinstance(x, int) and not isinstance(x, bool) for x in obj) and len(obj) > 2:
                 # Simple check for monotonicity (strictly increasing)
                 if all(obj[i] < obj[i+1] for i in range(len(obj)-1)):
                     tokens.append("DELTA_INT_SEQ")
@@ -55,92 +82,82 @@ class JSONStrategy(BaseStrategy):
             
         elif isinstance(obj, str):
             tokens.append(f"S:{obj}") # Literal string
-        elif isinstance(obj, int):
-            tokens.append(f"I:{obj}")
         elif isinstance(obj, bool):
+            # bool is a subclass of int, so check it first
             tokens.append(f"B:{obj}")
+        elif isinstance(obj, int):
+            tokens.append(f"I:{obj}")
+        elif isinstance(obj, float):
+            tokens.append(f"F:{obj!r}")
         elif obj is None:
             tokens.append("NULL")
 
-    def encode(self, tokens: List[Any]) -> bytes:
-        compressed_data, tree = self.huffman.encode(tokens)
-        return compressed_data
+    def split_streams(self, tokens: List[Any]) -> Dict[str, List[Any]]:
+        streams = {"struct": [], "keys": [], "str": [], "num": [], "delta": []}
+        in_delta = False
+        for t in tokens:
+            if in_delta:
+                streams["delta"].append(t)
+                if t == "]":
+                    in_delta = False
+            elif t == "DELTA_INT_SEQ":
+                streams["struct"].append(t)
+                in_delta = True
+            elif t.startswith("K"):
+                streams["keys"].append(t)
+            elif t.startswith("S:"):
+                streams["struct"].append("S")
+                streams["str"].append(t[2:])
+            elif t.startswith("I:") or t.startswith("F:"):
+                streams["struct"].append(t[0])
+                streams["num"].append(t[2:])
+            else:
+                streams["struct"].append(t)
+        if self.gaps:
+            streams.update(self.gaps)
+        return streams
 
-    def decode(self, encoded_data: bytes, metadata: Dict[str, Any]) -> List[Any]:
-        return self.huffman.decode(encoded_data, metadata['huffman_tree'])
+    def merge_streams(self, streams: Dict[str, List[Any]]) -> List[Any]:
+        return list(self.iter_tokens(streams))
 
-    def reconstruct(self, tokens: List[Any]) -> Any:
-        self.token_iter = iter(tokens)
-        return self._consume()
-
-    def _consume(self):
-        try:
-            token = next(self.token_iter)
-        except StopIteration:
-            return None
-
-        if token == "{":
-            obj = {}
-            while True:
-                # Peek would be better, but with iter we just grab next
-                # If next is "}", we are done.
-                # If next is K<id>, it's a key.
-                # We need to handle the case where the dict is empty "{}".
-                # But our tokenizer always puts keys or } immediately.
-                
-                # However, since we can't peek easily with a simple iterator without buffering,
-                # we have to be careful. 
-                # Let's assume the token stream is valid.
-                
-                # We can't easily peek, so we might need to grab the next token and decide.
-                # But if we grab it and it's a key, we need to process it.
-                # If it's "}", we return.
-                
-                # To make this robust without peek, we can assume that after "{", 
-                # we either have "}" or a Key.
-                
-                # Let's try to implement a peekable iterator wrapper or just handle it here.
-                # Actually, we can just grab the next token.
-                
-                key_token = next(self.token_iter)
-                
-                if key_token == "}":
-                    return obj
-                
-                # It must be a key
-                if isinstance(key_token, str) and key_token.startswith("K"):
-                    key_id = int(key_token[1:])
-                    key = self.dict_encoder.get_value(key_id)
-                    
-                    # Value is next
-                    value = self._consume()
-                    obj[key] = value
-                else:
-                    raise ValueError(f"Expected Key or }} but got {key_token}")
-            return obj
+    def iter_tokens(self, streams: Dict[str, List[Any]]) -> Iterator[Any]:
+        """Interleave decoded streams lazily, one token at a time."""
+        # Whitespace side streams mean the file was written in exact mode
+        self.gaps = {name: stream for name, stream in streams.items() if name.startswith("ws_")} or None
+        self.exact = self.gaps is not None
+        return self._iter_tokens(streams)
 
-        elif token == "[":
-            arr = []
-            while True:
-                # Similar logic for arrays.
-                # We need to check if next is "]".
-                # But we can't peek.
-                # Wait, for arrays, we don't have keys.
-                # So we can't distinguish between "End of Array" and "Start of Next Element" 
-                # solely by type easily unless we check for "]".
-                
-                # We need a way to peek.
-                # Let's buffer one token.
-                
-                # Actually, let's change the architecture slightly to use a list and index
-                # or a peekable iterator.
-                # Since we are already in this method, let's just hack a peek.
-                pass 
-                # This approach with raw iterator is flawed for "while True".
-                # We need to change how we iterate.
+    def _iter_tokens(self, streams: Dict[str, List[Any]]) -> Iterator[Any]:
+        keys = iter(streams.get("keys", []))
+        strs = iter(streams.get("str", []))
+        nums = iter(streams.get("num", []))
+        deltas = iter(streams.get("delta", []))
+        
+        stack = [] # open containers
+        for t in streams.get("struct", []):
+            # Every value directly inside an object is preceded by its key
+            if stack and stack[-1] == "{" and t != "}":
+                yield next(keys)
                 
-            # RE-IMPLEMENTING WITH LIST INDEXING FOR SIMPLICITY
-            pass
+            if t == "{" or t == "[":
+                yield t
+                stack.append(t)
+            elif t == "}" or t == "]":
+                yield t
+                stack.pop()
+            elif t == "DELTA_INT_SEQ":
+                yield t
+                for d in deltas:
+                    yield d
+                    if d == "]":
+                        break
+                stack.pop()
+            elif t == "S":
+                yield "S:" + next(strs)
+            elif t == "I" or t == "F":
+                yield f"{t}:{next(nums)}"
+            else:
+                yield t
 
     def reconstruct(self, tokens: List[Any]) -> Any:
         self.tokens = tokens
@@ -170,9 +187,11 @@ class JSONStrategy(BaseStrategy):
             return self._parse_array()
         elif isinstance(token, str):
             if token.startswith("S:"):
-                return token[2:]
+                return self._string(token[2:])
             elif token.startswith("I:"):
                 return int(token[2:])
+            elif token.startswith("F:"):
+                return float(token[2:])
             elif token.startswith("B:"):
                 return token[2:] == "True"
             elif token == "NULL":
@@ -203,7 +222,7 @@ class JSONStrategy(BaseStrategy):
                  raise ValueError(f"Expected Key, got {key_token}")
             
             key_id = int(key_token[1:])
-            key = self.dict_encoder.get_value(key_id)
+            key = self._key(key_id)
             
             val = self._parse_value()
             obj[key] = val
@@ -238,3 +257,401 @@ class JSONStrategy(BaseStrategy):
             
             val = self._parse_value()
             arr.append(val)
+
+    def reconstruct_iter(self, tokens: List[Any], chunk_items: int = 4096) -> Iterator[str]:
+        """
+        Writes the document as json.dump(..., indent=2) would, straight from
+        the tokens: no object tree is built. Containers are opened lazily so
+        empty ones come out as {} / []. Exact-mode files are written back
+        byte for byte instead.
+        """
+        if self.gaps is not None:
+            yield from self._reconstruct_exact(tokens, chunk_items)
+            return
+        tokens = iter(tokens)
+        first_token = next(tokens, None)
+        if first_token is None:
+            yield "null" # reconstruct() of an empty stream is None
+            return
+        tokens = chain([first_token], tokens)
+        out = []
+        stack = []         # open containers
+        first = False      # innermost container has no member yet
+        after_key = False  # the next token is an object member's value
+        indent = "\n"
+        for t in tokens:
+            if t == "}" or t == "]":
+                stack.pop()
+                indent = indent[:-2]
+                out.append(("{}" if t == "}" else "[]") if first else indent + t)
+                first = False
+            elif stack and stack[-1] == "{" and not after_key:
+                out.append(("{" if first else ",") + indent)
+                out.append(json.dumps(self._key(int(t[1:]))) + ": ")
+                first = False
+                after_key = True
+            elif t == "DELTA_INT_SEQ":
+                # Directly after "[": the D<val> tokens up to "]" are the items
+                values = DeltaEncoder.decode([int(d[1:]) for d in takewhile(lambda d: d != "]", tokens)])
+                stack.pop()
+                out.append("[" + indent + ("," + indent).join(str(v) for v in values))
+                indent = indent[:-2]
+                out.append(indent + "]")
+                first = False
+            else:
+                if after_key:
+                    after_key = False
+                elif stack:
+                    out.append(("[" if first else ",") + indent)
+                if t == "{" or t == "[":
+                    stack.append(t)
+                    indent += "  "
+                    first = True
+                else:
+                    out.append(json.dumps(self._value(t, tokens)))
+                    first = False
+
+            if len(out) >= chunk_items:
+                yield "".join(out)
+                out = []
+        if out:
+            yield "".join(out)
+
+    def select(self, tokens: Iterator[Any], path: str) -> Iterator[Any]:
+        """
+        Yields the values matching a JSONPath-lite expression ($, .key,
+        ['key'], [n], [*], .*) from a token stream, in document order.
+        Key segments are resolved to K<id> tokens up front; subtrees whose
+        key or index does not match are skipped token by token and only
+        the matching values are rebuilt.
+        """
+        segments = []
+        for kind, arg in parse_json_path(path):
+            if kind == "key":
+                key_id = self._key_id(arg)
+                if key_id is None:
+                    return # key never occurs in the document
+                arg = f"K{key_id}"
+            segments.append((kind, arg))
+
+        tokens = iter(tokens)
+        first = next(tokens, None)
+        if first is None:
+            return
+        matches = self._select(first, tokens, segments, 0)
+        if all(kind != "wild" for kind, _ in segments):
+            # A path without wildcards has at most one match: stop reading there
+            for value in matches:
+                yield value
+                return
+        yield from matches
+
+    def _select(self, token: Any, tokens: Iterator[Any], segments: List[Tuple[str, Any]], depth: int) -> Iterator[Any]:
+        """Match segments[depth:] against the value starting at token; always consumes the whole value."""
+        if depth == len(segments):
+            yield self._value(token, tokens)
+            return
+        kind, arg = segments[depth]
+        if token == "{":
+            for key in tokens:
+                if key == "}":
+                    return
+                value = next(tokens)
+                if kind == "wild" or (kind == "key" and key == arg):
+                    yield from self._select(value, tokens, segments, depth + 1)
+                else:
+                    self._skip(value, tokens)
+        elif token == "[":
+            index = 0
+            for item in tokens:
+                if item == "]":
+                    return
+                if item == "DELTA_INT_SEQ":
+                    values = DeltaEncoder.decode([int(d[1:]) for d in takewhile(lambda d: d != "]", tokens)])
+                    if depth + 1 == len(segments):
+                        # Plain integers: only a final index/wildcard can match them
+                        for i, v in enumerate(values):
+                            if kind == "wild" or (kind == "index" and i == arg):
+                                yield v
+                    return
+                if kind == "wild" or (kind == "index" and index == arg):
+                    yield from self._select(item, tokens, segments, depth + 1)
+                else:
+                    self._skip(item, tokens)
+                index += 1
+
+    def _skip(self, token: Any, tokens: Iterator[Any]):
+        """Consume the rest of the value starting at token without building it."""
+        if token != "{" and token != "[":
+            return
+        depth = 1
+        for t in tokens:
+            if t == "{" or t == "[":
+                depth += 1
+            elif t == "}" or t == "]":
+                depth -= 1
+                if depth == 0:
+                    return
+
+    def _value(self, token: Any, tokens: Iterator[Any]) -> Any:
+        """Build the value starting at token from an iterator (the rest of it is consumed)."""
+        if token == "{":
+            obj = {}
+            for key in tokens:
+                if key == "}":
+                    return obj
+                obj[self._key(int(key[1:]))] = self._value(next(tokens), tokens)
+            return obj
+        if token == "[":
+            arr = []
+            for item in tokens:
+                if item == "]":
+                    return arr
+                if item == "DELTA_INT_SEQ":
+                    return DeltaEncoder.decode([int(d[1:]) for d in takewhile(lambda d: d != "]", tokens)])
+                arr.append(self._value(item, tokens))
+            return arr
+        if token.startswith("S:"):
+            return self._string(token[2:])
+        if token.startswith("I:"):
+            return int(token[2:])
+        if token.startswith("F:"):
+            return float(token[2:])
+        if token.startswith("B:"):
+            return token[2:] == "True"
+        return None # NULL
+
+
+    # --- Exact mode ---
+
+    def _string(self, raw: str) -> str:
+        """String value of a token; exact mode keeps the escaped spelling."""
+        if self.exact and "\\" in raw:
+            return json.loads(f'"{raw}"')
+        return raw
+
+    def _key(self, key_id: int) -> str:
+        return self._string(self.dict_encoder.get_value(key_id))
+
+    def _key_id(self, key: str) -> Any:
+        if not self.exact:
+            return self.dict_encoder.forward.get(key)
+        for key_id, raw in self.dict_encoder.reverse.items():
+            if self._string(raw) == key:
+                return key_id
+        return None
+
+    def _tokenize_exact(self, text: str) -> List[Any]:
+        lexemes = []
+        pos = 0
+        depth = 0
+        unit = None
+        while True:
+            match = _LEXEME.match(text, pos)
+            if not match:
+                break
+            gap, lexeme = match.group(1), match.group(2)
+            if unit is None and depth == 1 and gap.startswith("\n") and gap.count("\n") == 1:
+                unit = gap[1:] # indentation of the first member on its own line
+            if lexeme in ("{", "["):
+                depth += 1
+            elif lexeme in ("}", "]"):
+                depth -= 1
+            lexemes.append((gap, lexeme))
+            pos = match.end()
+        trailing = _WHITESPACE.match(text, pos).group(0)
+        if pos + len(trailing) != len(text):
+            raise ValueError(f"Invalid JSON at offset {pos + len(trailing)}")
+        unit = unit or ""
+
+        self.gaps = {name: [] for name in GAP_STREAMS}
+        self.gaps["ws_indent"].append(unit)
+        state = {"pos": 0, "depth": 0}
+
+        def take(cls: str) -> str:
+            if state["pos"] >= len(lexemes):
+                raise ValueError("Invalid JSON: unexpected end of document")
+            gap, lexeme = lexemes[state["pos"]]
+            state["pos"] += 1
+            if lexeme == ",":
+                cls = "ws_comma"
+            elif lexeme == ":":
+                cls = "ws_colon"
+            elif lexeme in ("}", "]"):
+                cls = "ws_close"
+                state["depth"] -= 1
+            d = state["depth"]
+            if lexeme in ("{", "["):
+                state["depth"] += 1
+            self.gaps[cls].append("N" if unit and gap == "\n" + unit * d else gap)
+            return lexeme
+
+        def peek() -> str:
+            return lexemes[state["pos"]][1] if state["pos"] < len(lexemes) else ""
+
+        def value(cls: str, out: List[Any]):
+            lexeme = take(cls)
+            if lexeme == "{":
+                out.append("{")
+                if peek() == "}":
+                    take("ws_close")
+                    out.append("}")
+                    return
+                while True:
+                    key = take("ws_key")
+                    if not key.startswith('"') or take("ws_colon") != ":":
+                        raise ValueError(f"Invalid JSON: expected a key, got {key}")
+                    out.append(f"K{self.dict_encoder.get_id(key[1:-1])}")
+                    value("ws_value", out)
+                    sep = take("ws_comma")
+                    if sep == "}":
+                        out.append("}")
+                        return
+                    if sep != ",":
+                        raise ValueError(f"Invalid JSON: expected , or }} got {sep}")
+            elif lexeme == "[":
+                out.append("[")
+                if peek() == "]":
+                    take("ws_close")
+                    out.append("]")
+                    return
+                items = []
+                while True:
+                    item = []
+                    value("ws_item", item)
+                    items.append(item)
+                    sep = take("ws_comma")
+                    if sep == "]":
+                        break
+                    if sep != ",":
+                        raise ValueError(f"Invalid JSON: expected , or ] got {sep}")
+                ints = [int(i[0][2:]) for i in items if len(i) == 1 and i[0].startswith("I:")]
+                if len(ints) == len(items) > 2 and all(ints[i] < ints[i + 1] for i in range(len(ints) - 1)):
+                    out.append("DELTA_INT_SEQ")
+                    out.extend(f"D{d}" for d in DeltaEncoder.encode(ints))
+                else:
+                    for item in items:
+                        out.extend(item)
+                out.append("]")
+            elif lexeme.startswith('"'):
+                out.append("S:" + lexeme[1:-1])
+            elif lexeme in ("true", "false"):
+                out.append(f"B:{lexeme == 'true'}")
+            elif lexeme == "null":
+                out.append("NULL")
+            elif lexeme[0] in "-0123456789":
+                # Canonical ints round-trip through int(); any other spelling stays as text
+                out.append(("I:" if _CANONICAL_INT.fullmatch(lexeme) else "F:") + lexeme)
+            else:
+                raise ValueError(f"Invalid JSON: unexpected {lexeme}")
+
+        tokens = []
+        value("ws_edge", tokens)
+        if state["pos"] != len(lexemes):
+            raise ValueError("Invalid JSON: extra data after the document")
+        self.gaps["ws_edge"].append("N" if unit and trailing == "\n" else trailing)
+        return tokens
+
+    def _reconstruct_exact(self, tokens: Iterator[Any], chunk_items: int) -> Iterator[str]:
+        gaps = {name: iter(stream) for name, stream in self.gaps.items()}
+        unit = next(gaps["ws_indent"], "")
+
+        def gap(cls: str, depth: int) -> str:
+            g = next(gaps[cls])
+            return "\n" + unit * depth if g == "N" else g
+
+        out = []
+        stack = []
+        first = False
+        after_key = False
+        tokens = iter(tokens)
+        for t in tokens:
+            depth = len(stack)
+            if t == "}" or t == "]":
+                stack.pop()
+                out.append(gap("ws_close", depth - 1) + t)
+                first = False
+            elif stack and stack[-1] == "{" and not after_key:
+                if not first:
+                    out.append(gap("ws_comma", depth) + ",")
+                out.append(gap("ws_key", depth) + '"' + self.dict_encoder.get_value(int(t[1:])) + '"')
+                out.append(gap("ws_colon", depth) + ":")
+                first = False
+                after_key = True
+            elif t == "DELTA_INT_SEQ":
+                values = DeltaEncoder.decode([int(d[1:]) for d in takewhile(lambda d: d != "]", tokens)])
+                for i, v in enumerate(values):
+                    if i:
+                        out.append(gap("ws_comma", depth) + ",")
+                    out.append(gap("ws_item", depth) + str(v))
+                stack.pop()
+                out.append(gap("ws_close", depth - 1) + "]")
+                first = False
+            else:
+                if after_key:
+                    cls = "ws_value"
+                    after_key = False
+                elif stack:
+                    if not first:
+                        out.append(gap("ws_comma", depth) + ",")
+                    cls = "ws_item"
+                else:
+                    cls = "ws_edge"
+                if t == "{" or t == "[":
+                    out.append(gap(cls, depth) + t)
+                    stack.append(t)
+                    first = True
+                else:
+                    out.append(gap(cls, depth) + _spelling(t))
+                    first = False
+
+            if len(out) >= chunk_items:
+                yield "".join(out)
+                out = []
+        out.append(gap("ws_edge", 0))
+        yield "".join(out)
+
+
+GAP_STREAMS = ("ws_indent", "ws_key", "ws_colon", "ws_value", "ws_item", "ws_comma", "ws_close", "ws_edge")
+_LEXEME = re.compile(r'''([ \t\n\r]*)([{}\[\],:]|"(?:[^"\\]|\\.)*"|-?(?:0|[1-9]\d*)(?:\.\d+)?(?:[eE][+-]?\d+)?|true|false|null)''', re.S)
+_WHITESPACE = re.compile(r'[ \t\n\r]*')
+_CANONICAL_INT = re.compile(r'-?[1-9]\d*|0')
+
+def _spelling(token: str) -> str:
+    """Source text of a scalar token in exact mode."""
+    if token.startswith("S:"):
+        return '"' + token[2:] + '"'
+    if token.startswith("B:"):
+        return "true" if token == "B:True" else "false"
+    if token == "NULL":
+        return "null"
+    return token[2:] # I:/F: keep their original spelling
+
+
+_PATH_SEGMENT = re.compile(r"""\.(\*|[^.\[\]]+)|\[(\*|\d+|'[^']*'|"[^"]*")\]""")
+
+def parse_json_path(path: str) -> List[Tuple[str, Any]]:
+    """
+    '$.items[*].id' -> [("key", "items"), ("wild", None), ("key", "id")]
+    Supported: $ root, .key, ['key'], [n], .* and [*]. No filters or '..'.
+    """
+    if not path.startswith("$"):
+        raise ValueError(f"JSON path must start with '$': {path}")
+    segments = []
+    pos = 1
+    while pos < len(path):
+        match = _PATH_SEGMENT.match(path, pos)
+        if not match:
+            raise ValueError(f"Unsupported JSON path syntax at position {pos}: {path}")
+        name, bracket = match.group(1), match.group(2)
+        part = name if name is not None else bracket
+        if part == "*":
+            segments.append(("wild", None))
+        elif name is None and part.isdigit():
+            segments.append(("index", int(part)))
+        elif name is None:
+            segments.append(("key", part[1:-1]))
+        else:
+            segments.append(("key", part))
+        pos = match.end()
+    return segments
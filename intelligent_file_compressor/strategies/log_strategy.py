@@ -1,26 +1,47 @@
-from typing import Any, List, Dict
+from typing import Any, List, Dict, Callable, Optional, Iterator, Iterable
 import re
 from datetime import datetime
-from .base_strategy import BaseStrategy
+from .base_strategy import MultiStreamStrategy
 from ..algorithms.delta import DeltaEncoder
-from ..algorithms.huffman import HuffmanEncoder
+from ..algorithms.bloom import BloomFilter
+from ..algorithms.multi_stream import ESCAPED
+from ..utils.sources import Source, open_text
 
-class LogStrategy(BaseStrategy):
+class LogStrategy(MultiStreamStrategy):
     """
     Strict Log Strategy:
     - Timestamp -> UNIX -> Delta
     - Severity -> Int Map
     - Message -> Template Dict (Simplified to Huffman for now)
+
+    Streams:
+    - kind: T (timestamped line) or R (raw line)
+    - ts:   timestamp deltas
+    - sev:  SEV:<code>
+    - msg:  message remainders
+    - raw:  lines that did not match the timestamp pattern
+
+    Lines are encoded in blocks of block_size; timestamp deltas restart
+    at every block so each block decodes on its own. Every block carries a
+    bloom filter of its msg/raw symbols so searches can skip it.
     """
     SEVERITY_MAP = {"INFO": 1, "WARN": 2, "WARNING": 2, "ERROR": 3, "DEBUG": 0}
+    stateless_tokenize = True
 
-    def __init__(self):
-        self.huffman = HuffmanEncoder()
+    def __init__(self, entropy: str = "huffman", block_size: int = 4096):
+        super().__init__(entropy, block_size)
 
-    def parse(self, file_path: str) -> List[str]:
-        with open(file_path, 'r', encoding='utf-8', errors='replace') as f:
+    def parse(self, source: Source) -> List[str]:
+        with open_text(source, errors='replace') as f:
             return f.readlines()
 
+    def parse_iter(self, source: Source) -> Iterator[str]:
+        with open_text(source, errors='replace') as f:
+            yield from f
+
+    def tokenize_iter(self, records: Iterable[Any]) -> Iterator[Any]:
+        return iter(self.tokenize(records))
+
     def tokenize(self, parsed_data: List[str]) -> List[Any]:
         tokens = []
         timestamps = []
@@ -84,13 +105,103 @@ class LogStrategy(BaseStrategy):
             
         return tokens
 
-    def encode(self, tokens: List[Any]) -> bytes:
-        return self.huffman.encode(tokens)[0]
+    def split_streams(self, tokens: List[Any]) -> Dict[str, List[Any]]:
+        streams = {"kind": [], "ts": [], "sev": [], "msg": [], "raw": []}
+        iterator = iter(tokens)
+        for t in iterator:
+            if t == "TS_BLOCK_START":
+                # Implied by the presence of any timestamped line
+                continue
+            if t.startswith("RAW:"):
+                streams["kind"].append("R")
+                streams["raw"].append(t[4:])
+            else:
+                # Timestamped line: D<delta>, SEV:<code>, MSG:<text>
+                streams["kind"].append("T")
+                streams["ts"].append(t)
+                streams["sev"].append(next(iterator))
+                streams["msg"].append(next(iterator)[4:])
+        return streams
 
-    def decode(self, encoded_data: bytes, metadata: Dict[str, Any]) -> List[Any]:
-        return self.huffman.decode(encoded_data, metadata['huffman_tree'])
+    def merge_streams(self, streams: Dict[str, List[Any]]) -> List[Any]:
+        ts = iter(streams.get("ts", []))
+        sev = iter(streams.get("sev", []))
+        msg = iter(streams.get("msg", []))
+        raw = iter(streams.get("raw", []))
+        
+        kinds = streams.get("kind", [])
+        tokens = ["TS_BLOCK_START"] if "T" in kinds else []
+        for kind in kinds:
+            if kind == "R":
+                tokens.append("RAW:" + next(raw))
+            else:
+                tokens.append(next(ts))
+                tokens.append(next(sev))
+                tokens.append("MSG:" + next(msg))
+        return tokens
+
+    def block_index(self, streams: Dict[str, List[Any]]) -> Dict[str, Any]:
+        return {"bloom": BloomFilter.of(streams.get("msg", []) + streams.get("raw", [])).to_dict()}
+
+    def block_filter(self, pattern: str) -> Optional[Callable[[Dict[str, Any]], bool]]:
+        """
+        Predicate on block metadata that is False only for blocks that cannot
+        contain the literal pattern. Any matching line must contain the
+        pattern's longest word that can only occur inside a message; the
+        msg/raw symbol tables are scanned once for symbols holding it, and
+        blocks whose bloom filter has none of them are ruled out; blocks
+        with escaped msg/raw tokens, which are in no table, are kept.
+        None if no word of the pattern is confined to messages (e.g. it
+        only names a date or a severity): the symbol tables cannot help.
+        """
+        words = [w for w in pattern.split() if self._message_only(w)]
+        if not words:
+            return None
+        word = max(words, key=len)
+        digests = [BloomFilter.digest(s) for name in ("msg", "raw")
+                   for s in self.coder.alphabet(name) if word in s]
+        escaped = ("msg" + ESCAPED, "raw" + ESCAPED)
+
+        def may_match(block_meta: Dict[str, Any]) -> bool:
+            if any(entry[0] in escaped for entry in block_meta.get("layout", ())):
+                return True
+            if not digests:
+                return False
+            if "bloom" not in block_meta:
+                return True
+            bloom = BloomFilter.from_dict(block_meta["bloom"])
+            return any(bloom.contains_digest(d) for d in digests)
+        return may_match
+
+    def _message_only(self, word: str) -> bool:
+        """
+        Whether a whitespace-free string can only occur inside the message
+        (or raw text) of a reconstructed line: it cannot span the
+        space-separated date/time/severity fields, so it must not fit
+        within any of them.
+        """
+        if any(word in sev for sev in list(self.SEVERITY_MAP) + ["UNKNOWN"]):
+            return False
+        return any(c not in "0123456789-:" for c in word)
+
+    def block_records(self, tokens: List[Any]) -> List[Any]:
+        return self.reconstruct_lines(tokens)
+
+    def format_records(self, records: List[Any]) -> str:
+        return "\n".join(records)
+
+    def reconstruct_blocks(self, head: List[Any], blocks: Iterable[List[Any]]) -> Iterator[str]:
+        # Lines are newline-separated across block boundaries too
+        separator = ""
+        for records in blocks:
+            if records:
+                yield separator + self.format_records(records)
+                separator = "\n"
 
     def reconstruct(self, tokens: List[Any]) -> Any:
+        return "\n".join(self.reconstruct_lines(tokens))
+
+    def reconstruct_lines(self, tokens: List[Any]) -> List[str]:
         lines = []
         current_ts = 0
         
@@ -137,4 +248,4 @@ class LogStrategy(BaseStrategy):
             elif isinstance(t, str) and t.startswith("RAW:"):
                 lines.append(t[4:])
                 
-        return "\n".join(lines)
+        return lines
@@ -0,0 +1,168 @@
+import importlib
+import os
+import warnings
+from dataclasses import dataclass
+from typing import Callable, Dict, FrozenSet, List, Optional, Tuple, Type
+
+# Capability flags a strategy declares; core code dispatches on these only.
+STREAMING = "streaming"        # one bitstream, tokenized again for the encode pass (rescan)
+MULTI_STREAM = "multi_stream"  # MultiStreamStrategy: per-stream models, usable with shared models
+BLOCKS = "blocks"              # record-oriented, written as independently decodable blocks
+GREP = "grep"                  # block_filter(): literal search skips blocks
+QUERY = "query"                # block_may_match()/query_block(): column projection and predicates
+SELECT = "select"              # select(): JSONPath-lite over the token stream
+APPEND = "append"              # Compressor.append(): new records become new blocks of an existing file
+
+ENTRY_POINT_GROUP = "intelligent_file_compressor.strategies"
+
+@dataclass(frozen=True)
+class StrategySpec:
+    """
+    Everything core code needs to know about a strategy without importing it.
+
+    id:           stored in every IFC1 header (1 byte). 1-63 are reserved for
+                  built-in strategies; plugins should use 64-255.
+    file_type:    name used in Compressor options and shared models.
+    target:       "package.module:Class", imported on first use.
+    extensions:   lower-case extensions detected with score 1.0.
+    capabilities: flags from this module (STREAMING, MULTI_STREAM, ...).
+    score:        optional content sniffer score(path, head) -> 0..1, where
+                  head is the first HEAD_SIZE bytes of the file.
+    """
+    id: int
+    file_type: str
+    target: str
+    extensions: Tuple[str, ...] = ()
+    capabilities: FrozenSet[str] = frozenset()
+    score: Optional[Callable[[str, bytes], float]] = None
+
+    def supports(self, capability: str) -> bool:
+        return capability in self.capabilities
+
+    def load(self) -> Type:
+        """Strategy class, importing its module on first use."""
+        cls = _loaded.get(self.id)
+        if cls is None:
+            module, _, name = self.target.partition(":")
+            cls = getattr(importlib.import_module(module), name)
+            _loaded[self.id] = cls
+        return cls
+
+
+_PACKAGE = __package__
+HEAD_SIZE = 4096
+
+# Strategy modules are imported on first use, so commands that never decode
+# a payload (stats, list) do not pay for csv/re/datetime and friends.
+BUILTIN = [
+    StrategySpec(1, "json", f"{_PACKAGE}.json_strategy:JSONStrategy", (".json",),
+                 frozenset({MULTI_STREAM, SELECT})),
+    StrategySpec(2, "csv", f"{_PACKAGE}.csv_strategy:CSVStrategy", (".csv",),
+                 frozenset({MULTI_STREAM, BLOCKS, QUERY})),
+    StrategySpec(3, "log", f"{_PACKAGE}.log_strategy:LogStrategy", (".log",),
+                 frozenset({MULTI_STREAM, BLOCKS, GREP, APPEND})),
+    StrategySpec(4, "text", f"{_PACKAGE}.text_strategy:TextStrategy", (".txt", ".md"),
+                 frozenset({STREAMING})),
+]
+
+_specs: Dict[int, StrategySpec] = {spec.id: spec for spec in BUILTIN}
+_loaded: Dict[int, Type] = {}
+_plugins_loaded = False
+
+def register(spec: StrategySpec, replace: bool = False):
+    """Adds a strategy. IDs and file types must be unique unless replace=True."""
+    if not 0 < spec.id < 256:
+        raise ValueError(f"Strategy ID must be 1-255, got {spec.id}")
+    if not replace:
+        if spec.id in _specs:
+            raise ValueError(f"Strategy ID {spec.id} is already registered ({_specs[spec.id].file_type})")
+        for other in _specs.values():
+            if other.file_type == spec.file_type:
+                raise ValueError(f"File type '{spec.file_type}' is already registered (ID {other.id})")
+    _specs[spec.id] = spec
+    _loaded.pop(spec.id, None)
+
+def unregister(strategy_id: int):
+    _specs.pop(strategy_id, None)
+    _loaded.pop(strategy_id, None)
+
+def _entry_points() -> List[object]:
+    from importlib import metadata
+    eps = metadata.entry_points()
+    if hasattr(eps, "select"):
+        return list(eps.select(group=ENTRY_POINT_GROUP))
+    return list(eps.get(ENTRY_POINT_GROUP, [])) # Python < 3.10
+
+def load_plugins():
+    """
+    Registers third-party strategies published under the
+    "intelligent_file_compressor.strategies" entry point group. An entry
+    point refers to a StrategySpec (or a list of them); the strategy class
+    itself is still imported lazily. Runs once.
+    """
+    global _plugins_loaded
+    if _plugins_loaded:
+        return
+    _plugins_loaded = True
+    for ep in _entry_points():
+        try:
+            loaded = ep.load()
+            for spec in loaded if isinstance(loaded, (list, tuple)) else [loaded]:
+                register(spec)
+        except Exception as e:
+            warnings.warn(f"Skipping strategy plugin '{ep.name}': {e}")
+
+def specs() -> List[StrategySpec]:
+    load_plugins()
+    return sorted(_specs.values(), key=lambda spec: spec.id)
+
+def get(strategy_id: int) -> StrategySpec:
+    """Spec for a strategy ID (as stored in a file header)."""
+    if strategy_id not in _specs:
+        load_plugins()
+    if strategy_id not in _specs:
+        raise ValueError(f"Unknown strategy ID: {strategy_id}")
+    return _specs[strategy_id]
+
+def for_type(file_type: str) -> StrategySpec:
+    for candidates in (lambda: _specs.values(), specs): # plugins only if needed
+        for spec in candidates():
+            if spec.file_type == file_type:
+                return spec
+    raise ValueError(f"No strategy for file type: {file_type}")
+
+def detect(file_path: str, head: bytes = None) -> Optional[StrategySpec]:
+    """
+    Best-scoring strategy for a file, or None. A matching extension scores
+    1.0 and wins outright (lowest ID first), so plain extension detection
+    neither opens the file nor scans installed plugins. Otherwise every
+    content sniffer sees the first HEAD_SIZE bytes, taken from `head` if
+    given (file_path then only supplies the extension and need not exist).
+    """
+    ext = os.path.splitext(file_path)[1].lower()
+    for spec in sorted(_specs.values(), key=lambda spec: spec.id):
+        if ext in spec.extensions:
+            return spec
+
+    best, best_score = None, 0.0
+    for spec in specs():
+        if ext in spec.extensions: # from a plugin loaded just now
+            return spec
+        if spec.score is None:
+            continue
+        if head is None:
+            with open(file_path, 'rb') as f:
+                head = f.read(HEAD_SIZE)
+        score = spec.score(file_path, head)
+        if score > best_score:
+            best, best_score = spec, score
+    return best
+
+def strategy_class(strategy_id: int) -> Type:
+    """Strategy class for a strategy ID, importing its module on first use."""
+    return get(strategy_id).load()
+
+def strategy_for(file_type: str) -> Tuple[int, Type]:
+    """(strategy ID, strategy class) for a file type."""
+    spec = for_type(file_type)
+    return spec.id, spec.load()
@@ -1,40 +1,135 @@
+import io
 import re
-from typing import Any, List, Dict, Iterator
+from collections import Counter
+from itertools import islice
+from typing import Any, List, Dict, Iterator, Iterable, Tuple
 from .base_strategy import BaseStrategy
 from ..algorithms.huffman import HuffmanEncoder
+from ..algorithms.entropy import create_coder, load_coder
+from ..algorithms.context_huffman import ContextHuffmanEncoder
 from ..utils.bit_stream import BitWriter, BitReader
+from ..utils.sources import Source, open_text
+
+def token_class(token: str) -> str:
+    """Context class of a text token: w(ord), s(pace), n(ewline), p(unctuation)."""
+    c = token[0]
+    if c.isspace():
+        return 'n' if '\n' in token else 's'
+    if c.isalnum() or c == '_':
+        return 'w'
+    return 'p'
 
 class TextStrategy(BaseStrategy):
     """
     Strict Text Strategy:
     - Tokenize: words, punct, spaces
-    - Huffman Encode
+    - Huffman/rANS Encode (order 0), or
+    - Order-1: Huffman table selected by the previous token's class
+      (Huffman only: there is no rANS context model)
+
+    The whole file is one block. It is tokenized twice (once to count,
+    once to encode) rather than held in memory, and the bitstream is
+    written as it is produced.
     """
-    def __init__(self):
-        self.huffman = HuffmanEncoder()
+    rescan = True
+    BATCH_TOKENS = 65536
+
+    def __init__(self, order: int = 0, max_context_symbols: int = 1024, entropy: str = "huffman"):
+        if order not in (0, 1):
+            raise ValueError(f"Unsupported text model order: {order}")
+        if order == 1 and entropy != HuffmanEncoder.NAME:
+            raise ValueError(f"The order-1 text model is Huffman only, not {entropy}")
+        self.order = order
+        self.model = create_coder(entropy) # order-0 model
+        self.context_model = ContextHuffmanEncoder(token_class, start='n', max_symbols=max_context_symbols)
+        self.counts = Counter() # order-0 symbol counts observed so far
 
-    def parse(self, file_path: str) -> Iterator[str]:
+    def parse(self, source: Source) -> Iterator[str]:
         # Generator that yields lines to avoid loading full file
-        with open(file_path, 'r', encoding='utf-8', errors='replace') as f:
+        with open_text(source, errors='replace') as f:
             for line in f:
                 yield line
 
     def tokenize(self, parsed_data: Iterator[str]) -> Iterator[Any]:
+        if isinstance(parsed_data, str):
+            parsed_data = [parsed_data]
         # Regex to split by words, spaces, punctuation
         pattern = re.compile(r'(\w+|[^\w\s]|\s+)')
         for line in parsed_data:
             for match in pattern.finditer(line):
                 yield match.group(0)
 
-    def train(self, tokens: Iterator[Any]):
-        self.huffman.train(tokens)
+    def parse_iter(self, source: Source) -> Iterator[str]:
+        return self.parse(source)
+
+    def tokenize_iter(self, records: Iterable[Any]) -> Iterator[Any]:
+        return iter(self.tokenize(records))
+
+    def observe(self, tokens: Iterable[Any]) -> None:
+        if self.order == 1:
+            self.context_model.observe(tokens)
+        else:
+            self.counts.update(map(str, tokens))
 
-    def encode(self, tokens: Iterator[Any], writer: BitWriter):
-        self.huffman.encode(tokens, writer)
+    def fit(self):
+        if self.order == 1:
+            self.context_model.build()
+        else:
+            self.model.build_from_frequencies(self.counts)
+            self.counts = Counter()
 
-    def decode(self, reader: BitReader, metadata: Dict[str, Any]) -> List[Any]:
-        limit = metadata.get('token_count')
-        return self.huffman.decode(reader, metadata['huffman_tree'], limit=limit)
+    def model_metadata(self) -> Dict[str, Any]:
+        if self.order == 1:
+            return {
+                "order": 1,
+                "context_model": self.context_model.to_dict(),
+                "token_count": self.context_model.total_tokens
+            }
+        return {
+            self.model.NAME: self.model.to_dict(),
+            "token_count": self.model.total_tokens
+        }
+
+    def encode_block(self, tokens: Iterable[Any]) -> Tuple[Dict[str, Any], Iterator[bytes]]:
+        return {}, self._bitstream(iter(tokens))
+
+    def _bitstream(self, tokens: Iterator[Any]) -> Iterator[bytes]:
+        """The payload, produced BATCH_TOKENS tokens at a time."""
+        if self.order == 0 and not isinstance(self.model, HuffmanEncoder):
+            yield self.model.encode_bytes(tokens) # rANS codes the stream back to front
+            return
+        sink = io.BytesIO()
+        writer = BitWriter(sink)
+        ctx = None
+        for batch in iter(lambda: list(islice(tokens, self.BATCH_TOKENS)), []):
+            if self.order == 1:
+                ctx = self.context_model.encode(batch, writer, ctx)
+            else:
+                self.model.encode(batch, writer)
+            yield sink.getvalue()
+            sink.seek(0)
+            sink.truncate()
+        writer.close()
+        yield sink.getvalue()
+
+    def load_model(self, metadata: Dict[str, Any]):
+        self.order = metadata.get('order', 0)
+        if self.order == 1:
+            self.context_model.from_dict(metadata['context_model'])
+        elif 'huffman_tree' not in metadata:
+            self.model = load_coder(metadata)
+
+    def decode_block(self, block_meta: Dict[str, Any], data: bytes) -> List[Any]:
+        limit = block_meta.get('token_count')
+        if self.order == 1:
+            return self.context_model.decode(data, limit)
+        if 'huffman_tree' in block_meta:
+            # IFC files written before canonical code lengths were stored
+            return HuffmanEncoder().decode(BitReader(data), block_meta['huffman_tree'], limit=limit)
+        return self.model.decode_bytes(data, limit)
 
     def reconstruct(self, tokens: List[Any]) -> Any:
         return "".join(tokens)
+
+    def reconstruct_iter(self, tokens: List[Any]) -> Iterator[str]:
+        return iter(tokens)
@@ -0,0 +1,123 @@
+import os
+import tempfile
+import unittest
+from intelligent_file_compressor.core.compressor import Compressor
+from intelligent_file_compressor.core.decompressor import Decompressor
+from intelligent_file_compressor.storage.blocks import BlockReader, INDEX_FRAME, MODEL_FRAME, STATE_FRAME
+from intelligent_file_compressor.storage.reader import IFCReader
+from intelligent_file_compressor.storage.writer import IFCWriter
+
+def lines(start, stop, msg="served"):
+    return "".join(f"2024-01-01 00:{i // 60 % 60:02d}:{i % 60:02d} INFO request {i % 5} {msg}\n"
+                   for i in range(start, stop))
+
+class TestAppend(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.log = os.path.join(self.tmp.name, "app.log")
+        self.ifc = self.log + ".ifc"
+        self.compressor = Compressor(options={"log": {"block_size": 20}}, verbose=False)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, text, mode='a'):
+        with open(self.log, mode) as f:
+            f.write(text)
+
+    def frames(self):
+        with open(self.ifc, 'rb') as f:
+            IFCReader.read_header(f)
+            return BlockReader.scan(f)
+
+    def restored(self, path, workers=1):
+        Decompressor(workers=workers).decompress(path, path + ".out")
+        with open(path + ".out") as f:
+            return f.read()
+
+    def test_appends_match_a_full_compression(self):
+        # The partial last line waits for the next run
+        self.write(lines(0, 50) + "2024-01-01 00:01:00 INFO part", 'w')
+        self.assertEqual(self.compressor.append(self.log, self.ifc), 50)
+        self.write("ial line\n" + lines(51, 90, "new thing"))
+        self.assertEqual(self.compressor.append(self.log, self.ifc), 40)
+        self.assertEqual(self.compressor.append(self.log, self.ifc), 0)
+
+        # The first state frame stays, with the trailer of then as its data;
+        # two blocks are not enough for a new index
+        kinds = [e.kind for e in self.frames()]
+        self.assertEqual(kinds, [None, None, None, INDEX_FRAME, STATE_FRAME, MODEL_FRAME, None, None, STATE_FRAME])
+        self.assertEqual(self.frames()[4].data_len, IFCWriter.TRAILER_SIZE)
+        state = self.frames()[-1].meta
+        self.assertEqual((state["offset"], state["records"]), (os.path.getsize(self.log), 90))
+
+        full = os.path.join(self.tmp.name, "full.ifc")
+        self.compressor.compress(self.log, full)
+        self.assertEqual(self.restored(self.ifc), self.restored(full))
+        self.assertEqual(self.restored(self.ifc, workers=2), self.restored(full))
+
+        d = Decompressor()
+        self.assertEqual([n for n, _ in d.grep(self.ifc, "new thing")], list(range(51, 90)))
+        self.assertEqual(d.read_records(self.ifc, 49, 51)[1], "2024-01-01 00:01:00 INFO partial line")
+
+    def test_model_modes(self):
+        self.write(lines(0, 30), 'w')
+        self.compressor.append(self.log, self.ifc)
+        # Same messages and timestamps again: the models cover them
+        self.write(lines(0, 30))
+        self.compressor.append(self.log, self.ifc, model="reuse")
+        self.assertNotIn(MODEL_FRAME, [e.kind for e in self.frames()])
+
+        # New messages are escaped
+        self.write(lines(30, 40, "brand new"))
+        self.compressor.append(self.log, self.ifc, model="reuse")
+        self.assertNotIn(MODEL_FRAME, [e.kind for e in self.frames()])
+        expected = lines(0, 30) * 2 + lines(30, 40, "brand new")
+        self.assertEqual(self.restored(self.ifc).splitlines(), expected.splitlines())
+
+        # Every line so far is INFO: the elided severity stream cannot escape ERROR
+        errors = lines(40, 50, "brand new").replace("INFO", "ERROR")
+        self.write(errors)
+        with self.assertRaises(ValueError):
+            self.compressor.append(self.log, self.ifc, model="reuse")
+        self.compressor.append(self.log, self.ifc, model="extend")
+        model = [e for e in self.frames() if e.kind == MODEL_FRAME][0].meta
+        self.assertIn("sev", model["streams"])
+        symbols = model["streams"]["msg"]["huffman"]["s"]
+        self.assertIn(" request 1 served", symbols)
+        self.assertIn(" request 1 brand new", symbols)
+        self.assertEqual(self.restored(self.ifc).splitlines(), (expected + errors).splitlines())
+
+    def test_frequent_new_symbols_are_promoted(self):
+        self.write(lines(0, 30), 'w')
+        self.compressor.append(self.log, self.ifc)
+        # Each new message 4 times, and one once: only the first are worth a model
+        later = lines(30, 50, "later") + "2024-01-01 00:00:50 INFO odd one out\n"
+        self.write(later)
+        self.compressor.append(self.log, self.ifc)
+        models = [e.meta for e in self.frames() if e.kind == MODEL_FRAME]
+        self.assertEqual(len(models), 1)
+        # Each append starts with a new absolute timestamp: escaped, not refitted
+        self.assertEqual(list(models[0]["streams"]), ["msg"])
+        symbols = models[0]["streams"]["msg"]["huffman"]["s"]
+        self.assertIn(" request 1 later", symbols)
+        self.assertNotIn(" odd one out", symbols)
+        self.assertEqual(self.restored(self.ifc).splitlines(), (lines(0, 30) + later).splitlines())
+        self.assertEqual([n for n, _ in Decompressor().grep(self.ifc, "odd one")], [50])
+
+    def test_rotated_input_is_refused(self):
+        self.write(lines(0, 30), 'w')
+        self.compressor.append(self.log, self.ifc)
+        self.write(lines(100, 200), 'w')
+        with self.assertRaises(ValueError):
+            self.compressor.append(self.log, self.ifc)
+
+    def test_append_to_compressed_file(self):
+        self.write(lines(0, 30), 'w')
+        self.compressor.compress(self.log, self.ifc)
+        self.write(lines(30, 45))
+        self.assertEqual(self.compressor.append(self.log, self.ifc), 15)
+        self.assertEqual(self.restored(self.ifc).splitlines(), lines(0, 45).splitlines())
+
+if __name__ == '__main__':
+    unittest.main()
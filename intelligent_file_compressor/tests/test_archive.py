@@ -0,0 +1,64 @@
+import json
+import os
+import tempfile
+import unittest
+from intelligent_file_compressor.core.compressor import Compressor
+from intelligent_file_compressor.core.decompressor import Decompressor
+from intelligent_file_compressor.storage.archive import IFCArchiveReader
+
+class TestArchive(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.src = os.path.join(self.tmp.name, "bundle")
+        os.makedirs(os.path.join(self.src, "logs"))
+        for i in range(3):
+            with open(os.path.join(self.src, f"event_{i}.json"), 'w') as f:
+                json.dump({"id": i, "status": "ok"}, f)
+        with open(os.path.join(self.src, "logs", "app.log"), 'w') as f:
+            f.write("2023-01-01 10:00:00 INFO Started\n")
+        self.archive = os.path.join(self.tmp.name, "bundle.ifca")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_list_and_extract_single_member(self):
+        Compressor(verbose=False).compress_archive([self.src], self.archive)
+
+        with open(self.archive, 'rb') as f:
+            archive = IFCArchiveReader(f)
+            names = sorted(m["name"] for m in archive.members)
+            self.assertEqual(names, ["event_0.json", "event_1.json", "event_2.json", "logs/app.log"])
+            # The three JSON members share one embedded model
+            self.assertEqual([sid for sid, _ in archive.models], [1])
+            self.assertEqual(archive.find("event_1.json")["original_size"],
+                             os.path.getsize(os.path.join(self.src, "event_1.json")))
+
+        out_dir = os.path.join(self.tmp.name, "out")
+        written = Decompressor().extract_archive(self.archive, out_dir, ["event_1.json"])
+        self.assertEqual(len(written), 1)
+        with open(written[0]) as f:
+            self.assertEqual(json.load(f), {"id": 1, "status": "ok"})
+        self.assertFalse(os.path.exists(os.path.join(out_dir, "event_0.json")))
+
+    def test_member_must_match_the_directory(self):
+        Compressor(verbose=False).compress_archive([self.src], self.archive)
+        # Reformatted JSON and LOG members match what the directory expects
+        self.assertEqual(len(Decompressor().extract_archive(self.archive, os.path.join(self.tmp.name, "all"))), 4)
+        with open(self.archive, 'r+b') as f:
+            archive = IFCArchiveReader(f)
+            first, second = archive.find("event_0.json"), archive.find("event_1.json")
+            self.assertEqual(first["compressed_size"], second["compressed_size"])
+            # A sound member in itself (its checksums hold), but not this one
+            f.seek(first["offset"])
+            member = f.read(first["compressed_size"])
+            f.seek(second["offset"])
+            f.write(member)
+
+        out_dir = os.path.join(self.tmp.name, "out")
+        with self.assertRaises(ValueError):
+            Decompressor().extract_archive(self.archive, out_dir, ["event_1.json"])
+        self.assertFalse(os.path.exists(os.path.join(out_dir, "event_1.json")))
+        self.assertEqual(len(Decompressor().extract_archive(self.archive, out_dir, ["event_0.json"])), 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,129 @@
+import asyncio
+import os
+import tempfile
+import unittest
+from intelligent_file_compressor.core.async_api import compress_stream, decompress_stream, compress_iter, decompress_iter
+from intelligent_file_compressor.core.compressor import Compressor
+from intelligent_file_compressor.core.decompressor import Decompressor
+
+class Sink:
+    """StreamWriter stand-in that records how often it was drained."""
+    def __init__(self):
+        self.chunks = []
+        self.drains = 0
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+
+    async def drain(self):
+        self.drains += 1
+
+    def getvalue(self):
+        return b"".join(self.chunks)
+
+async def pieces(data, size=1000):
+    for i in range(0, len(data), size):
+        await asyncio.sleep(0)
+        yield data[i:i + size]
+
+class TestAsyncAPI(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.log = os.path.join(self.tmp.name, "app.log")
+        with open(self.log, 'w') as f:
+            for i in range(300):
+                f.write(f"2024-01-01 00:{i // 60:02d}:{i % 60:02d} INFO request {i % 7} served\n")
+        with open(self.log, 'rb') as f:
+            self.data = f.read()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_stream_reader_round_trip(self):
+        async def run():
+            reader = asyncio.StreamReader()
+            reader.feed_data(self.data)
+            reader.feed_eof()
+            packed = Sink()
+            compressor = Compressor(options={"log": {"block_size": 50}}, verbose=False)
+            await compress_stream(reader, packed, strategy="log", compressor=compressor)
+
+            reader = asyncio.StreamReader()
+            reader.feed_data(packed.getvalue())
+            reader.feed_eof()
+            restored = Sink()
+            await decompress_stream(reader, restored)
+            return packed, restored
+
+        packed, restored = asyncio.run(run())
+        out = os.path.join(self.tmp.name, "app.ifc")
+        with open(out, 'wb') as f:
+            f.write(packed.getvalue())
+        Decompressor().decompress(out, out + ".log")
+        with open(out + ".log", 'rb') as f:
+            self.assertEqual(restored.getvalue(), f.read())
+        self.assertEqual(packed.drains, len(packed.chunks))
+
+    def test_matches_file_output(self):
+        out = os.path.join(self.tmp.name, "app.ifc")
+        Compressor(verbose=False).compress(self.log, out)
+        with open(out, 'rb') as f:
+            expected = f.read()
+
+        async def run():
+            return b"".join([chunk async for chunk in compress_iter(pieces(self.data), name="app.log")])
+
+        self.assertEqual(asyncio.run(run()), expected)
+
+    def test_json_and_text_from_async_iterables(self):
+        samples = {
+            "doc.json": b'{"users": [{"id": 1, "name": "a"}, {"id": 2, "name": "b"}], "ok": true}',
+            "notes.txt": "the cat sat on the mat, then the dog sat.\n".encode() * 40,
+        }
+
+        async def run(name, data):
+            packed = b"".join([chunk async for chunk in compress_iter(pieces(data, 7), name=name)])
+            return b"".join([chunk async for chunk in decompress_iter(pieces(packed, 5))])
+
+        text = samples["notes.txt"]
+        self.assertEqual(asyncio.run(run("notes.txt", text)), text)
+        restored = asyncio.run(run("doc.json", samples["doc.json"]))
+        self.assertIn(b'"name": "b"', restored)
+
+    def test_undetectable_type_fails_before_reading(self):
+        read = []
+
+        async def source():
+            read.append(True)
+            yield self.data
+
+        async def run(**kwargs):
+            return [chunk async for chunk in compress_iter(source(), **kwargs)]
+
+        for kwargs in ({}, {"name": "upload"}, {"name": "upload.bin"}):
+            with self.assertRaises(ValueError):
+                asyncio.run(run(**kwargs))
+        self.assertEqual(read, [])
+
+    def test_truncated_input_fails(self):
+        async def run():
+            packed = b"".join([chunk async for chunk in compress_iter(pieces(self.data), strategy="log")])
+            return [chunk async for chunk in decompress_iter(pieces(packed[:-10]))]
+
+        with self.assertRaises(ValueError):
+            asyncio.run(run())
+
+    def test_source_errors_propagate(self):
+        async def run():
+            packed = b"".join([chunk async for chunk in compress_iter(pieces(self.data), strategy="log")])
+
+            async def broken():
+                yield packed[:len(packed) // 2]
+                raise ConnectionResetError("peer went away")
+            return [chunk async for chunk in decompress_iter(broken())]
+
+        with self.assertRaises(ConnectionResetError):
+            asyncio.run(run())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,45 @@
+import json
+import os
+import tempfile
+import unittest
+from intelligent_file_compressor.core.compressor import Compressor
+from intelligent_file_compressor.core.decompressor import Decompressor
+
+class TestBatch(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.src = os.path.join(self.tmp.name, "src")
+        self.dst = os.path.join(self.tmp.name, "dst")
+        os.makedirs(os.path.join(self.src, "nested"))
+        for i in range(3):
+            with open(os.path.join(self.src, f"doc_{i}.json"), 'w') as f:
+                json.dump({"id": i, "items": [1, 2, 3]}, f)
+        with open(os.path.join(self.src, "nested", "app.log"), 'w') as f:
+            f.write("2023-01-01 10:00:00 INFO Started\n2023-01-01 10:00:05 ERROR Failed\n")
+        with open(os.path.join(self.src, "image.png"), 'wb') as f:
+            f.write(b"\x89PNG")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_compress_dir_with_pool(self):
+        report = Compressor(verbose=False).compress_dir(self.src, self.dst, jobs=2)
+        self.assertEqual(report.files, 4) # .png is skipped
+        self.assertEqual(report.failures, [])
+        self.assertGreater(report.bytes_in, 0)
+
+        out = os.path.join(self.tmp.name, "doc_1.json")
+        Decompressor().decompress(os.path.join(self.dst, "doc_1.json.ifc"), out)
+        with open(out) as f:
+            self.assertEqual(json.load(f), {"id": 1, "items": [1, 2, 3]})
+        self.assertTrue(os.path.exists(os.path.join(self.dst, "nested", "app.log.ifc")))
+
+    def test_failures_are_reported(self):
+        with open(os.path.join(self.src, "broken.json"), 'w') as f:
+            f.write("{not json")
+        report = Compressor(verbose=False).compress_dir(self.src, self.dst, jobs=1)
+        self.assertEqual(report.files, 4)
+        self.assertEqual([os.path.basename(p) for p, _ in report.failures], ["broken.json"])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,90 @@
+import io
+import os
+import tempfile
+import unittest
+from intelligent_file_compressor.core.compressor import Compressor
+from intelligent_file_compressor.core.decompressor import Decompressor
+from intelligent_file_compressor.storage.reader import IFCReader
+
+class Pipe(io.RawIOBase):
+    """Unseekable binary stream, like a socket or an HTTP body."""
+    def __init__(self, data):
+        self.data = io.BytesIO(data)
+
+    def readable(self):
+        return True
+
+    def readinto(self, b):
+        chunk = self.data.read(min(len(b), 100))
+        b[:len(chunk)] = chunk
+        return len(chunk)
+
+class TestBytesAPI(unittest.TestCase):
+    SAMPLES = {
+        "app.log": "".join(f"2024-01-01 00:00:{i % 60:02d} INFO request {i % 5} served\n" for i in range(120)),
+        "t.csv": "id,name\n" + "".join(f"{i},n{i % 3}\n" for i in range(50)),
+        "doc.json": '{\n  "users": [\n    {\n      "id": 1\n    }\n  ]\n}',
+        "notes.txt": "the cat sat on the mat, then the dog sat.\n" * 30,
+    }
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.compressor = Compressor(options={"log": {"block_size": 32}, "csv": {"block_size": 16}}, verbose=False)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def path_output(self, name):
+        path = os.path.join(self.tmp.name, name)
+        with open(path, 'w', newline='') as f:
+            f.write(self.SAMPLES[name])
+        self.compressor.compress(path, path + ".ifc")
+        with open(path + ".ifc", 'rb') as f:
+            packed = f.read()
+        Decompressor().decompress(path + ".ifc", path + ".out")
+        with open(path + ".out", 'rb') as f:
+            return packed, f.read()
+
+    def test_matches_path_api(self):
+        for name, text in self.SAMPLES.items():
+            packed, restored = self.path_output(name)
+            data = text.encode()
+            for buffer in (data, bytearray(data), memoryview(data)):
+                out = self.compressor.compress_bytes(buffer, name=name)
+                self.assertEqual(out, packed, name)
+                self.assertEqual(Decompressor().decompress_bytes(memoryview(out)), restored, name)
+
+    def test_file_objects(self):
+        packed, restored = self.path_output("app.log")
+        src = io.BytesIO(b"junk" + self.SAMPLES["app.log"].encode())
+        src.seek(4)
+        dst = io.BytesIO()
+        self.compressor.compress_to(src, dst, name="app.log")
+        self.assertEqual(dst.getvalue(), packed)
+
+        out = io.BytesIO()
+        pipe = Pipe(packed)
+        Decompressor().decompress_to(pipe, out)
+        self.assertEqual(out.getvalue(), restored)
+        self.assertFalse(out.closed or pipe.closed)
+
+    def test_unseekable_input(self):
+        data = self.SAMPLES["app.log"].encode()
+        packed = self.compressor.compress_bytes(data, file_type="log", name="app.log")
+        self.assertEqual(self.compressor.compress_to(Pipe(data), io.BytesIO(), file_type="log"), 3)
+        # TEXT tokenizes its input twice
+        with self.assertRaises(ValueError):
+            self.compressor.compress_to(Pipe(b"some words"), io.BytesIO(), file_type="text")
+        # Nothing to detect the type from
+        with self.assertRaises(ValueError):
+            self.compressor.compress_bytes(data)
+        self.assertEqual(IFCReader.read(packed)[1]["name"], "app.log")
+
+    def test_queries_on_bytes(self):
+        packed = self.compressor.compress_bytes(self.SAMPLES["app.log"].encode(), file_type="log")
+        hits = list(Decompressor().grep(packed, "request 3"))
+        self.assertEqual(len(hits), 24)
+        self.assertEqual(len(Decompressor().read_records(io.BytesIO(packed), 30, 40)), 10)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,155 @@
+import os
+import tempfile
+import threading
+import unittest
+from intelligent_file_compressor.core.compressor import Compressor
+from intelligent_file_compressor.core.decompressor import Decompressor
+from intelligent_file_compressor.core.follow import LogFollower
+from intelligent_file_compressor.storage.blocks import BlockReader, BlockWriter, STATE_FRAME
+from intelligent_file_compressor.storage.reader import IFCReader
+
+def lines(start, stop, msg="served"):
+    return "".join(f"2024-01-01 00:{i // 60 % 60:02d}:{i % 60:02d} INFO request {i % 5} {msg}\n"
+                   for i in range(start, stop))
+
+class Watched:
+    """Output file stand-in that calls `seen` after every write, as a reader would look in."""
+    def __init__(self, f, seen):
+        self.f = f
+        self.seen = seen
+
+    def write(self, data):
+        n = self.f.write(data)
+        self.f.flush()
+        self.seen()
+        return n
+
+    def __getattr__(self, name):
+        return getattr(self.f, name)
+
+class TestFollow(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.log = os.path.join(self.tmp.name, "app.log")
+        self.ifc = os.path.join(self.tmp.name, "app.ifc")
+        self.compressor = Compressor(options={"log": {"block_size": 20}}, verbose=False)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, text, mode='a'):
+        with open(self.log, mode) as f:
+            f.write(text)
+
+    def follower(self, **kwargs):
+        kwargs.setdefault("flush_interval", 0)
+        return LogFollower(self.compressor, self.log, self.ifc, **kwargs)
+
+    def restored(self):
+        out = os.path.join(self.tmp.name, "out")
+        Decompressor().decompress(self.ifc, out)
+        with open(out) as f:
+            return f.read().splitlines()
+
+    def test_every_flush_is_readable(self):
+        follower = self.follower()
+        self.assertFalse(follower.step()) # no input yet
+        self.write(lines(0, 30) + "2024-01-01 00:00:30 INFO part", 'w')
+        self.assertTrue(follower.step())
+        self.assertEqual(self.restored(), lines(0, 30).splitlines())
+        self.write("ial\n" + lines(31, 50))
+        follower.step()
+        self.assertEqual(self.restored()[30:], ["2024-01-01 00:00:30 INFO partial"] + lines(31, 50).splitlines())
+        self.assertFalse(follower.step())
+        follower.close()
+        self.assertEqual(follower.records, 50)
+
+    def test_readers_between_flushes(self):
+        follower = self.follower()
+        self.write(lines(0, 30), 'w')
+        follower.step()
+        self.write(lines(30, 50, "new thing"))
+        views = []
+
+        def seen():
+            views.append((len(self.restored()), Decompressor().verify(self.ifc).problems))
+
+        follower._target.f = Watched(follower._target.f, seen)
+        follower.step()
+        # Old or new, whole either way
+        self.assertEqual(views[0], (30, []))
+        self.assertEqual(views[-1], (50, []))
+        self.assertEqual([view for view in views if view not in ((30, []), (50, []))], [])
+        follower.close()
+
+        # An append cut short before the switch leaves the file as it was
+        self.write(lines(50, 60))
+        follower = self.follower()
+        follower.step()
+        follower.close()
+        with open(self.ifc, 'rb') as f:
+            IFCReader.read_header(f)
+            state = [e for e in BlockReader.scan(f) if e.kind == STATE_FRAME][-2]
+        with open(self.ifc, 'r+b') as f:
+            f.seek(state.offset + BlockWriter.DATA_LEN_OFFSET)
+            f.write(BlockWriter.data_len(0))
+        self.assertEqual(len(self.restored()), 50)
+        self.assertTrue(Decompressor().verify(self.ifc).ok)
+        follower = self.follower()
+        follower.step()
+        follower.close()
+        self.assertEqual(self.restored(), (lines(0, 30) + lines(30, 50, "new thing") + lines(50, 60)).splitlines())
+
+    def test_size_threshold(self):
+        follower = self.follower(flush_bytes=len(lines(0, 40)), flush_interval=3600)
+        self.write(lines(0, 30), 'w')
+        follower.step()
+        self.assertFalse(os.path.exists(self.ifc))
+        self.write(lines(30, 45))
+        follower.step()
+        self.assertEqual(len(self.restored()), 40)
+        follower.step()
+        follower.close()
+        self.assertEqual(len(self.restored()), 45)
+
+    def test_rotation_and_restart(self):
+        follower = self.follower()
+        self.write(lines(0, 30), 'w')
+        follower.step()
+        self.write(lines(30, 35) + "2024-01-01 00:00:35 INFO last")
+        os.rename(self.log, self.log + ".1")
+        follower.step()
+        self.write(lines(100, 120), 'w')
+        follower.step() # old file drained and flushed, new one opened
+        follower.step()
+        follower.close()
+        expected = (lines(0, 35) + "2024-01-01 00:00:35 INFO last\n" + lines(100, 120)).splitlines()
+        self.assertEqual(self.restored(), expected)
+
+        # A new follower resumes after the last flush
+        self.write(lines(120, 130))
+        follower = self.follower()
+        follower.step()
+        follower.close()
+        self.assertEqual(self.restored(), expected + lines(120, 130).splitlines())
+
+        # copytruncate
+        follower = self.follower()
+        self.write(lines(200, 210), 'w')
+        follower.step()
+        follower.step()
+        follower.close()
+        self.assertEqual(self.restored()[-10:], lines(200, 210).splitlines())
+
+    def test_run_until_stopped(self):
+        self.write(lines(0, 25), 'w')
+        stop = threading.Event()
+        follower = self.follower(poll_interval=0.01)
+        thread = threading.Thread(target=follower.run, args=(stop,))
+        thread.start()
+        stop.set()
+        thread.join()
+        self.assertEqual(len(self.restored()), 25)
+
+if __name__ == '__main__':
+    unittest.main()
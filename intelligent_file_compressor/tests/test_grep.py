@@ -0,0 +1,77 @@
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+from intelligent_file_compressor.algorithms.bloom import BloomFilter
+from intelligent_file_compressor.core.compressor import Compressor
+from intelligent_file_compressor.core.decompressor import Decompressor
+from intelligent_file_compressor.strategies.base_strategy import MultiStreamStrategy
+
+class TestGrep(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.log = os.path.join(self.tmp.name, "app.log")
+        with open(self.log, 'w') as f:
+            for i in range(100):
+                msg = "Kernel panic in module xyz" if i == 73 else f"request {i % 10} done"
+                f.write(f"2023-01-01 10:{i // 60:02d}:{i % 60:02d} INFO {msg}\n")
+            f.write("stack trace without timestamp\n")
+        self.out = self.log + ".ifc"
+        Compressor(options={"log": {"block_size": 10}}, verbose=False).compress(self.log, self.out)
+
+        # Count decoded blocks to check that the prefilter skips the rest
+        self.decoded = 0
+        original = MultiStreamStrategy.decode_block
+        def counting(strategy, block_meta, data):
+            self.decoded += 1
+            return original(strategy, block_meta, data)
+        MultiStreamStrategy.decode_block = counting
+        self.addCleanup(setattr, MultiStreamStrategy, 'decode_block', original)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_literal_skips_blocks(self):
+        hits = list(Decompressor().grep(self.out, "Kernel panic"))
+        self.assertEqual(hits, [(73, "2023-01-01 10:01:13 INFO Kernel panic in module xyz")])
+        self.assertEqual(self.decoded, 1)
+
+        self.assertEqual(list(Decompressor().grep(self.out, "no such text")), [])
+        self.assertEqual(self.decoded, 1)
+
+        self.assertEqual(list(Decompressor().grep(self.out, "trace")),
+                         [(100, "stack trace without timestamp")])
+
+    def test_fallback_scans_everything(self):
+        # Matches the severity field: the symbol tables cannot rule blocks out
+        self.assertEqual(len(list(Decompressor().grep(self.out, "INFO"))), 100)
+        self.assertEqual(self.decoded, 11)
+        hits = list(Decompressor().grep(self.out, r"request [37] done$", regex=True))
+        self.assertEqual(len(hits), 19) # line 73 is the panic line
+
+    def test_bloom_filter(self):
+        bloom = BloomFilter.from_dict(BloomFilter.of(f"sym{i}" for i in range(200)).to_dict())
+        self.assertTrue(all(f"sym{i}" in bloom for i in range(200)))
+        self.assertLess(sum(f"other{i}" in bloom for i in range(1000)), 50)
+
+    def test_output_closed_early(self):
+        # `ifc grep ... | head -1`: no traceback once head has had enough
+        big = os.path.join(self.tmp.name, "big.log")
+        with open(big, 'w') as f:
+            for i in range(5000):
+                f.write(f"2023-01-01 10:{i // 60 % 60:02d}:{i % 60:02d} INFO request {i % 10} done\n")
+        Compressor(verbose=False).compress(big, big + ".ifc")
+        root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+        for command in (["grep", big + ".ifc", "INFO"], ["cat", big + ".ifc", "--lines", "0:"]):
+            proc = subprocess.Popen([sys.executable, "-m", "intelligent_file_compressor.cli.main"] + command,
+                                    cwd=root, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+            self.assertIn(b"INFO", proc.stdout.readline())
+            proc.stdout.close()
+            err = proc.stderr.read()
+            proc.stderr.close()
+            proc.wait()
+            self.assertEqual(err, b"")
+
+if __name__ == '__main__':
+    unittest.main()
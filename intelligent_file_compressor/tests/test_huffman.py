@@ -0,0 +1,53 @@
+import random
+import unittest
+from intelligent_file_compressor.algorithms.huffman import HuffmanEncoder, code_lengths
+
+def kraft(lengths):
+    return sum(2 ** -length for length in lengths)
+
+class TestHuffman(unittest.TestCase):
+    def test_lengths_are_optimal(self):
+        rng = random.Random(3)
+        for _ in range(200):
+            weights = sorted(rng.randint(1, rng.choice([3, 100, 10000])) for _ in range(rng.randint(2, 40)))
+            lengths = code_lengths(weights, 32)
+            self.assertEqual(kraft(lengths), 1)
+            self.assertEqual(lengths, sorted(lengths, reverse=True))
+            # Same cost as merging the two lightest subtrees, one pair at a time
+            queue, cost = list(weights), 0
+            while len(queue) > 1:
+                queue.sort()
+                merged = queue.pop(0) + queue.pop(0)
+                cost += merged
+                queue.append(merged)
+            self.assertEqual(sum(w * n for w, n in zip(weights, lengths)), cost)
+
+    def test_lengths_are_limited(self):
+        fibonacci = [1, 1]
+        while len(fibonacci) < 60:
+            fibonacci.append(fibonacci[-1] + fibonacci[-2])
+        self.assertEqual(max(code_lengths(fibonacci, 64)), 59)
+        for limit in (6, 12, 24):
+            lengths = code_lengths(fibonacci, limit)
+            self.assertEqual(max(lengths), limit)
+            self.assertEqual(kraft(lengths), 1)
+            self.assertEqual(lengths, sorted(lengths, reverse=True))
+        with self.assertRaises(ValueError):
+            code_lengths([1] * 9, 3)
+
+    def test_skewed_alphabet_round_trip(self):
+        # Codes this deep used to mean as deep a recursion
+        freq = {f"s{i}": 2 ** min(i, 60) for i in range(2000)}
+        encoder = HuffmanEncoder()
+        encoder.build_from_frequencies(freq)
+        self.assertEqual(max(len(code) for code in encoder.codes.values()), HuffmanEncoder.MAX_CODE_LENGTH)
+        tokens = list(freq) * 2
+        data = encoder.encode_bytes(tokens)
+
+        restored = HuffmanEncoder()
+        restored.from_dict(encoder.to_dict())
+        self.assertEqual(restored.codes, encoder.codes)
+        self.assertEqual(restored.decode_bytes(data, len(tokens)), tokens)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,51 @@
+import json
+import os
+import tempfile
+import unittest
+from intelligent_file_compressor.core.compressor import Compressor
+from intelligent_file_compressor.core.decompressor import Decompressor
+
+class TestJSONExact(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def round_trip(self, text):
+        path = os.path.join(self.tmp.name, "doc.json")
+        with open(path, 'w', encoding='utf-8', newline='') as f:
+            f.write(text)
+        Compressor(options={"json": {"exact": True}}, verbose=False).compress(path, path + ".ifc")
+        Decompressor().decompress(path + ".ifc", path + ".out")
+        with open(path + ".out", encoding='utf-8', newline='') as f:
+            return f.read()
+
+    def test_layouts(self):
+        doc = {"ids": [1, 2, 3, 4], "name": "xé", "empty": {}, "list": [], "flags": [True, None, False]}
+        for text in (json.dumps(doc, indent=2), json.dumps(doc, indent=4) + "\n",
+                     json.dumps(doc, separators=(",", ":")), json.dumps(doc),
+                     '{\r\n\t"a" : [ 1 ,2 ],\r\n\t"b": {}\r\n}\r\n'):
+            self.assertEqual(self.round_trip(text), text)
+
+    def test_spelling(self):
+        # Escapes, exponents, trailing zeros and -0 keep their original text
+        text = '{"k\\u0041": "q\\"uo\\/te\\n", "n": [1.50, 1E+2, -0, 2e-3, 10]}'
+        self.assertEqual(self.round_trip(text), text)
+        self.assertEqual(self.round_trip('  "scalar" '), '  "scalar" ')
+
+    def test_path_decodes_escapes(self):
+        path = os.path.join(self.tmp.name, "doc.json")
+        with open(path, 'w') as f:
+            f.write('{"k\\u0041": "a\\nb", "n": [1, 2, 3]}')
+        Compressor(options={"json": {"exact": True}}, verbose=False).compress(path, path + ".ifc")
+        self.assertEqual(list(Decompressor().json_path(path + ".ifc", "$.kA")), ["a\nb"])
+        self.assertEqual(list(Decompressor().json_path(path + ".ifc", "$.n[*]")), [1, 2, 3])
+
+    def test_invalid(self):
+        for text in ('{"a": 1,}', '[1 2]', '{"a": tru}', '[1]x'):
+            with self.assertRaises(ValueError):
+                self.round_trip(text)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,51 @@
+import json
+import os
+import tempfile
+import unittest
+from intelligent_file_compressor.core.compressor import Compressor
+from intelligent_file_compressor.core.decompressor import Decompressor
+from intelligent_file_compressor.strategies.json_strategy import parse_json_path
+
+class TestJSONPath(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.doc = {
+            "meta": {"version": "2.1", "tags": ["a", "b"]},
+            "items": [{"id": i, "name": f"item{i}", "price": i * 1.5} for i in range(5)],
+            "seq": [1, 2, 3, 4],
+            "odd key": None
+        }
+        path = os.path.join(self.tmp.name, "doc.json")
+        with open(path, 'w') as f:
+            json.dump(self.doc, f)
+        self.out = path + ".ifc"
+        Compressor(verbose=False).compress(path, self.out)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def select(self, path):
+        return list(Decompressor().json_path(self.out, path))
+
+    def test_paths(self):
+        self.assertEqual(self.select("$.meta.version"), ["2.1"])
+        self.assertEqual(self.select("$.items[*].id"), [0, 1, 2, 3, 4])
+        self.assertEqual(self.select("$.items[2]"), [self.doc["items"][2]])
+        self.assertEqual(self.select("$.seq[*]"), [1, 2, 3, 4])
+        self.assertEqual(self.select("$.seq[1]"), [2])
+        self.assertEqual(self.select("$['odd key']"), [None])
+        self.assertEqual(self.select("$.meta.*"), ["2.1", ["a", "b"]])
+        self.assertEqual(self.select("$"), [self.doc])
+
+    def test_no_match(self):
+        self.assertEqual(self.select("$.missing"), [])
+        self.assertEqual(self.select("$.items[9].id"), [])
+
+    def test_parse(self):
+        self.assertEqual(parse_json_path("$.a[0]['b c'].*"),
+                         [("key", "a"), ("index", 0), ("key", "b c"), ("wild", None)])
+        with self.assertRaises(ValueError):
+            parse_json_path("$..id")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,62 @@
+import unittest
+from intelligent_file_compressor.algorithms.multi_stream import ESCAPE, MultiStreamCoder
+from intelligent_file_compressor.strategies.json_strategy import JSONStrategy
+from intelligent_file_compressor.strategies.csv_strategy import CSVStrategy
+
+class TestMultiStream(unittest.TestCase):
+    def test_json_streams_roundtrip(self):
+        strat = JSONStrategy()
+        data = {"id": [1, 2, 3], "name": "Test", "nested": {"ok": True, "pi": 3.5, "none": None}}
+        block = strat.observe(strat.tokenize(data))
+        strat.fit()
+        block_meta, payload = strat.encode_block(block)
+
+        metadata = strat.model_metadata()
+        decoded = JSONStrategy()
+        decoded.dict_encoder.from_dict(strat.dict_encoder.to_dict())
+        decoded.load_model(metadata)
+        self.assertEqual(decoded.reconstruct(decoded.decode_block(block_meta, payload)), data)
+
+    def test_constant_stream_is_elided(self):
+        coder = MultiStreamCoder()
+        streams = {"sev": ["SEV:1"] * 100, "msg": ["a", "b", "a"]}
+        coder.train(streams)
+        layout, payload = coder.encode(streams)
+
+        self.assertEqual(layout[0], ["sev", 100, 0])
+        self.assertEqual(coder.decode_stream("msg", layout, payload), ["a", "b", "a"])
+        self.assertEqual(coder.decode(layout, payload)["sev"], ["SEV:1"] * 100)
+
+    def test_unknown_tokens_are_escaped(self):
+        for entropy in ("huffman", "rans"):
+            coder = MultiStreamCoder(entropy, escape=True)
+            coder.train({"msg": ["a", "b", "a", "c"]})
+            # Fitted on a sample: the rest of the data has new tokens (and one spelled like ESCAPE)
+            streams = {"msg": ["a", "new", "b", ESCAPE, "a", "é" * 200]}
+            layout, payload = coder.encode(streams)
+            self.assertEqual([entry[:2] for entry in layout], [["msg", 6], ["msg/esc", 3]])
+
+            restored = MultiStreamCoder()
+            restored.from_dict(coder.to_dict())
+            self.assertEqual(restored.decode(layout, payload), streams)
+            self.assertEqual(restored.decode_stream("msg", layout, payload), streams["msg"])
+            self.assertEqual(restored.alphabet("msg"), ["a", "b", "c"])
+            # Nothing to escape: no side stream
+            self.assertEqual(len(coder.encode({"msg": ["c", "a"]})[0]), 1)
+
+        # Models without ESCAPE still refuse unknown tokens
+        coder = MultiStreamCoder()
+        coder.train({"msg": ["a", "b", "a", "c"]})
+        self.assertNotIn("escape", coder.to_dict()["msg"])
+        with self.assertRaises(KeyError):
+            coder.encode({"msg": ["new"]})
+
+    def test_csv_columns_get_own_streams(self):
+        strat = CSVStrategy()
+        tokens = strat.tokenize([["ID", "Val"], ["10", "A"], ["11", "B"]])
+        streams = strat.split_streams(tokens)
+        self.assertEqual(streams["c0"], ["D10", "D1"])
+        self.assertEqual(strat.merge_streams(streams), tokens)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,59 @@
+import filecmp
+import os
+import tempfile
+import unittest
+from unittest import mock
+from intelligent_file_compressor.core.compressor import Compressor
+from intelligent_file_compressor.core.decompressor import Decompressor
+from intelligent_file_compressor.core.pipeline import Pipeline
+from intelligent_file_compressor.strategies.csv_strategy import CSVStrategy
+from intelligent_file_compressor.strategies.text_strategy import TextStrategy
+
+class TestPipeline(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.log = os.path.join(self.tmp.name, "app.log")
+        with open(self.log, 'w') as f:
+            for i in range(250):
+                f.write(f"2024-01-01 00:{i // 60:02d}:{i % 60:02d} INFO request {i % 7} served\n")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_blocks_carry_the_head(self):
+        path = os.path.join(self.tmp.name, "t.csv")
+        with open(path, 'w') as f:
+            f.write("id,name\n" + "".join(f"{i},n{i % 3}\n" for i in range(10)))
+        pipeline = Pipeline(CSVStrategy(block_size=4))
+        fields = pipeline.prepare(path)
+        self.assertEqual(fields["head"], [["id", "name"]])
+        self.assertEqual(fields["block_size"], 4)
+        with open(os.devnull, 'wb') as out:
+            pipeline.write(out)
+        self.assertEqual([(m["first"], m["count"]) for m in pipeline.block_metas], [(0, 4), (4, 4), (8, 2)])
+
+    def test_workers_do_not_change_the_output(self):
+        outputs = []
+        for workers in (1, 2):
+            out = os.path.join(self.tmp.name, f"w{workers}.ifc")
+            Compressor(options={"log": {"block_size": 32}}, verbose=False, workers=workers).compress(self.log, out)
+            restored = out + ".out"
+            Decompressor(workers=workers).decompress(out, restored)
+            outputs.append((out, restored))
+        (a, a_out), (b, b_out) = outputs
+        self.assertTrue(filecmp.cmp(a, b, shallow=False))
+        self.assertTrue(filecmp.cmp(a_out, b_out, shallow=False))
+
+    def test_text_is_encoded_in_batches(self):
+        path = os.path.join(self.tmp.name, "notes.txt")
+        with open(path, 'w') as f:
+            f.write("the cat sat on the mat, then the dog sat.\n" * 50)
+        for options in ({}, {"order": 1}, {"entropy": "rans"}):
+            out = path + ".ifc"
+            with mock.patch.object(TextStrategy, "BATCH_TOKENS", 5):
+                Compressor(options={"text": options}, verbose=False).compress(path, out)
+            Decompressor().decompress(out, path + ".out")
+            self.assertTrue(filecmp.cmp(path, path + ".out", shallow=False), options)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,70 @@
+import os
+import tempfile
+import time
+import unittest
+from intelligent_file_compressor.core.compressor import Compressor
+from intelligent_file_compressor.core.decompressor import Decompressor
+from intelligent_file_compressor.utils.profiling import Profiler, ProfileObserver
+
+class Recorder(ProfileObserver):
+    def __init__(self):
+        self.phases = []
+        self.files = []
+
+    def on_phase(self, name, seconds):
+        self.phases.append(name)
+
+    def on_file(self, path, counters):
+        self.files.append((path, counters))
+
+class TestProfiling(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "app.log")
+        with open(self.path, 'w') as f:
+            for i in range(300):
+                f.write(f"2024-01-01 00:{i // 60:02d}:{i % 60:02d} INFO request {i % 7} served\n")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_compress_phases_and_counters(self):
+        recorder = Recorder()
+        profiler = Profiler(observers=[recorder])
+        Compressor(verbose=False, profiler=profiler).compress(self.path, self.path + ".ifc")
+
+        self.assertTrue({"parse", "tokenize", "train", "encode", "write"} <= set(profiler.phases))
+        (path, counters), = recorder.files
+        self.assertEqual(path, self.path)
+        self.assertEqual(counters["bytes_in"], os.path.getsize(self.path))
+        self.assertEqual(counters["bytes_out"], os.path.getsize(self.path + ".ifc"))
+        self.assertEqual(counters["tokens"], sum(s["tokens"] for s in counters["streams"].values()))
+        self.assertEqual(counters["streams"]["sev"]["symbols"], 1)
+        self.assertIn("train", recorder.phases)
+        self.assertIn("phases", profiler.report())
+
+    def test_decompress_phases(self):
+        Compressor(verbose=False).compress(self.path, self.path + ".ifc")
+        profiler = Profiler()
+        Decompressor(profiler=profiler).decompress(self.path + ".ifc", self.path + ".out")
+        self.assertTrue({"read", "decode", "write"} <= set(profiler.phases))
+        self.assertEqual(profiler.files[0][1]["bytes_in"], os.path.getsize(self.path + ".ifc"))
+
+    def test_phases_are_exclusive(self):
+        profiler = Profiler()
+        with profiler.phase("outer"):
+            time.sleep(0.02)
+            with profiler.phase("inner"):
+                time.sleep(0.05)
+        self.assertLess(profiler.phases["outer"], 0.045)
+        self.assertGreaterEqual(profiler.phases["inner"], 0.05)
+
+    def test_capture(self):
+        with Profiler(capture="cprofile") as profiler:
+            Compressor(verbose=False, profiler=profiler).compress(self.path, self.path + ".ifc")
+        self.assertIn("function calls", profiler.format())
+        with self.assertRaises(ValueError):
+            Profiler(capture="perf")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,45 @@
+import csv
+import os
+import tempfile
+import unittest
+from intelligent_file_compressor.core.compressor import Compressor
+from intelligent_file_compressor.core.decompressor import Decompressor
+
+class TestQuery(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        path = os.path.join(self.tmp.name, "sales.csv")
+        with open(path, 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(["id", "city", "amount", "note"])
+            for i in range(40):
+                writer.writerow([i, ["Paris", "Oslo", "Lima", "Rome"][i % 4], (i * 37) % 100, f"n{i}"])
+        self.out = path + ".ifc"
+        Compressor(options={"csv": {"block_size": 10}}, verbose=False).compress(path, self.out)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_projection(self):
+        rows = list(Decompressor().query(self.out, ["note", "id"]))
+        self.assertEqual(len(rows), 40)
+        self.assertEqual(rows[5], ["n5", "5"])
+
+    def test_predicates(self):
+        rows = list(Decompressor().query(self.out, ["id", "amount"],
+                                         [("city", "=", "Oslo"), ("amount", ">=", "50")]))
+        expected = [[str(i), str((i * 37) % 100)] for i in range(40)
+                    if i % 4 == 1 and (i * 37) % 100 >= 50]
+        self.assertEqual(rows, expected)
+
+        # Row-group statistics on "id" leave a single group to decode
+        self.assertEqual(list(Decompressor().query(self.out, ["city"], [("id", "<", "2")])),
+                         [["Paris"], ["Oslo"]])
+        self.assertEqual(list(Decompressor().query(self.out, None, [("city", "=", "Berlin")])), [])
+
+    def test_unknown_column(self):
+        with self.assertRaises(KeyError):
+            list(Decompressor().query(self.out, ["price"]))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,82 @@
+import os
+import tempfile
+import unittest
+from types import SimpleNamespace
+from unittest import mock
+from intelligent_file_compressor.core.compressor import Compressor
+from intelligent_file_compressor.core.decompressor import Decompressor
+from intelligent_file_compressor.core.file_detector import FileDetector
+from intelligent_file_compressor.strategies import registry
+from intelligent_file_compressor.strategies.base_strategy import MultiStreamStrategy
+
+class KVStrategy(MultiStreamStrategy):
+    """Minimal third-party strategy: `key=value` lines, keys and values in separate streams."""
+    def parse(self, file_path):
+        with open(file_path, 'r', encoding='utf-8') as f:
+            return f.read().splitlines()
+
+    def tokenize(self, parsed_data):
+        return [part for line in parsed_data for part in line.split("=", 1)]
+
+    def split_streams(self, tokens):
+        return {"keys": tokens[0::2], "values": tokens[1::2]}
+
+    def merge_streams(self, streams):
+        return [t for pair in zip(streams["keys"], streams["values"]) for t in pair]
+
+    def reconstruct(self, tokens):
+        return "".join(f"{k}={v}\n" for k, v in zip(tokens[0::2], tokens[1::2]))
+
+def sniff_kv(path, head):
+    return 0.9 if head.startswith(b"#kv") or b"=" in head.split(b"\n", 1)[0] else 0.0
+
+KV = registry.StrategySpec(200, "kv", f"{__name__}:KVStrategy", (".kv",),
+                           frozenset({registry.MULTI_STREAM}), score=sniff_kv)
+
+class TestRegistry(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        registry.unregister(KV.id)
+        self.tmp.cleanup()
+
+    def write(self, name, text):
+        path = os.path.join(self.tmp.name, name)
+        with open(path, 'w') as f:
+            f.write(text)
+        return path
+
+    def test_builtins(self):
+        self.assertEqual(registry.get(3).file_type, "log")
+        self.assertTrue(registry.get(4).supports(registry.STREAMING))
+        self.assertEqual(registry.for_type("csv").id, 2)
+        with self.assertRaises(ValueError):
+            registry.get(250)
+        with self.assertRaises(ValueError):
+            registry.register(registry.StrategySpec(1, "dup", "x:Y"))
+
+    def test_plugin_round_trip(self):
+        registry.register(KV)
+        path = self.write("settings.cfg", "host=localhost\nport=8080\nhost=example.org\n")
+        self.assertEqual(FileDetector.detect(path), "kv") # sniffed, no .kv extension
+        Compressor(verbose=False).compress(path, path + ".ifc")
+        Decompressor().decompress(path + ".ifc", path + ".out")
+        with open(path + ".out") as f:
+            self.assertEqual(f.read(), "host=localhost\nport=8080\nhost=example.org\n")
+
+    def test_extension_wins_over_sniffing(self):
+        registry.register(KV)
+        path = self.write("notes.txt", "a=b\n")
+        self.assertEqual(FileDetector.detect(path), "text")
+
+    def test_entry_points(self):
+        ep = SimpleNamespace(name="kv", load=lambda: KV)
+        broken = SimpleNamespace(name="broken", load=mock.Mock(side_effect=ImportError("nope")))
+        with mock.patch.object(registry, "_plugins_loaded", False), \
+             mock.patch.object(registry, "_entry_points", return_value=[ep, broken]):
+            with self.assertWarns(UserWarning):
+                self.assertIs(registry.get(200), KV)
+
+if __name__ == '__main__':
+    unittest.main()
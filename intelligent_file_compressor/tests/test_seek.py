@@ -0,0 +1,120 @@
+import csv
+import os
+import tempfile
+import unittest
+from unittest import mock
+from intelligent_file_compressor.core.compressor import Compressor
+from intelligent_file_compressor.core.decompressor import Decompressor
+from intelligent_file_compressor.storage.blocks import BlockReader
+from intelligent_file_compressor.storage.reader import IFCReader
+from intelligent_file_compressor.storage.writer import IFCWriter
+
+class TestSeek(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.log = os.path.join(self.tmp.name, "app.log")
+        with open(self.log, 'w') as f:
+            for i in range(50):
+                sev = "ERROR" if i % 7 == 0 else "INFO"
+                f.write(f"2023-01-01 10:{i // 60:02d}:{i % 60:02d} {sev} request {i} done\n")
+        self.csv = os.path.join(self.tmp.name, "data.csv")
+        with open(self.csv, 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(["id", "city"])
+            for i in range(30):
+                writer.writerow([100 + i, ["Paris", "Oslo", "Lima"][i % 3]])
+        self.compressor = Compressor(options={"log": {"block_size": 8}, "csv": {"block_size": 7}},
+                                     verbose=False)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_log_lines(self):
+        out = self.log + ".ifc"
+        self.compressor.compress(self.log, out)
+
+        with open(out, 'rb') as f:
+            IFCReader.read_header(f)
+            entries = BlockReader.scan(f)
+        self.assertEqual([e.first for e in entries if e.kind is None], [0, 8, 16, 24, 32, 40, 48])
+        self.assertEqual([e.first for e in BlockReader.covering(entries, 10, 20)], [8, 16])
+        self.assertEqual([e.first for e in BlockReader.covering(entries, 0, 1)], [0])
+        self.assertEqual([e.first for e in BlockReader.covering(entries, 49, 60)], [48])
+        self.assertEqual(BlockReader.covering(entries, 50, 60), [])
+
+        # The index frame, two covering blocks and the trailer: no other frame header is read
+        with mock.patch.object(BlockReader, "_read_frame_header", wraps=BlockReader._read_frame_header) as read:
+            lines = Decompressor().read_records(out, 10, 20)
+        self.assertEqual(read.call_count, 4)
+        self.assertEqual(len(lines), 10)
+        self.assertEqual(lines[0], "2023-01-01 10:00:10 INFO request 10 done")
+        self.assertEqual(lines[-1], "2023-01-01 10:00:19 INFO request 19 done")
+
+        restored = os.path.join(self.tmp.name, "app.restored")
+        Decompressor().restore(*IFCReader.read(out), restored)
+        with open(restored) as f:
+            self.assertEqual(f.read().split("\n")[10:20], lines)
+
+    def test_index(self):
+        out = self.log + ".ifc"
+        self.compressor.compress(self.log, out)
+        with open(out, 'rb') as f:
+            strat_id, metadata = IFCReader.read_header(f)
+            payload_start = f.tell()
+            indexed = BlockReader.index(f, metadata, payload_start)
+            f.seek(payload_start)
+            scanned = BlockReader.scan(f)
+        self.assertEqual([(e.first, e.offset) for e in indexed], [(e.first, e.offset) for e in scanned if e.kind is None])
+        expected = Decompressor().read_records(out, 5, 45)
+        self.assertTrue(Decompressor().verify(out).ok)
+
+        def point(index):
+            # The pointer is rewritten in place like the stats: no checksum changes
+            with open(out, 'r+b') as f:
+                f.write(IFCWriter.header_bytes(strat_id, dict(metadata, index=index), payload_start))
+
+        # Files without an index, or with a pointer gone bad, are scanned
+        for index in (-1, scanned[2].offset - payload_start):
+            point(index)
+            self.assertEqual(Decompressor().read_records(out, 5, 45), expected)
+        self.assertEqual(Decompressor().verify(out).problems, ["index: the header points at no index frame"])
+        point(-1)
+        self.assertTrue(Decompressor().verify(out).ok)
+
+    def test_appends_extend_the_index(self):
+        compressor = Compressor(options={"log": {"block_size": 1}}, verbose=False)
+        with open(self.log) as f:
+            text = f.read()
+        with open(self.log, 'w') as f:
+            f.write(text * 2)
+        out = self.log + ".ifc"
+        compressor.compress(self.log, out)
+        with open(self.log, 'a') as f:
+            f.write(text * 2)
+        compressor.append(self.log, out)
+
+        with open(out, 'rb') as f:
+            _, metadata = IFCReader.read_header(f)
+            payload_start = f.tell()
+            blocks = [e for e in BlockReader.index(f, metadata, payload_start) if e.kind is None]
+            # 100 new blocks are too many to leave out: the index has all 200
+            self.assertEqual(len(blocks), 200)
+            self.assertEqual([e.data_offset for e in blocks], [-1] * 200)
+            self.assertEqual(BlockReader.load(f, blocks[-1]).meta["first"], 199)
+        self.assertEqual(Decompressor().read_records(out, 98, 102), (text * 4).splitlines()[98:102])
+        self.assertTrue(Decompressor().verify(out, original=self.log).ok)
+
+    def test_csv_rows(self):
+        out = self.csv + ".ifc"
+        self.compressor.compress(self.csv, out)
+
+        rows = Decompressor().read_records(out, 12, 16)
+        self.assertEqual(rows, [["112", "Paris"], ["113", "Oslo"], ["114", "Lima"], ["115", "Paris"]])
+
+        restored = os.path.join(self.tmp.name, "data.restored")
+        Decompressor().restore(*IFCReader.read(out), restored)
+        with open(self.csv, newline='') as a, open(restored, newline='') as b:
+            self.assertEqual(list(csv.reader(a)), list(csv.reader(b)))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,57 @@
+import json
+import os
+import tempfile
+import unittest
+from intelligent_file_compressor.core.compressor import Compressor
+from intelligent_file_compressor.core.decompressor import Decompressor
+from intelligent_file_compressor.core.shared_model import SharedModel
+from intelligent_file_compressor.storage.reader import IFCReader
+
+class TestSharedModel(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.paths = []
+        for i in range(5):
+            path = os.path.join(self.tmp.name, f"event_{i}.json")
+            data = {"id": i, "status": "active", "tags": ["a", "b"], "meta": {"version": 2}}
+            with open(path, 'w') as f:
+                json.dump(data, f)
+            self.paths.append(path)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def path(self, name):
+        return os.path.join(self.tmp.name, name)
+
+    def test_shared_model_roundtrip_and_smaller_header(self):
+        model = Compressor().train_shared_model(self.paths[:4], model_id="events")
+        model.save(self.path("events.ifcdict"))
+        shared = SharedModel.load(self.path("events.ifcdict"))
+        self.assertEqual(shared.hash, model.hash)
+
+        # New file with an unseen key and value
+        target = self.path("new.json")
+        data = {"id": 9, "status": "active", "extra": "unseen", "meta": {"version": 2}}
+        with open(target, 'w') as f:
+            json.dump(data, f)
+
+        Compressor().compress(target, self.path("plain.ifc"))
+        Compressor(shared_models=[shared]).compress(target, self.path("shared.ifc"))
+        self.assertLess(os.path.getsize(self.path("shared.ifc")), os.path.getsize(self.path("plain.ifc")))
+        # The unseen key and values are escaped rather than given models of their own
+        with open(self.path("shared.ifc"), 'rb') as f:
+            self.assertEqual(IFCReader.read_header(f)[1]["streams"], {})
+
+        Decompressor(shared_models=[shared]).decompress(self.path("shared.ifc"), self.path("out.json"))
+        with open(self.path("out.json")) as f:
+            self.assertEqual(json.load(f), data)
+
+    def test_missing_shared_model_is_reported(self):
+        model = Compressor().train_shared_model(self.paths, model_id="events")
+        Compressor(shared_models=[model]).compress(self.paths[0], self.path("a.ifc"))
+        with self.assertRaises(ValueError):
+            Decompressor().decompress(self.path("a.ifc"), self.path("a.json"))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,163 @@
+import contextlib
+import io
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+from intelligent_file_compressor.cli.stats import read_stats, show_stats
+from intelligent_file_compressor.core import compressor as compressor_module
+from intelligent_file_compressor.core.compressor import Compressor
+from intelligent_file_compressor.core.decompressor import Decompressor
+from intelligent_file_compressor.storage.reader import IFCReader
+from intelligent_file_compressor.utils.profiling import Profiler
+
+def lines(start, stop):
+    return "".join(f"2024-01-01 00:{i // 60 % 60:02d}:{i % 60:02d} INFO request {i % 5} served\n"
+                   for i in range(start, stop))
+
+class Unseekable(io.RawIOBase):
+    """Writes to a BytesIO without letting it seek, like a pipe."""
+    def __init__(self, out):
+        self.out = out
+
+    def writable(self):
+        return True
+
+    def write(self, b):
+        return self.out.write(b)
+
+class TestStats(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.compressor = Compressor(options={"log": {"block_size": 20}}, verbose=False)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, name, text, mode='w'):
+        path = os.path.join(self.tmp.name, name)
+        with open(path, mode) as f:
+            f.write(text)
+        return path
+
+    def test_stored_in_the_header(self):
+        log = self.write("app.log", lines(0, 50))
+        self.compressor.compress(log, log + ".ifc")
+        stats = read_stats(log + ".ifc")
+        self.assertEqual(stats["strategy"], "log")
+        self.assertEqual(stats["original_size"], os.path.getsize(log))
+        self.assertEqual(stats["compressed_size"], os.path.getsize(log + ".ifc"))
+        self.assertEqual(stats["records"], 50)
+        self.assertEqual(stats["time_ms"], -1)
+        self.assertIn("msg", stats["streams"])
+        self.assertEqual(stats["streams"]["msg"]["tokens"], 50)
+        self.assertEqual(stats["tokens"], sum(s["tokens"] for s in stats["streams"].values()))
+        with open(log + ".ifc", 'rb') as f:
+            IFCReader.read_header(f)
+            self.assertEqual(stats["header_size"], f.tell())
+        self.assertTrue(Decompressor().verify(log + ".ifc").ok)
+
+        # Timed only when profiling, so the output depends on the input alone
+        with open(log + ".ifc", 'rb') as f:
+            packed = f.read()
+        self.compressor.compress(log, log + ".ifc")
+        with open(log + ".ifc", 'rb') as f:
+            self.assertEqual(f.read(), packed)
+        Compressor(options={"log": {"block_size": 20}}, verbose=False, profiler=Profiler()).compress(log, log + ".ifc")
+        self.assertGreaterEqual(read_stats(log + ".ifc")["time_ms"], 0)
+
+        # Unseekable output: small inputs have their stats all the same,
+        # larger ones only the original size
+        packed = io.BytesIO()
+        self.compressor.compress_to(log, Unseekable(packed))
+        self.assertEqual(IFCReader.read(packed.getvalue())[1]["stats"]["records"], 50)
+        packed = io.BytesIO()
+        with mock.patch.object(compressor_module, "EXACT_HEADER_INPUT", 0):
+            self.compressor.compress_to(log, Unseekable(packed))
+        self.assertEqual(IFCReader.read(packed.getvalue())[1]["stats"]["original_size"], os.path.getsize(log))
+        self.assertEqual(IFCReader.read(packed.getvalue())[1]["stats"]["tokens"], -1)
+
+    def test_small_files_keep_small_headers(self):
+        doc = self.write("tiny.json", '{"a": 1, "b": [1, 2]}')
+        self.compressor.compress(doc, doc + ".ifc")
+        with open(doc + ".ifc", 'rb') as f:
+            IFCReader.read_header(f)
+            size = f.tell()
+            f.seek(0)
+            self.assertFalse(f.read(size).endswith(b" ")) # no room kept
+        stats = read_stats(doc + ".ifc")
+        self.assertEqual((stats["original_size"], stats["header_size"]), (21, size))
+        self.assertEqual(stats["compressed_size"], os.path.getsize(doc + ".ifc"))
+        self.assertEqual(stats["streams"], {})
+        self.assertGreater(stats["tokens"], 0)
+        self.assertLess(stats["compressed_size"] - size, 100)
+
+        # Appends to such a file fill in what fits
+        log = self.write("app.log", lines(0, 5))
+        compressor = Compressor(options={"log": {"block_size": 2}}, verbose=False)
+        compressor.compress(log, log + ".ifc")
+        for n in range(1, 5):
+            self.write("app.log", lines(5 * n, 5 * n + 20 * n * n), 'a')
+            compressor.append(log, log + ".ifc")
+            stats = read_stats(log + ".ifc")
+            self.assertIn(stats["records"], (-1, len(Decompressor().read_records(log + ".ifc", 0, 10 ** 6))))
+            self.assertEqual(stats["compressed_size"], os.path.getsize(log + ".ifc"))
+            self.assertTrue(Decompressor().verify(log + ".ifc", original=log).ok)
+
+    def test_appends_update_the_stats(self):
+        log = self.write("app.log", lines(0, 30))
+        self.compressor.append(log, log + ".ifc")
+        self.write("app.log", lines(30, 45), 'a')
+        with open(log + ".ifc", 'rb') as f:
+            IFCReader.read_header(f)
+            size = f.tell()
+            f.seek(0)
+            header = f.read(size)
+        self.compressor.append(log, log + ".ifc")
+        # Before its stats are rewritten, an appended file is whole already
+        with open(log + ".ifc", 'r+b') as f:
+            new_header = f.read(size)
+            f.seek(0)
+            f.write(header)
+        self.assertTrue(Decompressor().verify(log + ".ifc", original=log).ok)
+        self.assertEqual(read_stats(log + ".ifc")["records"], 30)
+        with open(log + ".ifc", 'r+b') as f:
+            f.write(new_header)
+        stats = read_stats(log + ".ifc")
+        self.assertEqual((stats["records"], stats["streams"]["msg"]["tokens"]), (45, 45))
+        self.assertEqual(stats["original_size"], os.path.getsize(log))
+        self.assertEqual(stats["compressed_size"], os.path.getsize(log + ".ifc"))
+        self.assertTrue(Decompressor().verify(log + ".ifc", original=log).ok)
+
+    def test_summary_and_json(self):
+        paths = []
+        for name, text in (("a.log", lines(0, 40)), ("b.log", lines(0, 10)), ("c.txt", "to be or not to be\n" * 30)):
+            path = self.write(name, text)
+            self.compressor.compress(path, path + ".ifc")
+            paths.append(path + ".ifc")
+        out = io.StringIO()
+        with contextlib.redirect_stdout(out):
+            self.assertTrue(show_stats(paths, as_json=True))
+        report = json.loads(out.getvalue())
+        self.assertEqual([f["path"] for f in report["files"]], paths)
+        summary = report["summary"]
+        self.assertEqual(summary["files"], 3)
+        self.assertEqual(summary["original_size"], sum(os.path.getsize(p[:-4]) for p in paths))
+        self.assertEqual(summary["compressed_size"], sum(os.path.getsize(p) for p in paths))
+        self.assertEqual(summary["strategies"]["log"]["files"], 2)
+        self.assertEqual(summary["strategies"]["text"]["files"], 1)
+
+        # Files that cannot be read are reported in the JSON, which stays parseable
+        missing = os.path.join(self.tmp.name, "missing.ifc")
+        out = io.StringIO()
+        with contextlib.redirect_stdout(out):
+            self.assertFalse(show_stats(paths[:1] + [missing], as_json=True))
+        report = json.loads(out.getvalue())
+        self.assertEqual([f["path"] for f in report["files"]], paths[:1])
+        self.assertEqual(report["errors"], [{"path": missing, "error": "File not found"}])
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.assertFalse(show_stats(paths + [missing]))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,31 @@
+import io
+import json
+import unittest
+from intelligent_file_compressor.strategies.json_strategy import JSONStrategy
+from intelligent_file_compressor.strategies.log_strategy import LogStrategy
+from intelligent_file_compressor.utils.text_stream import BufferedTextWriter
+
+class TestStreaming(unittest.TestCase):
+    def test_json_matches_json_dump(self):
+        docs = [{}, [], 7, {"a": {}, "b": [], "c": [1, 2, 3], "d": [[], {}], "é": "ü\n",
+                            "f": 1.5e300, "g": [True, False, None], "h": {"i": [{"j": -0.5}]}}]
+        for doc in docs:
+            strat = JSONStrategy()
+            chunks = list(strat.reconstruct_iter(strat.tokenize(doc), chunk_items=3))
+            self.assertEqual("".join(chunks), json.dumps(doc, indent=2))
+
+    def test_log_blocks_are_newline_separated(self):
+        strat = LogStrategy()
+        text = "".join(strat.reconstruct_blocks([], iter([["a", "b"], [], ["c"]])))
+        self.assertEqual(text, "a\nb\nc")
+
+    def test_buffered_writer(self):
+        out = io.StringIO()
+        writer = BufferedTextWriter(out, buffer_size=4)
+        writer.write("ab")
+        self.assertEqual(out.getvalue(), "")
+        writer.write_all(["cd", "e"])
+        self.assertEqual(out.getvalue(), "abcde")
+
+if __name__ == '__main__':
+    unittest.main()
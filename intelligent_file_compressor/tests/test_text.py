@@ -11,5 +11,28 @@ class TestTextStrategy(unittest.TestCase):
         self.assertIn(",", tokens)
         self.assertIn("world", tokens)
 
+    def test_order1_roundtrip(self):
+        text = "The cat sat.\nThe dog sat, then the cat ran!\n" * 20
+        strat = TextStrategy(order=1, max_context_symbols=4)
+        strat.observe(strat.tokenize(text))
+        strat.fit()
+        
+        # Small batches: the bitstream continues across encode calls
+        strat.BATCH_TOKENS = 7
+        block_meta, chunks = strat.encode_block(strat.tokenize(text))
+        payload = b"".join(chunks)
+        
+        # Small tables force escapes into the fallback table
+        self.assertIn("", strat.context_model.tables['s'].codes)
+        decoded = TextStrategy()
+        metadata = strat.model_metadata()
+        decoded.load_model(metadata)
+        self.assertEqual("".join(decoded.decode_block(metadata, payload)), text)
+
+    def test_order1_is_huffman_only(self):
+        with self.assertRaises(ValueError):
+            TextStrategy(order=1, entropy="rans")
+        self.assertEqual(TextStrategy(order=0, entropy="rans").model.NAME, "rans")
+
 if __name__ == '__main__':
     unittest.main()
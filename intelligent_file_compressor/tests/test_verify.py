@@ -0,0 +1,118 @@
+import io
+import os
+import tempfile
+import unittest
+from intelligent_file_compressor.algorithms.huffman import HuffmanEncoder
+from intelligent_file_compressor.core.compressor import Compressor
+from intelligent_file_compressor.core.decompressor import Decompressor
+from intelligent_file_compressor.storage.blocks import BlockReader
+from intelligent_file_compressor.storage.reader import IFCReader
+from intelligent_file_compressor.utils.bit_stream import BitReader
+
+def lines(start, stop):
+    return "".join(f"2024-01-01 00:{i // 60 % 60:02d}:{i % 60:02d} WARN request {i % 7} slow\n"
+                   for i in range(start, stop))
+
+class TestVerify(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.compressor = Compressor(options={"log": {"block_size": 25}}, verbose=False)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def compressed(self, name, text):
+        path = os.path.join(self.tmp.name, name)
+        with open(path, 'w') as f:
+            f.write(text)
+        self.compressor.compress(path, path + ".ifc")
+        return path, path + ".ifc"
+
+    def corrupt(self, path, offset):
+        with open(path, 'r+b') as f:
+            f.seek(offset)
+            byte = f.read(1)
+            f.seek(offset)
+            f.write(bytes([byte[0] ^ 0x10]))
+
+    def test_sound_files(self):
+        for name, text in (("app.log", lines(0, 100)), ("notes.txt", "to be or not to be\n" * 40),
+                           ("t.csv", "a,b\n" + "".join(f"{i},x{i % 4}\n" for i in range(60)))):
+            original, packed = self.compressed(name, text)
+            report = Decompressor(workers=2).verify(packed, original=original)
+            self.assertTrue(report.ok, report.problems)
+            self.assertIn("checksums", report.checked)
+            self.assertIn("round trip", report.checked)
+
+    def test_damaged_block_is_located(self):
+        original, packed = self.compressed("app.log", lines(0, 100))
+        with open(packed, 'rb') as f:
+            IFCReader.read_header(f)
+            third = BlockReader.scan(f)[2]
+        self.corrupt(packed, third.data_offset + 1)
+
+        report = Decompressor(workers=3).verify(packed)
+        self.assertEqual(report.problems, ["payload: checksum mismatch",
+                                           "Corrupt block stream: checksum mismatch in the block of record 50"])
+        with self.assertRaises(ValueError):
+            Decompressor().decompress(packed, original + ".out")
+        # Blocks that are fine still read
+        self.assertEqual(len(Decompressor().read_records(packed, 0, 50)), 50)
+        with self.assertRaises(ValueError):
+            Decompressor().read_records(packed, 40, 60)
+
+    def test_header_and_truncation(self):
+        original, packed = self.compressed("notes.txt", "to be or not to be\n" * 40)
+        with open(packed, 'rb') as f:
+            data = f.read()
+        self.corrupt(packed, data.index(b'"name"') + 2)
+        self.assertEqual(Decompressor().verify(packed).problems, ["header: checksum mismatch"])
+
+        with open(packed, 'wb') as f:
+            f.write(data[:-20])
+        report = Decompressor().verify(packed, decode=True)
+        self.assertEqual(report.problems[0], "trailer: missing (truncated?)")
+        with self.assertRaises(ValueError):
+            Decompressor().decompress_to(io.BytesIO(data[:-20]), io.BytesIO())
+
+    def test_json_path_checks_checksums(self):
+        original, packed = self.compressed("items.json", '{"items": [' + ", ".join(
+            f'{{"id": {i}, "name": "item {i % 7}"}}' for i in range(50)) + ']}')
+        self.assertEqual(list(Decompressor().json_path(packed, "$.items[*].id")), list(range(50)))
+        with open(packed, 'rb') as f:
+            IFCReader.read_header(f)
+            self.corrupt(packed, f.tell() + 3)
+        with self.assertRaises(ValueError):
+            list(Decompressor().json_path(packed, "$.items[*].id"))
+
+    def test_round_trip_mismatch(self):
+        original, packed = self.compressed("app.log", lines(0, 100))
+        with open(original, 'a') as f:
+            f.write(lines(100, 101))
+        report = Decompressor().verify(packed, original=original)
+        # The new line is missing at the end (WARN is restored as WARNING, so not at len(lines(0, 100)))
+        with open(packed, 'rb') as f:
+            end = len(Decompressor().decompress_bytes(f.read()).decode())
+        self.assertEqual(report.problems, [f"round trip: differs from {original} at character {end}"])
+
+    def test_appended_files_keep_checksums(self):
+        log = os.path.join(self.tmp.name, "app.log")
+        with open(log, 'w') as f:
+            f.write(lines(0, 60))
+        self.compressor.append(log, log + ".ifc")
+        with open(log, 'a') as f:
+            f.write(lines(60, 90))
+        self.compressor.append(log, log + ".ifc")
+        self.assertTrue(Decompressor().verify(log + ".ifc", original=log).ok)
+
+    def test_truncated_huffman_stream(self):
+        encoder = HuffmanEncoder()
+        encoder.train(["a", "b", "b", "c", "c", "c"])
+        codebook = {code: symbol for symbol, code in encoder.codes.items()}
+        data = encoder.encode_bytes(["a", "b", "c"] * 10)
+        self.assertEqual(encoder.decode(BitReader(data), codebook, limit=30), ["a", "b", "c"] * 10)
+        with self.assertRaises(ValueError):
+            encoder.decode(BitReader(data[:3]), codebook, limit=30)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -29,6 +29,14 @@ class BitWriter:
         for char in bit_string:
             self.write_bit(int(char))
 
+    def write_bytes(self, data: bytes):
+        """Write whole bytes; fast path when the writer is byte-aligned."""
+        if self.count == 0:
+            self.stream.write(data)
+        else:
+            for byte in data:
+                self.write_bits(byte, 8)
+
     def _flush_buffer(self):
         self.stream.write(bytes([self.buffer]))
         self.buffer = 0
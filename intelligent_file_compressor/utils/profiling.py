@@ -0,0 +1,200 @@
+import contextlib
+import io
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Any, Dict, Iterable, Iterator, List
+
+class ProfileObserver:
+    """
+    Receives profiling events as they happen (e.g. to forward them to a
+    metrics system). Override the hooks you need.
+    """
+    def on_phase(self, name: str, seconds: float):
+        """A phase was left; seconds excludes time spent in nested phases."""
+        pass
+
+    def on_file(self, path: str, counters: Dict[str, Any]):
+        """A file was compressed or decompressed."""
+        pass
+
+
+class Profiler:
+    """
+    Phase timers and counters for compression/decompression jobs.
+
+    Phase times are exclusive: entering a phase pauses the enclosing one,
+    so nested work (tokenizing inside block encoding, decoding inside the
+    output loop) is booked once. Optionally captures a cProfile profile or
+    a sampling profile (stack samples every sample_interval seconds) of the
+    thread that started the profiler.
+    """
+    enabled = True
+
+    def __init__(self, observers: List[ProfileObserver] = None, capture: str = None,
+                 sample_interval: float = 0.005):
+        if capture not in (None, "cprofile", "sample"):
+            raise ValueError(f"Unsupported capture mode: {capture}")
+        self.observers = list(observers or [])
+        self.phases = {}   # name -> seconds
+        self.files = []    # (path, counters) per file
+        self.capture = capture
+        self.sample_interval = sample_interval
+        self.samples = Counter() # "function (file:line)" -> hits
+        self._stack = []
+        self._cprofile = None
+        self._sampler = None
+        self._running = False
+
+    @contextlib.contextmanager
+    def phase(self, name: str):
+        self._enter(name)
+        try:
+            yield
+        finally:
+            self._exit()
+
+    def iterate(self, name: str, iterable: Iterable[Any]) -> Iterator[Any]:
+        """Yields from iterable, booking the time spent producing items to name."""
+        iterator = iter(iterable)
+        while True:
+            self._enter(name)
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+            finally:
+                self._exit()
+            yield item
+
+    def _enter(self, name: str):
+        now = time.perf_counter()
+        if self._stack:
+            # Pause the enclosing phase
+            outer = self._stack[-1]
+            outer[2] += now - outer[1]
+        self._stack.append([name, now, 0.0]) # name, resumed at, seconds so far
+
+    def _exit(self):
+        now = time.perf_counter()
+        name, start, seconds = self._stack.pop()
+        seconds += now - start
+        self.phases[name] = self.phases.get(name, 0.0) + seconds
+        for observer in self.observers:
+            observer.on_phase(name, seconds)
+        if self._stack:
+            self._stack[-1][1] = now
+
+    def record_file(self, path: str, counters: Dict[str, Any]):
+        self.files.append((path, counters))
+        for observer in self.observers:
+            observer.on_file(path, counters)
+
+    # --- Capture ---
+
+    def start(self):
+        """Starts the cProfile/sampling capture, if one was requested."""
+        if self._running:
+            return
+        self._running = True
+        if self.capture == "cprofile":
+            import cProfile
+            self._cprofile = cProfile.Profile()
+            self._cprofile.enable()
+        elif self.capture == "sample":
+            target = threading.get_ident()
+            self._sampler = threading.Thread(target=self._sample, args=(target,), daemon=True)
+            self._sampler.start()
+
+    def stop(self):
+        if not self._running:
+            return
+        self._running = False
+        if self._cprofile is not None:
+            self._cprofile.disable()
+        if self._sampler is not None:
+            self._sampler.join()
+            self._sampler = None
+
+    def __enter__(self) -> 'Profiler':
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _sample(self, thread_id: int):
+        while self._running:
+            frame = sys._current_frames().get(thread_id)
+            if frame is not None:
+                code = frame.f_code
+                self.samples[f"{code.co_name} ({code.co_filename}:{frame.f_lineno})"] += 1
+            time.sleep(self.sample_interval)
+
+    # --- Reporting ---
+
+    def report(self, top: int = 20) -> Dict[str, Any]:
+        """Everything collected so far, JSON-serializable."""
+        report = {
+            "phases": {name: round(seconds, 6) for name, seconds in self.phases.items()},
+            "files": [{"path": path, **counters} for path, counters in self.files]
+        }
+        if self.samples:
+            report["samples"] = dict(self.samples.most_common(top))
+        if self._cprofile is not None:
+            report["cprofile"] = self.cprofile_text(top)
+        return report
+
+    def cprofile_text(self, top: int = 20) -> str:
+        import pstats
+        out = io.StringIO()
+        pstats.Stats(self._cprofile, stream=out).sort_stats("cumulative").print_stats(top)
+        return out.getvalue()
+
+    def format(self, top: int = 20) -> str:
+        """Human-readable breakdown."""
+        total = sum(self.phases.values()) or 1.0
+        lines = [f"{'phase':<14} {'seconds':>9} {'share':>7}"]
+        for name, seconds in sorted(self.phases.items(), key=lambda p: -p[1]):
+            lines.append(f"{name:<14} {seconds:>9.4f} {seconds / total * 100:>6.1f}%")
+        for path, counters in self.files:
+            lines.append("")
+            lines.append(path)
+            for key, value in counters.items():
+                if key != "streams":
+                    lines.append(f"  {key:<18} {value}")
+            streams = counters.get("streams", {})
+            if streams:
+                lines.append(f"  {'stream':<10} {'tokens':>10} {'symbols':>8} {'bytes':>10} {'bits/token':>10}")
+                for name, s in streams.items():
+                    lines.append(f"  {name:<10} {s['tokens']:>10} {s['symbols']:>8} {s['bytes']:>10} {s['avg_bits']:>10.3f}")
+        if self.samples:
+            hits = sum(self.samples.values())
+            lines.append("")
+            lines.append(f"Top samples ({hits} total):")
+            for where, count in self.samples.most_common(top):
+                lines.append(f"  {count / hits * 100:5.1f}%  {where}")
+        if self._cprofile is not None:
+            lines.append("")
+            lines.append(self.cprofile_text(top))
+        return "\n".join(lines)
+
+
+class NullProfiler:
+    """Profiler stand-in used when profiling is off: every hook is a no-op."""
+    enabled = False
+
+    _null_phase = contextlib.nullcontext()
+
+    def phase(self, name: str):
+        return self._null_phase
+
+    def iterate(self, name: str, iterable: Iterable[Any]) -> Iterable[Any]:
+        return iterable
+
+    def record_file(self, path: str, counters: Dict[str, Any]):
+        pass
+
+
+NULL_PROFILER = NullProfiler()
@@ -0,0 +1,102 @@
+import io
+import os
+from contextlib import contextmanager
+from typing import Any, BinaryIO, Iterator, TextIO, Union
+
+# An input: a path, bytes-like data (bytes, bytearray, memoryview, mmap) or
+# a binary file object positioned at the start of the data
+Source = Union[str, os.PathLike, bytes, bytearray, memoryview, BinaryIO]
+
+def is_path(source: Any) -> bool:
+    return isinstance(source, (str, os.PathLike))
+
+def is_stream(source: Any) -> bool:
+    return not is_path(source) and hasattr(source, "read")
+
+def source_name(source: Any) -> str:
+    """Base name of a path source; '' for data and file objects."""
+    return os.path.basename(source) if is_path(source) else ""
+
+@contextmanager
+def open_text(source: Source, errors: str = 'strict', newline: str = None) -> Iterator[TextIO]:
+    """
+    UTF-8 text reader over a source. Paths are opened (and closed); data is
+    read in place, without copying it; file objects are read from their
+    current position and left open.
+    """
+    if is_path(source):
+        with open(source, 'r', encoding='utf-8', errors=errors, newline=newline) as f:
+            yield f
+        return
+    raw = source if is_stream(source) else io.BufferedReader(BufferReader(source))
+    text = io.TextIOWrapper(raw, encoding='utf-8', errors=errors, newline=newline)
+    try:
+        yield text
+    finally:
+        text.detach() # the wrapper must not close the caller's file
+
+@contextmanager
+def open_binary(source: Source) -> Iterator[BinaryIO]:
+    """
+    Binary reader over a source, with the same ownership rules as
+    open_text(). Raw (unbuffered) file objects may return short reads, so
+    they are buffered; the caller's position in them is then undefined.
+    """
+    if is_path(source):
+        with open(source, 'rb') as f:
+            yield f
+    elif isinstance(source, io.RawIOBase):
+        f = io.BufferedReader(source)
+        try:
+            yield f
+        finally:
+            f.detach()
+    elif is_stream(source):
+        yield source
+    else:
+        yield io.BufferedReader(BufferReader(source))
+
+def source_size(source: Source) -> int:
+    """Bytes left in a source; -1 for unseekable file objects."""
+    if is_path(source):
+        return os.path.getsize(source)
+    if not is_stream(source):
+        return memoryview(source).nbytes
+    if not source.seekable():
+        return -1
+    pos = source.tell()
+    end = source.seek(0, io.SEEK_END)
+    source.seek(pos)
+    return end - pos
+
+
+class BufferReader(io.RawIOBase):
+    """
+    Seekable raw reader over any object with the buffer protocol. Reads
+    copy straight out of the caller's buffer, so wrapping a large
+    bytearray, memoryview or mmap costs nothing up front.
+    """
+
+    def __init__(self, data: Any):
+        self.view = memoryview(data).cast('B')
+        self.pos = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def readinto(self, b: Any) -> int:
+        n = max(min(len(b), len(self.view) - self.pos), 0)
+        b[:n] = self.view[self.pos:self.pos + n]
+        self.pos += n
+        return n
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        base = {io.SEEK_SET: 0, io.SEEK_CUR: self.pos, io.SEEK_END: len(self.view)}[whence]
+        self.pos = max(base + offset, 0)
+        return self.pos
+
+    def tell(self) -> int:
+        return self.pos
@@ -0,0 +1,30 @@
+from typing import TextIO, Iterable
+
+class BufferedTextWriter:
+    """
+    Writes text chunks to a stream in large batches.
+    Reconstruction yields many small chunks (tokens, lines); joining them
+    into ~64 KB writes keeps the per-call overhead off the hot path.
+    """
+    def __init__(self, stream: TextIO, buffer_size: int = 1 << 16):
+        self.stream = stream
+        self.buffer_size = buffer_size
+        self.chunks = []
+        self.size = 0
+
+    def write(self, chunk: str):
+        self.chunks.append(chunk)
+        self.size += len(chunk)
+        if self.size >= self.buffer_size:
+            self.flush()
+
+    def write_all(self, chunks: Iterable[str]):
+        for chunk in chunks:
+            self.write(chunk)
+        self.flush()
+
+    def flush(self):
+        if self.chunks:
+            self.stream.write("".join(self.chunks))
+            self.chunks = []
+            self.size = 0
@@ -38,11 +38,11 @@ def main():
         output_dir = os.path.join(dir_name, "decompressed_files")
         os.makedirs(output_dir, exist_ok=True)
         
-        # Construct output filename (remove .ifc)
-        original_name = file_name[:-4] 
-        # If original name doesn't have extension, we might guess or just leave it.
-        # Our compressor doesn't store original filename in metadata currently, 
-        # so we rely on the user having kept the name or just stripping .ifc
+        # Original filename is stored in the metadata; older files fall back
+        # to stripping .ifc
+        with open(file_path, 'rb') as f:
+            _, metadata = IFCReader.read_header(f)
+        original_name = os.path.basename(metadata.get("name") or file_name[:-4])
         output_path = os.path.join(output_dir, original_name)
         
         try: